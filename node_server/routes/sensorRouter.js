@@ -199,150 +199,176 @@ router.post('/sensors', async (req, res) => {
 
 
 // 2. 1시간 평균 데이터용 라우터 
-router.post('/hourly', async (req, res) => {
-    try {
-        let {
-            plant_id,
-            start_at,
-            end_at,
-            temp_avg,
-            hum_avg,
-            lux_avg,
-            soil_avg
-        } = req.body;
-        // console.log(req.body);
-        const light_avg = lux_avg;
+// hourly 평균 1건 저장 + 이벤트 분석 (/hourly, /hourly_bulk 공용)
+async function saveHourly(body) {
+    let {
+        plant_id,
+        start_at,
+        end_at,
+        temp_avg,
+        hum_avg,
+        lux_avg,
+        soil_avg
+    } = body;
+    // console.log(body);
+    const light_avg = lux_avg;
 
-        // ✅ 1) plant_id가 plant_info에 존재하는지 확인
-        const [exists] = await db.query(
-            "SELECT 1 FROM plant_info WHERE PLANT_ID = ? LIMIT 1",
-            [plant_id]
-        );
+    // ✅ 1) plant_id가 plant_info에 존재하는지 확인
+    const [exists] = await db.query(
+        "SELECT 1 FROM plant_info WHERE PLANT_ID = ? LIMIT 1",
+        [plant_id]
+    );
 
-        // ✅ 2) 없으면 최신 PLANT_ID로 교정
-        if (!exists.length) {
-            const [latest] = await db.query(`
-                SELECT PLANT_ID
-                    FROM plant_info
-                        ORDER BY PLANT_ID DESC
-                LIMIT 1
-            `);
+    // ✅ 2) 없으면 최신 PLANT_ID로 교정
+    if (!exists.length) {
+        const [latest] = await db.query(`
+            SELECT PLANT_ID
+                FROM plant_info
+                    ORDER BY PLANT_ID DESC
+            LIMIT 1
+        `);
 
         if (!latest.length) {
-            return res.status(400).json({
+            return {
+                status: 400,
                 success: false,
                 message: "plant_info 비어있음 (식물 등록 먼저 필요)"
-            });
+            };
         }
 
         console.log(
             `⚠️ hourly plant_id(${plant_id}) 없음 → ${latest[0].PLANT_ID}로 교정`
         );
         plant_id = latest[0].PLANT_ID;
-        }
+    }
 
     // ✅ 3) 안전한 plant_id로 INSERT
-        const sql = `
-            INSERT INTO EVENT_LOG_HOURLY
-                (PLANT_ID, START_AT, END_AT, TEMP_AVG, HUM_AVG, LIGHT_AVG, SOIL_AVG)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-        `;
+    const sql = `
+        INSERT INTO EVENT_LOG_HOURLY
+            (PLANT_ID, START_AT, END_AT, TEMP_AVG, HUM_AVG, LIGHT_AVG, SOIL_AVG)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+    `;
 
-        await db.query(sql, [
-            plant_id,
-            start_at,
-            end_at,
-            temp_avg,
-            hum_avg,
-            lux_avg,
-            soil_avg
-        ]);
-        console.log("🕒 평균 데이터 DB 저장 완료");
+    await db.query(sql, [
+        plant_id,
+        start_at,
+        end_at,
+        temp_avg,
+        hum_avg,
+        lux_avg,
+        soil_avg
+    ]);
+    console.log("🕒 평균 데이터 DB 저장 완료");
 
-        // 이벤트 분석 1
-        /* =================================
-            soil 급락(물 준 이벤트) 분석
-            센서 범위: 0 ~ 4095
-        ================================= */
-        
-        // 최근 hourly soil_avg 2개 조회
-        const [soilRows] = await db.query(`
-            SELECT SOIL_AVG
-                FROM EVENT_LOG_HOURLY
-                    WHERE PLANT_ID = ?
-            ORDER BY END_AT DESC
-            LIMIT 2
-        `, [plant_id]);
-        
-        if (soilRows.length === 2) {
-            const currSoil = Number(soilRows[0].SOIL_AVG);
-            const prevSoil = Number(soilRows[1].SOIL_AVG);
-            const delta = currSoil - prevSoil; // 물 주면 큰 음수
-        
-            console.log("🌱 soil 비교", {
-                prevSoil,
-                currSoil,
-                delta,
-                percent: ((Math.abs(delta) / 4095) * 100).toFixed(1) + "%"
-            });
-        
-            // ✅ 센서 범위(0~4095) 기준 급락 판단
-            // 약 17% 이상 하락 시 물 준 이벤트로 판단
-            const DROP_THRESHOLD = -500;
-        
-            if (delta <= DROP_THRESHOLD) {
-                console.log("💧 물 준 이벤트 감지!");
-        
-                // 중복 방지 (1시간 쿨다운)
-                const already = await alreadyLoggedRecently(
-                    db,
+    // 이벤트 분석 1
+    /* =================================
+        soil 급락(물 준 이벤트) 분석
+        센서 범위: 0 ~ 4095
+    ================================= */
+    
+    // 최근 hourly soil_avg 2개 조회
+    const [soilRows] = await db.query(`
+        SELECT SOIL_AVG
+            FROM EVENT_LOG_HOURLY
+                WHERE PLANT_ID = ?
+        ORDER BY END_AT DESC
+        LIMIT 2
+    `, [plant_id]);
+    
+    if (soilRows.length === 2) {
+        const currSoil = Number(soilRows[0].SOIL_AVG);
+        const prevSoil = Number(soilRows[1].SOIL_AVG);
+        const delta = currSoil - prevSoil; // 물 주면 큰 음수
+    
+        console.log("🌱 soil 비교", {
+            prevSoil,
+            currSoil,
+            delta,
+            percent: ((Math.abs(delta) / 4095) * 100).toFixed(1) + "%"
+        });
+    
+        // ✅ 센서 범위(0~4095) 기준 급락 판단
+        // 약 17% 이상 하락 시 물 준 이벤트로 판단
+        const DROP_THRESHOLD = -500;
+    
+        if (delta <= DROP_THRESHOLD) {
+            console.log("💧 물 준 이벤트 감지!");
+    
+            // 중복 방지 (1시간 쿨다운)
+            const already = await alreadyLoggedRecently(
+                db,
+                plant_id,
+                "WATER_DROP_DETECTED",
+                60
+            );
+    
+            if (!already) {
+                await db.query(`
+                    INSERT INTO EVENT_LOG
+                        (PLANT_ID, EVENT_TYPE, SENSOR_TYPE, SENSOR_VALUE, THRESHOLD_MIN, 
+                        THRESHOLD_MAX, TEMP, HUM, LIGHT, SOIL, EVENT_DATE)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NOW())
+                `, [
                     plant_id,
                     "WATER_DROP_DETECTED",
-                    60
-                );
-        
-                if (!already) {
-                    await db.query(`
-                        INSERT INTO EVENT_LOG
-                            (PLANT_ID, EVENT_TYPE, SENSOR_TYPE, SENSOR_VALUE, THRESHOLD_MIN, 
-                            THRESHOLD_MAX, TEMP, HUM, LIGHT, SOIL, EVENT_DATE)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NOW())
-                    `, [
-                        plant_id,
-                        "WATER_DROP_DETECTED",
-                        "soil",
-                        delta,        // 변화량
-                        0, 0,
-                        temp_avg,
-                        hum_avg,
-                        lux_avg,
-                        soil_avg
-                    ]);        
-                    console.log("✅ WATER_DROP_DETECTED 저장 완료");
-                } else {
-                    console.log("⏳ WATER_DROP_DETECTED 쿨다운 중");
-                }
+                    "soil",
+                    delta,        // 변화량
+                    0, 0,
+                    temp_avg,
+                    hum_avg,
+                    lux_avg,
+                    soil_avg
+                ]);        
+                console.log("✅ WATER_DROP_DETECTED 저장 완료");
+            } else {
+                console.log("⏳ WATER_DROP_DETECTED 쿨다운 중");
             }
         }
-        
-        // 이벤트 판정 및 EVENT_LOG 저장 (센서값)
-        await evaluateAndLogEvents(db, plant_id, {
-            temp_avg,
-            hum_avg,
-            lux_avg,
-            soil_avg
-        }, 30);
-        
-        res.json({ 
-            success: true, 
-            message: "Hourly avg saved" 
-        });
+    }
+    
+    // 이벤트 판정 및 EVENT_LOG 저장 (센서값)
+    await evaluateAndLogEvents(db, plant_id, {
+        temp_avg,
+        hum_avg,
+        lux_avg,
+        soil_avg
+    }, 30);
+    
+    return {
+        status: 200,
+        success: true,
+        message: "Hourly avg saved"
+    };
+}
+
+router.post('/hourly', async (req, res) => {
+    try {
+        const { status, ...result } = await saveHourly(req.body);
+        res.status(status).json(result);
     } catch (err) {
         console.error("❌ hourly 저장 실패:", err.message);
         res.status(500).json({ success: false, message: err.message });
     }
 });
 
+// 2-1. 여러 식물의 hourly 평균을 한 번에 받는 라우터 (Python 묶음 전송용)
+// body: { items: [ {plant_id, start_at, end_at, temp_avg, ...}, ... ] }
+router.post('/hourly_bulk', async (req, res) => {
+    const items = Array.isArray(req.body?.items) ? req.body.items : [];
+    const results = [];
+    // 한 건이 실패해도 나머지는 계속 저장
+    for (const item of items) {
+        try {
+            const { status, ...result } = await saveHourly(item);
+            results.push({ plant_id: item.plant_id, ...result });
+        } catch (err) {
+            console.error("❌ hourly 저장 실패:", err.message);
+            results.push({ plant_id: item.plant_id, success: false, message: err.message });
+        }
+    }
+    res.json({ success: results.every(r => r.success), results });
+});
+
 // 3. 대시보드 실시간(최근 1시간) 데이터
 router.get('/current-status', async (req, res) => {
     // 가장 최근에 저장된 데이터 1개만 가져오기
@@ -3,6 +3,91 @@ const router = express.Router();
 const db = require("../config/db");
 const axios = require('axios');     // 파이썬과의 통신을 위함
 
+// 행 배열 -> 컬럼 형식 { 컬럼명: [값, ...] } (파이썬에서 행마다 dict를 만들지 않고 바로 DataFrame으로 변환)
+function toColumns(rows) {
+    const columns = {};
+    if (rows.length === 0) return columns;
+    for (const key of Object.keys(rows[0])) {
+        columns[key] = rows.map(row => row[key]);
+    }
+    return columns;
+}
+
+// 처음(커서 없음) 보낼 시간별 이력 기간 (파이썬 STATS_ROLLUP_DAYS와 같게: 긴 기간 그래프는 파이썬 롤업으로)
+const STATS_HISTORY_DAYS = Number(process.env.STATS_HISTORY_DAYS || 90);
+
+// 그래프 다운샘플링 옵션 (?resolution=day&points=300&days=90 -> 파이썬으로 그대로 전달)
+function chartOptions(query) {
+    const options = {};
+    if (query.resolution) options.resolution = query.resolution;
+    if (query.points) options.points = Number(query.points);
+    if (query.days) options.days = Number(query.days);
+    return options;
+}
+
+// 식물별 파이썬 통계 캐시 커서 { PLANT_ID: { hourly, events } }
+// (파이썬이 이전 결과를 기억하고 있으므로 커서 이후의 새 행만 보냄)
+const statsCursors = new Map();
+
+// 식물 1개의 시간별/이벤트 데이터 (cursor가 있으면 그 이후 행만)
+async function fetchPlantRows(plantId, cursor) {
+    // 커서가 있으면 그 이후 행만, 없으면 롤업용 이력 전체 (최근 24시간 구간은 파이썬이 잘라서 사용)
+    let hourlyRange = "AND CREATED_AT >= DATE_SUB(NOW(), INTERVAL ? DAY)";
+    const hourlyParams = [plantId, STATS_HISTORY_DAYS];
+    if (cursor && cursor.hourly) {
+        hourlyRange = "AND CREATED_AT > ?";
+        hourlyParams[1] = new Date(cursor.hourly);
+    }
+    const [hourlyData] = await db.query(`
+        SELECT * FROM EVENT_LOG_HOURLY
+            WHERE PLANT_ID = ?
+                ${hourlyRange}
+        ORDER BY CREATED_AT ASC
+    `, hourlyParams);
+
+    const eventParams = [plantId];
+    let eventAfter = "";
+    if (cursor && cursor.events) {
+        eventAfter = "AND EVENT_DATE > ?";
+        eventParams.push(new Date(cursor.events));
+    }
+    const [eventData] = await db.query(`
+        SELECT * FROM EVENT_LOG
+            WHERE PLANT_ID = ?
+                ${eventAfter}
+        ORDER BY EVENT_DATE ASC
+    `, eventParams);
+
+    return { hourlyData, eventData };
+}
+
+// 식물 1개 통계 (파이썬 증분 캐시 사용, 캐시가 없다고 하면(409) 전체 이력으로 한 번 더)
+async function plantStats(plantId, options) {
+    let cursor = statsCursors.get(plantId) || null;
+    for (;;) {
+        const { hourlyData, eventData } = await fetchPlantRows(plantId, cursor);
+        if (!cursor && hourlyData.length === 0 && eventData.length === 0) {
+            return null;
+        }
+        try {
+            const pythonResponse = await axios.post('http://192.168.219.236:8000/statistics/stats', {
+                ...options,
+                plant_id: plantId,
+                cursor: cursor,
+                hourly: toColumns(hourlyData),
+                events: toColumns(eventData)
+            });
+            const { cursor: nextCursor, ...stats } = pythonResponse.data;
+            statsCursors.set(plantId, nextCursor);
+            return stats;
+        } catch (error) {
+            if (!cursor || !error.response || error.response.status !== 409) throw error;
+            statsCursors.delete(plantId);
+            cursor = null;
+        }
+    }
+}
+
 // DB로 부터 데이터 불러오기 -> 파이썬 전송
 router.get('/', async (req, res) => {
     try {
@@ -16,7 +101,23 @@ router.get('/', async (req, res) => {
             return res.status(400).json({ success: false, message: "이메일이 없습니다." });
         }
 
-        // 2. 사용자 식물 정보+시간별 데이터 가져오기
+        // 2. 식물이 1개면 식물별 증분 통계 (새 행만 전송)
+        const [plants] = await db.query(`
+            SELECT p.PLANT_ID FROM PLANT_INFO p
+                JOIN USER_INFO u 
+                    ON p.USER_ID = u.USER_ID
+                WHERE u.EMAIL = ?
+        `, [userEmail]);
+        if (plants.length === 1) {
+            const stats = await plantStats(plants[0].PLANT_ID, chartOptions(req.query));
+            if (!stats) {
+                return res.json({ success: false, message: "조회된 데이터가 없습니다." });
+            }
+            return res.json({ success: true, data: stats });
+        }
+
+        // 식물이 여러 개면 기존처럼 사용자 전체 데이터로 계산
+        // 사용자 식물 정보+시간별 데이터 가져오기
         const [hourlyData] = await db.query(`
             SELECT h.* FROM EVENT_LOG_HOURLY h
                 JOIN PLANT_INFO p 
@@ -24,9 +125,9 @@ router.get('/', async (req, res) => {
                 JOIN USER_INFO u 
                     ON p.USER_ID = u.USER_ID
                 WHERE u.EMAIL = ? 
-                    AND h.CREATED_AT >= DATE_SUB(NOW(), INTERVAL 24 HOUR) 
+                    AND h.CREATED_AT >= DATE_SUB(NOW(), INTERVAL ? HOUR) 
             ORDER BY h.CREATED_AT ASC
-        `, [userEmail]);
+        `, [userEmail, 24 * Math.max(1, Number(req.query.days) || 1)]);
 
         // 3. 이벤트 로그 가져오기
         const [eventData] = await db.query(`
@@ -51,8 +152,9 @@ router.get('/', async (req, res) => {
 
         // 4. FastAPI(파이썬) 분석 서버로 데이터 전송
         const pythonResponse = await axios.post('http://192.168.219.236:8000/statistics/stats', {
-            hourly: hourlyData,
-            events: eventData
+            ...chartOptions(req.query),
+            hourly: toColumns(hourlyData),
+            events: toColumns(eventData)
         });
 
         // 5. 파이썬이 분석해서 돌려준 데이터를 웹에 전달
@@ -67,4 +169,56 @@ router.get('/', async (req, res) => {
     }
 });
 
+// 사용자의 모든 식물 통계 (식물마다 /statistics/stats를 부르지 않고 /statistics/fleet 한 번으로)
+router.get('/fleet', async (req, res) => {
+    try {
+        const userEmail = req.query.email;
+        if (!userEmail) {
+            return res.status(400).json({ success: false, message: "이메일이 없습니다." });
+        }
+
+        const [hourlyData] = await db.query(`
+            SELECT h.* FROM EVENT_LOG_HOURLY h
+                JOIN PLANT_INFO p 
+                    ON h.PLANT_ID = p.PLANT_ID
+                JOIN USER_INFO u 
+                    ON p.USER_ID = u.USER_ID
+                WHERE u.EMAIL = ? 
+                    AND h.CREATED_AT >= DATE_SUB(NOW(), INTERVAL 24 HOUR) 
+            ORDER BY h.PLANT_ID, h.CREATED_AT ASC
+        `, [userEmail]);
+
+        const [eventData] = await db.query(`
+            SELECT e.* 
+                FROM EVENT_LOG e
+                    JOIN PLANT_INFO p 
+                        ON e.PLANT_ID = p.PLANT_ID
+                    JOIN USER_INFO u    
+                        ON p.USER_ID = u.USER_ID
+                WHERE u.EMAIL = ?
+            ORDER BY e.PLANT_ID, e.EVENT_DATE ASC
+        `, [userEmail]);
+
+        if (hourlyData.length === 0 && eventData.length === 0) {
+            return res.json({ success: false, message: "조회된 데이터가 없습니다." });
+        }
+
+        // 목록 화면은 그래프 없이 수치/순위만 (?series=true면 그래프 시리즈 포함)
+        const pythonResponse = await axios.post('http://192.168.219.236:8000/statistics/fleet', {
+            series: req.query.series === 'true',
+            hourly: toColumns(hourlyData),
+            events: toColumns(eventData)
+        });
+
+        res.json({
+            success : true,
+            data : pythonResponse.data
+        });
+
+    } catch (error) {
+        console.error("식물 전체 통계 처리 실패:", error.message);
+        res.status(500).json({ error: "통계 분석 중 오류 발생" });
+    }
+});
+
 module.exports = router;
\ No newline at end of file
@@ -1,8 +1,18 @@
-from fastapi import FastAPI, UploadFile, File  # 통신 위한 FastAPI 라이브러리
+from fastapi import FastAPI, UploadFile, File, Form  # 통신 위한 FastAPI 라이브러리
+from fastapi.responses import JSONResponse, PlainTextResponse
 from routers import sensor, image, statistics, llm  # 라우터 불러오기
 import asyncio
-from services.plant_analysis import analyze_plant_height  # ✅ 이걸로 통일
+import logging
+import os
+import httpx
+from services import leader_rpc, metrics
+from services.image_pool import image_pool, LOG_FORMAT
+from services.image_buffers import shared_buffers
+from services.debug_writer import debug_writer
 
+# 로그 레벨 (DEBUG면 이미지 분석 단계별 로그까지 출력, 기본 INFO)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
 
 app = FastAPI()
 
@@ -13,17 +23,95 @@ app.include_router(image.router, prefix="/image", tags=["Image"])           # 
 app.include_router(statistics.router, prefix="/statistics", tags=["Statistics"]) # 데이터 통계 라우터
 app.include_router(llm.router, prefix="/llm", tags=["LLM"])                     # llm 라우터
 
+# ✅ 멀티 워커: follower가 leader에게 보낸 요청이 leader 전환 중이라 실패하면 503 (services/leader_rpc.py)
+@app.exception_handler(leader_rpc.LeaderUnavailable)
+async def _leader_unavailable(request, exc):
+    return JSONResponse(status_code=503, content={"detail": "센서 집계 프로세스 전환 중입니다. 잠시 후 다시 시도하세요."})
+
 # ✅ Node.js가 보내는 multipart '업로드' 엔드포인트
+# - profile=true: 캐시를 건너뛰고 단계별 처리 시간/픽셀 수를 응답에 같이 담음
+# - device_id(폼 필드): 보정된 카메라면 보정값으로 분석 (/image/calibrate)
 @app.post("/analyze")
-async def analyze_image(file: UploadFile = File(...)):
-    contents = await file.read()
-    height = analyze_plant_height(contents)
-    return {"status": "success", "height": height}
+async def analyze_image(file: UploadFile = File(...), device_id: str = Form(None), profile: bool = False):
+    with image.ANALYZE_SECONDS.labels("upload").time():
+        # 업로드 -> 공유 메모리 슬롯 -> 워커 디코딩 (같은 사진이면 캐시)
+        # 429: 대기열 가득 참, 504: 시간 초과
+        result = await image.analyze_upload(file, profile=profile, **image.device_params(device_id))
+    height = result["height"]
+    image.ANALYZE_RESULTS.labels("upload", "ok" if height > 0 else "not_found").inc()
+    response = {"status": "success", "height": height}
+    if profile:
+        response["profile"] = image.profile_summary(result)
+    return response
+
+# Node hourly 수신 주소
+# - NODE_HOURLY_BULK_URL을 설정하면 여러 식물을 한 번에 묶어서 전송 (Node: /api/hourly_bulk)
+NODE_HOURLY_URL = os.getenv("NODE_HOURLY_URL", "http://192.168.219.236:3001/api/hourly")
+NODE_HOURLY_BULK_URL = os.getenv("NODE_HOURLY_BULK_URL")
+NODE_MAX_CONNECTIONS = int(os.getenv("NODE_MAX_CONNECTIONS", "8"))
+
+# 센서값 디스크 스풀 (빈 값이면 사용 안 함)
+# - FSYNC_EVERY건 또는 FSYNC_INTERVAL초마다 한 번씩만 디스크 동기화
+SENSOR_SPOOL_DIR = os.getenv("SENSOR_SPOOL_DIR", "sensor_spool")
+SENSOR_SPOOL_FSYNC_EVERY = int(os.getenv("SENSOR_SPOOL_FSYNC_EVERY", "256"))
+SENSOR_SPOOL_FSYNC_INTERVAL = float(os.getenv("SENSOR_SPOOL_FSYNC_INTERVAL", "1.0"))
+
+# uvicorn --workers N 으로 띄울 때 설정 (워커 간 센서값 전달용 로컬 포트)
+# - 설정 안 하면 워커 1개 기준으로 각자 집계
+# - port + 1도 사용 (이벤트 판정을 leader 워커에서만 하기 위한 판정 서버)
+SENSOR_AGGREGATOR_PORT = int(os.getenv("SENSOR_AGGREGATOR_PORT", "0"))
 
 # 일정 시간마다 센서값 평균 내서 노드서버로 전송
+async def _start_sensor_pipeline():
+    """센서 집계 담당 프로세스에서만 실행 (스풀 복구 + Node 전송 루프)"""
+    # ✅ 재시작 전에 못 보낸 센서값부터 복구
+    if SENSOR_SPOOL_DIR:
+        sensor.open_spool(
+            SENSOR_SPOOL_DIR,
+            fsync_every=SENSOR_SPOOL_FSYNC_EVERY,
+            fsync_interval=SENSOR_SPOOL_FSYNC_INTERVAL,
+        )
+
+    # ✅ Node 전송용 클라이언트는 서버 시작 시 1번만 만들고 계속 재사용 (커넥션 풀)
+    app.state.node_client = httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=NODE_MAX_CONNECTIONS,
+                            max_keepalive_connections=NODE_MAX_CONNECTIONS),
+    )
+    app.state.flush_task = asyncio.create_task(sensor.flush_hourly_to_node(
+        NODE_HOURLY_URL,
+        app.state.node_client,
+        bulk_url=NODE_HOURLY_BULK_URL,
+        concurrency=NODE_MAX_CONNECTIONS,
+    ))
+
 @app.on_event("startup")
 async def _startup():
-    asyncio.create_task(sensor.flush_hourly_to_node("http://192.168.219.236:3001/api/hourly"))
+    app.state.flush_task = None
+    image_pool.start()
+    if SENSOR_AGGREGATOR_PORT:
+        role = await sensor.start_shared_aggregation(SENSOR_AGGREGATOR_PORT, _start_sensor_pipeline)
+        print(f"✅ 센서 집계 역할: {role} (pid={os.getpid()})")
+    else:
+        await _start_sensor_pipeline()
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await sensor.stop_shared_aggregation()
+    if app.state.flush_task is not None:
+        app.state.flush_task.cancel()
+        await app.state.node_client.aclose()
+    sensor.close_spool()
+    await image.close_tracks()
+    image_pool.shutdown()
+    debug_writer.flush()  # 큐에 남은 debug 이미지 저장
+    shared_buffers.close()
+
+# ✅ Prometheus 수집용 (scrape_configs에 http://<서버>:8000/metrics 등록)
+# - 멀티 워커(uvicorn --workers)에서는 요청을 받은 워커의 지표만 보임
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # 기본 확인용 엔드포인트
 @app.get("/")
@@ -0,0 +1,307 @@
+# python_server/bench/bench_analysis.py
+# ✅ 역할: 식물 키 분석(services/plant_analysis.py) 벤치마크 + 회귀 검사
+# - 입력 1) 합성 이미지: 배경(회색 잡음/나무색/그라데이션/흰색) 위에 키를 아는 초록 식물 도형 -> 정답 키와 비교
+#   입력 2) node_server/uploads 사진: 정답이 없으므로 기준 파일(--baseline)에 저장된 키와 비교
+# - 설정(ROI 비율 x downscale x 프로세스 풀 크기)마다
+#   처리량(장/s), 1장 처리 시간 p50/p99(워커 안에서 잰 분석 시간), 워커 최대 메모리(RSS), 키 오차(MAE/최대), 검출률
+# - 회귀 검사
+#   --save-baseline FILE : 현재 결과를 기준으로 저장 (같은 장비에서 비교해야 의미 있음)
+#   --baseline FILE      : 기준 대비 처리량/p99/오차가 임계값 이상 나빠지면 종료 코드 1
+#   합성 이미지 정확도는 기준 파일 없이도 --max-mae / --min-detect로 검사
+#
+# 실행 (python_server 폴더에서)
+#   python bench/bench_analysis.py
+#   python bench/bench_analysis.py --roi-ratios 0.7 --downscales 1 4 --workers 1 2 --repeat 3
+#   python bench/bench_analysis.py --save-baseline bench/baseline.json
+#   python bench/bench_analysis.py --baseline bench/baseline.json
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# bench/ 에서 실행해도 services 패키지를 찾을 수 있게 python_server를 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.plant_analysis import analyze_plant_height_detailed  # noqa: E402
+
+try:
+    import resource  # 워커 최대 메모리 (Windows에는 없음)
+except ImportError:
+    resource = None
+
+DEFAULT_IMAGES = Path(__file__).resolve().parents[2] / "node_server" / "uploads"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+PIXELS_PER_CM = 55.0
+# 합성 식물 최소 면적 = 분석 기본값(ANALYZE_PARAMS)의 ROI 면적 x min_area_ratio의 SYNTHETIC_AREA_MARGIN배
+# (작은 식물이 too_small로 걸러져서 검출률 검사가 분석이 아니라 합성 이미지 때문에 실패하지 않게)
+ROI_RATIO = 0.7
+MIN_AREA_RATIO = 0.05
+SYNTHETIC_AREA_MARGIN = 1.5
+
+
+# ---- 합성 이미지 ----
+def _background(kind: str, rng, W: int, H: int) -> np.ndarray:
+    if kind == "gray":
+        img = np.full((H, W, 3), 115, np.uint8)
+        return cv2.add(img, rng.integers(0, 35, (H, W, 3), dtype=np.uint8))
+    if kind == "wood":
+        img = np.zeros((H, W, 3), np.uint8)
+        img[:] = (50, 90, 140)  # BGR 갈색
+        stripes = (np.sin(np.arange(W) / rng.uniform(6, 14)) * 18).astype(np.int16)
+        return np.clip(img.astype(np.int16) + stripes[None, :, None], 0, 255).astype(np.uint8)
+    if kind == "gradient":
+        ramp = np.linspace(60, 200, H, dtype=np.float32)[:, None]
+        img = np.empty((H, W, 3), np.uint8)
+        img[:] = np.stack([ramp + 30, ramp, ramp - 20], axis=-1).clip(0, 255).astype(np.uint8)
+        return img
+    return np.full((H, W, 3), 235, np.uint8)  # white
+
+
+def make_synthetic(count: int, seed: int = 0, size=(1280, 960)) -> list:
+    """
+    키를 아는 합성 식물 사진 count장 -> [(이름, JPEG bytes, 정답 키 cm), ...]
+    - 식물: 줄기(사각형) + 잎(타원) 여러 개, 전부 중앙 70% ROI 안에 그림
+      키가 작아서 면적이 최소 면적보다 작으면 줄기를 따라 잎을 더 그림 (키는 그대로)
+    - 정답 = 식물 도형의 맨 위 ~ 맨 아래 픽셀 / PIXELS_PER_CM
+    """
+    rng = np.random.default_rng(seed)
+    W, H = size
+    min_area = int(W * ROI_RATIO) * int(H * ROI_RATIO) * MIN_AREA_RATIO * SYNTHETIC_AREA_MARGIN
+    kinds = ("gray", "wood", "gradient", "white")
+    items = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        img = _background(kind, rng, W, H)
+        plant = np.zeros((H, W), np.uint8)
+
+        bottom = int(H * 0.8)
+        height_px = int(rng.integers(int(H * 0.25), int(H * 0.55)))
+        top = bottom - height_px
+        cx = W // 2 + int(rng.integers(-W // 10, W // 10))
+        stem = int(rng.integers(18, 40))
+        cv2.rectangle(plant, (cx - stem // 2, top + 40), (cx + stem // 2, bottom), 255, -1)
+        for _ in range(int(rng.integers(3, 6))):
+            ly = int(rng.integers(top + 40, bottom - 40))
+            axes = (int(rng.integers(60, 140)), int(rng.integers(20, 40)))
+            cv2.ellipse(plant, (cx, ly), axes, float(rng.uniform(-30, 30)), 0, 360, 255, -1)
+        cv2.ellipse(plant, (cx, top + 40), (int(rng.integers(50, 90)), 40), 0, 0, 360, 255, -1)
+        while cv2.countNonZero(plant) < min_area:
+            ly = int(rng.integers(top + 60, bottom - 40))
+            axes = (int(rng.integers(100, 140)), int(rng.integers(25, 40)))
+            cv2.ellipse(plant, (cx, ly), axes, float(rng.uniform(-15, 15)), 0, 360, 255, -1)
+
+        hue = int(rng.integers(42, 75))
+        color = cv2.cvtColor(np.uint8([[[hue, rng.integers(130, 230), rng.integers(100, 220)]]]),
+                             cv2.COLOR_HSV2BGR)[0, 0]
+        img[plant > 0] = color
+
+        ys = np.nonzero(plant.any(axis=1))[0]
+        truth = (int(ys.max()) - int(ys.min())) / PIXELS_PER_CM
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        items.append((f"synthetic_{i:03d}_{kind}", buf.tobytes(), round(truth, 2)))
+    return items
+
+
+def load_uploads(folder: str) -> list:
+    """업로드 사진 -> [(파일명, bytes, None), ...] (정답 없음)"""
+    paths = sorted(p for p in glob.glob(os.path.join(folder, "*")) if p.lower().endswith(IMAGE_EXTS))
+    items = []
+    for p in paths:
+        with open(p, "rb") as f:
+            items.append((os.path.basename(p), f.read(), None))
+    return items
+
+
+# ---- 워커 ----
+def _analyze_one(data: bytes, params: dict):
+    """워커에서 실행: (키, 분석 시간 초, 워커 최대 RSS bytes)"""
+    start = time.perf_counter()
+    height = analyze_plant_height_detailed(data, **params)["height"]
+    elapsed = time.perf_counter() - start
+    return height, elapsed, _max_rss()
+
+
+def _max_rss():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # Linux는 KB 단위
+
+
+def _warmup(_):
+    time.sleep(0.05)  # 워커들이 전부 뜨도록 (첫 import 시간은 측정에서 제외)
+    return os.getpid()
+
+
+def run_config(items: list, roi_ratio: float, downscale: int, workers: int, repeat: int) -> dict:
+    """설정 1개 측정 (설정마다 새 풀 -> 워커 최대 메모리도 설정별)"""
+    params = {"pixels_per_cm": PIXELS_PER_CM, "roi_ratio": roi_ratio, "downscale": downscale}
+    ctx = multiprocessing.get_context("spawn")  # 서버(services/image_pool.py)와 같은 방식
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        list(pool.map(_warmup, range(workers)))
+        list(pool.map(_analyze_one, [items[0][1]] * workers, [params] * workers))
+
+        latencies, heights, rss = [], {}, []
+        started = time.perf_counter()
+        for _ in range(repeat):
+            futures = [(name, pool.submit(_analyze_one, data, params)) for name, data, _ in items]
+            for name, fut in futures:
+                height, elapsed, peak = fut.result()
+                latencies.append(elapsed)
+                heights[name] = height
+                if peak is not None:
+                    rss.append(peak)
+        wall = time.perf_counter() - started
+
+    lat = np.array(latencies) * 1000
+    return {
+        "roi_ratio": roi_ratio,
+        "downscale": downscale,
+        "workers": workers,
+        "images": len(items),
+        "throughput": round(len(latencies) / wall, 2),
+        "p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "p99_ms": round(float(np.percentile(lat, 99)), 2),
+        "peak_rss_mb": round(max(rss) / 2 ** 20, 1) if rss else None,
+        "heights": heights,
+    }
+
+
+def accuracy(result: dict, items: list, reference: dict = None) -> dict:
+    """키 오차: 합성 이미지는 정답 대비, 업로드 사진은 reference(기준 파일의 키) 대비"""
+    errors, detected, total = [], 0, 0
+    for name, _, truth in items:
+        expected = truth if truth is not None else (reference or {}).get(name)
+        if expected is None:
+            continue
+        got = result["heights"][name]
+        total += 1
+        if (got > 0) == (expected > 0):
+            detected += 1
+        if got > 0 and expected > 0:
+            errors.append(abs(got - expected))
+    return {
+        "mae_cm": round(float(np.mean(errors)), 3) if errors else None,
+        "max_cm": round(float(np.max(errors)), 3) if errors else None,
+        "detect": round(detected / total, 3) if total else None,
+    }
+
+
+def _key(cfg: dict) -> str:
+    return f"roi={cfg['roi_ratio']} ds={cfg['downscale']} w={cfg['workers']}"
+
+
+def check(current: dict, baseline: dict, args) -> list:
+    """기준 대비 회귀 목록 (비어 있으면 통과)"""
+    problems = []
+    for key, cur in current["configs"].items():
+        base = baseline.get("configs", {}).get(key)
+        if base is None:
+            continue
+        if cur["throughput"] < base["throughput"] * (1 - args.max_slowdown):
+            problems.append(f"{key}: 처리량 {base['throughput']} -> {cur['throughput']} 장/s")
+        if cur["p99_ms"] > base["p99_ms"] * (1 + args.max_slowdown):
+            problems.append(f"{key}: p99 {base['p99_ms']} -> {cur['p99_ms']} ms")
+        for dataset in ("synthetic", "uploads"):
+            c, b = cur.get(dataset) or {}, base.get(dataset) or {}
+            if c.get("mae_cm") is not None and b.get("mae_cm") is not None \
+                    and c["mae_cm"] > b["mae_cm"] + args.max_mae_increase:
+                problems.append(f"{key}: {dataset} MAE {b['mae_cm']} -> {c['mae_cm']} cm")
+            if c.get("detect") is not None and b.get("detect") is not None and c["detect"] < b["detect"]:
+                problems.append(f"{key}: {dataset} 검출률 {b['detect']} -> {c['detect']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="식물 키 분석 벤치마크 (처리량/지연/메모리/오차 + 회귀 검사)")
+    parser.add_argument("--images", default=str(DEFAULT_IMAGES), help="업로드 사진 폴더 (빈 값이면 합성만)")
+    parser.add_argument("--synthetic", type=int, default=24, help="합성 이미지 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--roi-ratios", type=float, nargs="+", default=[0.7])
+    parser.add_argument("--downscales", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--repeat", type=int, default=2, help="설정마다 전체 이미지 반복 횟수")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="기준 결과 JSON (회귀 검사)")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준으로 저장")
+    parser.add_argument("--max-slowdown", type=float, default=0.25, help="허용 처리량 감소/p99 증가 비율")
+    parser.add_argument("--max-mae-increase", type=float, default=0.2, help="허용 MAE 증가(cm)")
+    parser.add_argument("--max-mae", type=float, default=0.5, help="합성 이미지 MAE 상한(cm)")
+    parser.add_argument("--min-detect", type=float, default=0.95, help="합성 이미지 검출률 하한")
+    args = parser.parse_args()
+
+    synthetic = make_synthetic(args.synthetic, args.seed) if args.synthetic else []
+    uploads = load_uploads(args.images) if args.images else []
+    items = synthetic + uploads
+    if not items:
+        print("❌ 분석할 이미지가 없습니다.")
+        return 1
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    # 업로드 사진 기준 키: 기준 파일에 저장된 값 (없으면 이번 실행의 원본 해상도 결과)
+    reference = (baseline or {}).get("reference")
+
+    configs = {}
+    print(f"📊 합성 {len(synthetic)}장 + 업로드 {len(uploads)}장, 반복 {args.repeat}회")
+    print(f"{'config':<22} {'img/s':>7} {'p50ms':>7} {'p99ms':>7} {'rssMB':>6} "
+          f"{'synMAE':>7} {'synMax':>7} {'synDet':>6} {'upMAE':>6} {'upDet':>6}")
+    for roi in args.roi_ratios:
+        for ds in args.downscales:
+            for w in args.workers:
+                r = run_config(items, roi, ds, w, args.repeat)
+                if reference is None and ds == 1 and roi == 0.7:
+                    reference = {name: r["heights"][name] for name, _, _ in uploads}
+                configs[_key(r)] = r
+
+    for key, r in configs.items():
+        r["synthetic"] = accuracy(r, synthetic)
+        r["uploads"] = accuracy(r, uploads, reference)
+        s, u = r["synthetic"], r["uploads"]
+        fmt = lambda v, w: f"{v:>{w}}" if v is not None else f"{'-':>{w}}"  # noqa: E731
+        print(f"{key:<22} {r['throughput']:>7.2f} {r['p50_ms']:>7.2f} {r['p99_ms']:>7.2f} "
+              f"{fmt(r['peak_rss_mb'], 6)} {fmt(s['mae_cm'], 7)} {fmt(s['max_cm'], 7)} {fmt(s['detect'], 6)} "
+              f"{fmt(u['mae_cm'], 6)} {fmt(u['detect'], 6)}")
+        del r["heights"]
+
+    current = {"created_at": time.strftime("%Y-%m-%d %H:%M:%S"), "reference": reference, "configs": configs}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"💾 기준 저장: {args.save_baseline}")
+
+    problems = []
+    for key, r in configs.items():
+        s = r["synthetic"]
+        if s["mae_cm"] is not None and s["mae_cm"] > args.max_mae:
+            problems.append(f"{key}: 합성 이미지 MAE {s['mae_cm']}cm > {args.max_mae}cm")
+        if s["detect"] is not None and s["detect"] < args.min_detect:
+            problems.append(f"{key}: 합성 이미지 검출률 {s['detect']} < {args.min_detect}")
+    if baseline is not None:
+        problems += check(current, baseline, args)
+
+    if problems:
+        print("\n❌ 회귀 발견")
+        for p in problems:
+            print("  -", p)
+        return 1
+    print("\n✅ 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
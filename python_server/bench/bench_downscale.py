@@ -0,0 +1,86 @@
+# python_server/bench/bench_downscale.py
+# ✅ 역할: analyze_plant_height의 축소 디코딩(downscale) 속도/정확도 비교
+# - 원본 해상도(downscale=1) 결과를 기준으로 2/4/8배 축소 결과의 키 오차와 처리 시간을 비교
+# - 기본 입력: node_server/uploads (다이어리 업로드 사진)
+# - 참고: progressive JPEG(폰 갤러리 사진에 많음)은 축소 디코딩이어도 엔트로피 디코딩은 전부 해야 해서
+#   decode 단계 이득이 작음. baseline JPEG는 1/4 디코딩이 약 1.8배 빠름 (HSV/모폴로지는 둘 다 1/N^2)
+#
+# 실행 (python_server 폴더에서)
+#   python bench/bench_downscale.py
+#   python bench/bench_downscale.py --images ../node_server/uploads --repeat 5 --factors 1 2 4 8
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# bench/ 에서 실행해도 services 패키지를 찾을 수 있게 python_server를 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.plant_analysis import analyze_plant_height  # noqa: E402
+
+DEFAULT_IMAGES = Path(__file__).resolve().parents[2] / "node_server" / "uploads"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+def _measure(data: bytes, factor: int, repeat: int):
+    """(키, 1장당 평균 처리 시간 ms)"""
+    times = []
+    height = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        height = analyze_plant_height(data, downscale=factor)
+        times.append((time.perf_counter() - start) * 1000)
+    return height, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="downscale 별 식물 키 분석 속도/오차 비교")
+    parser.add_argument("--images", default=str(DEFAULT_IMAGES), help="이미지 폴더")
+    parser.add_argument("--repeat", type=int, default=3, help="이미지당 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    paths = sorted(p for p in glob.glob(os.path.join(args.images, "*")) if p.lower().endswith(IMAGE_EXTS))
+    if not paths:
+        print(f"❌ 이미지가 없습니다: {args.images}")
+        return 1
+
+    factors = sorted(set(args.factors) | {1})
+    results = {f: [] for f in factors}  # { factor: [(height, ms), ...] }
+    for path in paths:
+        with open(path, "rb") as fp:
+            data = fp.read()
+        for f in factors:
+            results[f].append(_measure(data, f, args.repeat))
+
+    base = results[1]
+    base_ms = sum(ms for _, ms in base)
+    print(f"📊 이미지 {len(paths)}장, 반복 {args.repeat}회 (기준: downscale=1)")
+    # ms(found): 원본에서 식물이 검출된 사진만 (검출 실패 사진은 원본 재분석이 더해짐)
+    found = [i for i, (bh, _) in enumerate(base) if bh > 0]
+    base_found_ms = sum(base[i][1] for i in found) or 1.0
+    print(f"{'factor':>6} {'ms/img':>8} {'speedup':>8} {'ms(found)':>10} {'speedup':>8} "
+          f"{'MAE(cm)':>8} {'max(cm)':>8} {'detect':>7}")
+    for f in factors:
+        rows = results[f]
+        ms = sum(m for _, m in rows)
+        found_ms = sum(rows[i][1] for i in found) or 1.0
+        errors = [abs(h - bh) for (h, _), (bh, _) in zip(rows, base)]
+        detected = sum((h > 0) == (bh > 0) for (h, _), (bh, _) in zip(rows, base))
+        print(f"{f:>6} {ms / len(rows):>8.2f} {base_ms / ms:>7.2f}x "
+              f"{found_ms / max(1, len(found)):>10.2f} {base_found_ms / found_ms:>7.2f}x "
+              f"{statistics.mean(errors):>8.2f} {max(errors):>8.2f} {detected:>3}/{len(rows)}")
+
+    print("\n이미지별 키(cm)")
+    for i, path in enumerate(paths):
+        heights = "  ".join(f"x{f}={results[f][i][0]:.1f}" for f in factors)
+        print(f"  {os.path.basename(path)}: {heights}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# python_server/bench/bench_stats.py
+# ✅ 역할: /statistics/stats 계산 시간 비교 (기존 apply 방식 vs services/plant_stats.py)
+# - 입력: 1년치 시간별 데이터(8760행) + 이벤트 로그 (Node mysql2가 보내는 것처럼 ISO 문자열 dict 리스트)
+# - 단계별: 요청 검증(StatsRequest) / DataFrame 생성 / 통계 계산, 결과가 기존과 같은지도 확인
+# - 행 형식 JSON vs 컬럼 형식 JSON({"CREATED_AT": [...], ...}) 입력 비용 비교
+# - 식물별 캐시(services/stats_cache.py): 전체 이력 대신 새 1시간치 행만 반영하는 비용
+# - 그래프 다운샘플링(services/stats_rollup.py): LTTB 300점 / 일 단위 롤업 응답 크기
+# - 여러 식물(--plants, 각 24시간 + 이벤트): 식물마다 compute_stats vs compute_fleet_stats 한 번
+#
+# 실행 (python_server 폴더에서)
+#   python bench/bench_stats.py
+#   python bench/bench_stats.py --hours 8760 --events 3000 --repeat 20
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# bench/ 에서 실행해도 services 패키지를 찾을 수 있게 python_server를 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from routers.statistics import StatsRequest  # noqa: E402
+from services.plant_stats import compute_fleet_stats, compute_stats  # noqa: E402
+from services.stats_cache import StatsCache  # noqa: E402
+
+
+def make_payload(hours: int, events: int, seed: int = 0) -> dict:
+    """Node가 보내는 형태의 요청 본문 (결측치 조금 포함)"""
+    rng = np.random.default_rng(seed)
+    end = datetime(2026, 3, 20, 12, tzinfo=timezone.utc)
+    start = end - timedelta(hours=hours)
+    temp = 22 + 3 * np.sin(np.arange(hours) / 24 * 2 * np.pi) + rng.normal(0, 0.5, hours)
+    hourly = []
+    for i in range(hours):
+        t = start + timedelta(hours=i)
+        row = {"HOURLY_ID": i, "PLANT_ID": 1, "CREATED_AT": t.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+               "TEMP_AVG": round(float(temp[i]), 2), "HUM_AVG": round(float(rng.uniform(40, 70)), 2),
+               "LIGHT_AVG": round(float(rng.uniform(0, 900)), 1)}
+        if rng.random() < 0.01:
+            row["TEMP_AVG"] = None
+        hourly.append(row)
+
+    types = np.array(["WATER_DROP_DETECTED", "TEMP_HIGH", "HUM_LOW", "LUX_LOW"])
+    ev = []
+    for i in range(events):
+        t = start + timedelta(seconds=float(rng.uniform(0, hours * 3600)))
+        ev.append({"EVENT_ID": i, "PLANT_ID": 1, "EVENT_TYPE": str(types[rng.integers(0, 4)]),
+                   "EVENT_DATE": t.strftime("%Y-%m-%dT%H:%M:%S.000Z"), "EVENT_VALUE": None})
+    return {"hourly": hourly, "events": ev}
+
+
+def legacy_stats(data: StatsRequest, now: datetime) -> dict:
+    """기존 routers/statistics.py 구현 (비교 기준)"""
+    df_hourly = pd.DataFrame(data.hourly)
+    df_events = pd.DataFrame(data.events)
+    if not df_hourly.empty:
+        df_hourly['CREATED_AT'] = pd.to_datetime(df_hourly['CREATED_AT'])
+        df_hourly = df_hourly.sort_values(by='CREATED_AT', ascending=True)
+        for col in ['TEMP_AVG', 'HUM_AVG', 'LIGHT_AVG']:
+            df_hourly[col] = df_hourly[col].interpolate(method='linear').fillna(0)
+    df_events['EVENT_DATE'] = pd.to_datetime(df_events['EVENT_DATE'])
+    water_df = df_events[df_events['EVENT_TYPE'] == 'WATER_DROP_DETECTED'].copy()
+    water_df = water_df.sort_values(by='EVENT_DATE')
+    intervals = water_df['EVENT_DATE'].diff().dt.days.dropna()
+    avg_water_interval = intervals.mean() if not intervals.empty else 0
+    this_month_df = water_df[water_df['EVENT_DATE'].dt.month == now.month].copy()
+    total_count_this_month = len(this_month_df)
+    this_month_df['week_of_month'] = this_month_df['EVENT_DATE'].apply(lambda d: (d.day - 1) // 7 + 1)
+    weekly_counts = []
+    for i in range(1, 5):
+        count = len(this_month_df[this_month_df['week_of_month'] == i])
+        weekly_counts.append({"label": f"{i}주차", "value": count})
+    return {
+        "labels": df_hourly['CREATED_AT'].apply(lambda x: str(x)[11:16]).tolist() if not df_hourly.empty else [],
+        "temp_data": df_hourly['TEMP_AVG'].tolist() if not df_hourly.empty else [],
+        "hum_data": df_hourly['HUM_AVG'].tolist() if not df_hourly.empty else [],
+        "light_data": df_hourly['LIGHT_AVG'].tolist() if not df_hourly.empty else [],
+        "analysis": {
+            "avg_temp": round(df_hourly['TEMP_AVG'].mean(), 1) if not df_hourly.empty else 0,
+            "avg_hum": round(df_hourly['HUM_AVG'].mean(), 1) if not df_hourly.empty else 0,
+            "avg_light": int(df_hourly['LIGHT_AVG'].mean()) if not df_hourly.empty else 0,
+            "water_avg_interval": round(avg_water_interval, 1),
+            "water_total_month": total_count_this_month,
+            "water_weekly": weekly_counts,
+        },
+    }
+
+
+def _time(fn, repeat: int):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/statistics/stats 계산 시간 비교")
+    parser.add_argument("--hours", type=int, default=24 * 365, help="시간별 데이터 행 수 (기본 1년)")
+    parser.add_argument("--events", type=int, default=3000, help="이벤트 로그 행 수")
+    parser.add_argument("--repeat", type=int, default=10, help="반복 횟수 (중앙값 사용)")
+    parser.add_argument("--plants", type=int, default=50, help="여러 식물 비교에 쓸 식물 수")
+    args = parser.parse_args()
+
+    payload = make_payload(args.hours, args.events)
+    now = datetime(2026, 3, 20, 12)
+    raw = json.dumps(payload).encode()
+    request, validate_ms = _time(lambda: StatsRequest.model_validate_json(raw), args.repeat)
+    frames, frame_ms = _time(lambda: (pd.DataFrame(request.hourly), pd.DataFrame(request.events)), args.repeat)
+
+    # 컬럼 형식 JSON (Node toColumns): 검증 + DataFrame 생성
+    columnar = json.dumps({k: {c: [r.get(c) for r in rows] for c in rows[0]} for k, rows in payload.items()}).encode()
+
+    def _columnar():
+        req = StatsRequest.model_validate_json(columnar)
+        return pd.DataFrame(req.hourly), pd.DataFrame(req.events)
+    col_frames, col_ms = _time(_columnar, args.repeat)
+    old, old_ms = _time(lambda: legacy_stats(request, now), args.repeat)
+    new, new_ms = _time(lambda: compute_stats(*frames, now=now), args.repeat)
+
+    print(f"📊 시간별 {args.hours}행, 이벤트 {args.events}행, 반복 {args.repeat}회 (중앙값 ms)")
+    print(f"  요청 검증(StatsRequest, 행)   {validate_ms:8.2f}   ({len(raw) / 1e6:.1f}MB)")
+    print(f"  DataFrame 생성(행 dict 리스트) {frame_ms:8.2f}")
+    print(f"  컬럼 형식 검증+DataFrame 생성  {col_ms:8.2f}   ({len(columnar) / 1e6:.1f}MB, "
+          f"행 형식 {validate_ms + frame_ms:.2f})")
+    print(f"  기존 계산(DataFrame 생성 포함) {old_ms:8.2f}")
+    print(f"  새 계산(plant_stats)          {new_ms:8.2f}   ({old_ms / (new_ms + frame_ms):.1f}x, 생성 포함 기준)")
+
+    # 캐시: 마지막 1시간치(시간별 1행 + 그 사이 이벤트)만 새로 들어온 경우
+    df_hourly, df_events = frames
+    last = df_hourly["CREATED_AT"].iloc[-1][:13]
+    split_h = len(df_hourly) - 1
+    split_e = int((df_events["EVENT_DATE"].str[:13] < last).sum())
+    df_events = df_events.sort_values("EVENT_DATE", kind="stable")
+    window_end = datetime(2026, 3, 20, 12)  # make_payload의 마지막 시각 (UTC)
+
+    def _incremental():
+        cache = StatsCache()
+        plant = cache.update(1, None, df_hourly.iloc[:split_h], df_events.iloc[:split_e], now=window_end)
+        start = time.perf_counter()
+        plant = cache.update(1, plant.cursor(), df_hourly.iloc[split_h:], df_events.iloc[split_e:], now=window_end)
+        result = plant.stats(now=now)
+        return result, (time.perf_counter() - start) * 1000
+    cached, _ = _incremental()
+    plant = StatsCache().update(1, None, df_hourly, df_events, now=window_end)
+    inc_ms = statistics.median(_incremental()[1] for _ in range(args.repeat))
+    print(f"  캐시 증분 계산(새 1시간)       {inc_ms:8.2f}   (시간별 최근 {len(cached['labels'])}행 유지)")
+
+    # 다운샘플링: 전체 구간을 300점(LTTB) / 일 평균으로
+    lttb, lttb_ms = _time(lambda: compute_stats(*frames, now=now, points=300), args.repeat)
+    daily, daily_ms = _time(lambda: plant.stats(now=now, resolution="day"), args.repeat)
+    size = len(json.dumps(new)) / 1e3
+    print(f"  LTTB 300점 (계산 포함)         {lttb_ms:8.2f}   (응답 {size:.0f}KB -> {len(json.dumps(lttb)) / 1e3:.0f}KB)")
+    print(f"  캐시 롤업 일 단위 응답          {daily_ms:8.2f}   ({len(daily['labels'])}점, 원본 행 사용 안 함)")
+
+    # 여러 식물: 식물마다 요청 1번(DataFrame 생성 + 계산) vs fleet 한 번
+    fleet_rows = {"hourly": [], "events": []}
+    for plant_id in range(1, args.plants + 1):
+        one = make_payload(24, 200, seed=plant_id)
+        for key in fleet_rows:
+            fleet_rows[key] += [{**row, "PLANT_ID": plant_id} for row in one[key]]
+
+    def _per_plant():
+        out = {}
+        for plant_id in range(1, args.plants + 1):
+            rows = {k: [r for r in v if r["PLANT_ID"] == plant_id] for k, v in fleet_rows.items()}
+            out[plant_id] = compute_stats(pd.DataFrame(rows["hourly"]), pd.DataFrame(rows["events"]), now=now)
+        return out
+    each, each_ms = _time(_per_plant, args.repeat)
+    fleet, fleet_ms = _time(lambda: compute_fleet_stats(pd.DataFrame(fleet_rows["hourly"]),
+                                                        pd.DataFrame(fleet_rows["events"]), now=now), args.repeat)
+    print(f"  식물 {args.plants}개: 식물마다 계산   {each_ms:8.2f}")
+    print(f"  식물 {args.plants}개: fleet 한 번     {fleet_ms:8.2f}   ({each_ms / fleet_ms:.1f}x)")
+    fleet_same = all({k: v for k, v in p.items() if k != "plant_id"} == each[p["plant_id"]] for p in fleet["plants"])
+
+    same = old == new and compute_stats(*col_frames, now=now) == new and fleet_same
+    print("✅ 결과 동일" if same else "❌ 결과가 다릅니다")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,51 +1,520 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional
+import asyncio
+import json
 import os
+import time
+from concurrent.futures.process import BrokenProcessPool
 
-from services.plant_analysis import analyze_plant_height
+from services.plant_analysis import (
+    analyze_plant_height_detailed, analyze_plant_height_file, analyze_plant_height_shared, observe_stages,
+    submit_debug_images,
+)
+from services.debug_writer import debug_writer
+from services.image_pool import image_pool, PoolBusy
+from services.analysis_cache import analysis_cache, cache_key
+from services.image_buffers import shared_buffers, map_file
+from services.growth_tracker import GrowthTracker, write_file
+from services.calibration import CalibrationStore, calibrate_file, MARKER_LOWER, MARKER_UPPER, MARKER_SIZE_CM
+from services import leader_rpc, metrics
 
+import logging
 import services.plant_analysis as pa
-print("✅ plant_analysis loaded from:", pa.__file__)
-print("✅ analyze_plant_height func:", pa.analyze_plant_height)
+
+logger = logging.getLogger(__name__)
 
 
 router = APIRouter()
 
+# ✅ /metrics 지표 (단계별 시간은 services/plant_analysis.py의 image_stage_seconds, 워커 결과를 여기서 기록)
+ANALYZE_SECONDS = metrics.Histogram("image_analyze_seconds", "이미지 분석 요청 1건 처리 시간(파일 읽기 포함)", ("endpoint",))
+ANALYZE_RESULTS = metrics.Counter("image_analyze_results_total", "이미지 분석 결과 수", ("endpoint", "result"))
+
+async def run_analysis(fn, *args, **kwargs):
+    """
+    이미지 분석을 프로세스 풀에서 실행 (이벤트 루프는 막지 않음)
+    - 대기열이 가득 차면 429 (Node 쪽에서 Retry-After 뒤에 재시도)
+    - 제한 시간(IMAGE_JOB_TIMEOUT) 초과 시 504
+    - 워커 프로세스가 비정상 종료하면 503 (다음 요청 때 풀을 새로 만듦)
+    - debug: 샘플링은 여기서(서버 프로세스 기준), 워커는 이미지 데이터만 돌려주고 저장은 이 프로세스의 writer가 함
+    """
+    if kwargs.get("debug"):
+        kwargs["debug"] = debug_writer.sample()
+        kwargs["debug_to_parent"] = True
+    try:
+        result = await image_pool.run(fn, *args, **kwargs)
+    except PoolBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="이미지 분석 시간이 초과되었습니다.")
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="이미지 분석 프로세스가 비정상 종료되었습니다.",
+                            headers={"Retry-After": "1"})
+    submit_debug_images(result)
+    return result
+
+# 분석 기본값 (환경에 맞게 조정)
+# - IMAGE_DOWNSCALE=2/4/8: 1/N 크기로 디코딩해서 분석 (속도 우선, bench/bench_downscale.py로 오차 확인)
+ANALYZE_PARAMS = {
+    "pixels_per_cm": 55.0,
+    "roi_ratio": 0.7,
+    "min_area_ratio": 0.05,
+    "downscale": int(os.getenv("IMAGE_DOWNSCALE", "1")),
+}
+
+# 카메라(기기)별 보정값 (POST /image/calibrate로 등록, 파일에도 저장)
+# - device_id를 같이 보내면 pixels_per_cm / HSV 범위 / 커널을 보정값으로 분석
+CALIBRATION_FILE = os.getenv("CALIBRATION_FILE", "camera_calibration.json")
+_calibration = CalibrationStore()
+_calibration.load_file(CALIBRATION_FILE)
+
+def _sync_calibration():
+    """멀티 워커: 다른 워커가 보정/삭제로 파일을 바꿨으면 다시 읽음"""
+    if CALIBRATION_FILE:
+        _calibration.reload_if_changed(CALIBRATION_FILE)
+
+def device_params(device_id: Optional[str]) -> dict:
+    """기기 보정값 (없으면 빈 dict -> ANALYZE_PARAMS 기본값)"""
+    _sync_calibration()
+    return _calibration.params(device_id)
+
+# 이 크기보다 큰 사진은 해시 계산을 스레드에서 (이벤트 루프 안 막게)
+_HASH_IN_THREAD_BYTES = 1024 * 1024
+
+def _key_params(params: dict) -> dict:
+    # 캐시 키: 사진 내용 + 분석 파라미터 + HSV 범위/커널 (기기 보정값이 있으면 그 값, debug/tag는 결과와 무관하므로 제외)
+    return {"lower_hsv": pa.LOWER_GREEN, "upper_hsv": pa.UPPER_GREEN, "kernel_size": 5, **params}
+
+async def _hash(buffer, params: dict) -> str:
+    if len(buffer) > _HASH_IN_THREAD_BYTES:
+        return await asyncio.to_thread(cache_key, buffer, _key_params(params))
+    return cache_key(buffer, _key_params(params))
+
+def _hash_file(path: str, params: dict) -> str:
+    with map_file(path) as view:
+        return cache_key(view, _key_params(params))
+
+def _cached(key: str, profile: bool):
+    # profile=True면 실제 단계별 시간을 재야 하므로 캐시를 보지 않음 (결과 저장은 함)
+    if profile:
+        return None
+    height = analysis_cache.get(key)
+    return None if height is None else {"height": height, "cached": True}
+
+def _store(key: str, result: dict) -> dict:
+    # 워커에서 잰 단계별 시간은 여기(서버 프로세스)에서 /metrics에 기록
+    observe_stages(result)
+    analysis_cache.put(key, result["height"])
+    return result
+
+def profile_summary(result: dict) -> dict:
+    """profile=True 응답용: 단계별 시간(ms) + 픽셀 수"""
+    stages_ms = {name: round(sec * 1000, 3) for name, sec in result.get("stages", {}).items()}
+    return {
+        "stages_ms": stages_ms,
+        "total_ms": round(sum(stages_ms.values()), 3),
+        "pixels": result.get("pixels"),
+        "pixel_height": result.get("pixel_height"),
+        "downscale": result.get("downscale"),
+        "retried": result.get("retried"),
+        "reason": result.get("reason"),
+    }
+
+async def analyze_bytes(image_bytes: bytes, debug: bool = False, tag: str = None,
+                        profile: bool = False, **params) -> dict:
+    """
+    캐시 확인 -> 없으면 프로세스 풀에서 분석 후 저장
+    - 캐시에 있으면 분석(디버그 이미지 저장 포함)을 건너뜀 -> {"height": ..., "cached": True}
+    - 분석했으면 analyze_plant_height_detailed 결과 그대로 (height / stages / ...)
+    """
+    params = {**ANALYZE_PARAMS, **params}
+    key = await _hash(image_bytes, params)
+    cached = _cached(key, profile)
+    if cached is not None:
+        return cached
+
+    result = await run_analysis(analyze_plant_height_detailed, image_bytes, debug=debug,
+                                debug_dir="debug_outputs", tag=tag, profile=profile, **params)
+    return _store(key, result)
+
+async def analyze_upload(upload: UploadFile, debug: bool = False, tag: str = None,
+                         profile: bool = False, **params) -> dict:
+    """
+    multipart 업로드 분석 (services/image_buffers.py)
+    - 업로드 임시파일 -> 공유 메모리 슬롯으로 바로 readinto (bytes 객체를 만들지 않음)
+    - 워커는 슬롯에 붙어서 디코딩, 슬롯은 워커 작업이 끝난 뒤 반납
+    - 빈 슬롯이 날 때까지는 업로드 임시파일 상태로 기다림 (대기열이 가득 찼으면 429)
+    - 슬롯보다 큰 사진이면 analyze_bytes로 처리
+    """
+    try:
+        image_pool.check(extra=shared_buffers.waiting)
+    except PoolBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    slot = await shared_buffers.acquire(upload.size)
+    if slot is not None:
+        try:
+            await asyncio.to_thread(slot.read_from, upload.file)
+        except ValueError:
+            shared_buffers.release(slot)
+            slot = None
+        except BaseException:
+            shared_buffers.release(slot)
+            raise
+    if slot is None:
+        await upload.seek(0)
+        return await analyze_bytes(await upload.read(), debug=debug, tag=tag, profile=profile, **params)
+
+    params = {**ANALYZE_PARAMS, **params}
+    handed_off = False
+    try:
+        view = slot.view()
+        try:
+            key = await _hash(view, params)
+        finally:
+            view.release()
+        cached = _cached(key, profile)
+        if cached is not None:
+            return cached
+
+        handed_off = True  # 이제부터 슬롯 반납은 image_pool이 작업 종료 시 처리
+        result = await run_analysis(analyze_plant_height_shared, slot.name, slot.size,
+                                    on_done=lambda: shared_buffers.release(slot), debug=debug,
+                                    debug_dir="debug_outputs", tag=tag, profile=profile, **params)
+    finally:
+        if not handed_off:
+            shared_buffers.release(slot)
+    return _store(key, result)
+
+async def analyze_path(path: str, debug: bool = False, tag: str = None,
+                       profile: bool = False, **params) -> dict:
+    """디스크에 있는 사진 분석 (부모는 mmap으로 해시만, 워커도 mmap으로 디코딩)"""
+    params = {**ANALYZE_PARAMS, **params}
+    key = await asyncio.to_thread(_hash_file, path, params)
+    cached = _cached(key, profile)
+    if cached is not None:
+        return cached
+
+    result = await run_analysis(analyze_plant_height_file, path, debug=debug,
+                                debug_dir="debug_outputs", tag=tag, profile=profile, **params)
+    return _store(key, result)
+
 # 노드 서버를 통해 로컬에 저장된 데이터 경로 정의
 class ImagePath(BaseModel):
     file_path: str
+    device_id: Optional[str] = None  # 보정된 카메라면 보정값으로 분석
+    profile: bool = False  # True면 단계별 처리 시간/픽셀 수를 응답에 포함 (캐시 안 봄)
 
 # 분석 경로 설정 /image/analyze가 최종 경로
 @router.post("/analyze")
 async def analyze_image(data: ImagePath):
-    print(f"📂 분석할 이미지 경로: {data.file_path}")
-    print("✅ runtime plant_analysis file:", pa.__file__)
-
+    logger.debug("📂 분석할 이미지 경로: %s", data.file_path)
 
     # 실제로 파일이 존재하는지 체크 (에러 방지용)
     if not os.path.exists(data.file_path):
-        print("❌ 파일 없음")
+        logger.warning("❌ 파일 없음: %s", data.file_path)
+        ANALYZE_RESULTS.labels("image", "no_file").inc()
         return {"success": False, "message": "No File"}
 
+    started = time.perf_counter()
     try:
-        with open(data.file_path, "rb") as f:
-            image_bytes = f.read()
-
         # 파일명 기반 tag(디버그 저장 파일명 식별용)
         tag = os.path.splitext(os.path.basename(data.file_path))[0]
 
-        height = analyze_plant_height(
-            image_bytes,
-            pixels_per_cm=55.0,       # 환경에 맞게 조정
+        # 해시는 스레드에서, 분석은 (캐시에 없을 때만) 워커 프로세스에서 (둘 다 mmap)
+        result = await analyze_path(
+            data.file_path,
             debug=True,              # True면 debug_outputs/에 저장
-            debug_dir="debug_outputs",
             tag=tag,
-            roi_ratio=0.7,
-            min_area_ratio=0.05
+            profile=data.profile,
+            **device_params(data.device_id),
         )
+        height = result["height"]
 
-        return {"success": True, "height": height, "message": "분석 완료"}
+        ANALYZE_RESULTS.labels("image", "ok" if height > 0 else "not_found").inc()
+        response = {"success": True, "height": height, "message": "분석 완료"}
+        if data.profile:
+            response["profile"] = profile_summary(result)
+        return response
 
+    except HTTPException:
+        ANALYZE_RESULTS.labels("image", "rejected").inc()
+        raise
     except Exception as e:
-        print("❌ 분석 에러:", e)
+        logger.exception("❌ 분석 에러: %s", e)
+        ANALYZE_RESULTS.labels("image", "error").inc()
         return {"success": False, "message": str(e)}
+    finally:
+        ANALYZE_SECONDS.labels("image").observe(time.perf_counter() - started)
+
+
+# 분석 결과 캐시 상태 (적중률/용량)
+@router.get("/cache")
+async def cache_status():
+    return analysis_cache.report()
+
+# ✅ 여러 장 한 번에 분석: /image/analyze_batch (타임랩스/다이어리 사진 백필용)
+# - JSON: {"file_paths": ["uploads/a.jpg", ...], "pixels_per_cm": 55.0, "device_id": "cam1", ...}
+# - multipart: files=<사진 여러 개> (+ pixels_per_cm / roi_ratio / min_area_ratio / downscale / device_id 폼 필드)
+# - 응답: NDJSON (application/x-ndjson) - 분석이 끝나는 순서대로 한 줄씩
+#   {"index": 0, "name": "a.jpg", "success": true, "height": 12.3}
+#   ... 마지막 줄: {"done": true, "count": N, "ok": n, "failed": m, "seconds": t}
+# - 디버그 이미지는 저장하지 않음 (수천 장이면 디스크가 금방 참)
+class BatchPaths(BaseModel):
+    file_paths: List[str]
+    device_id: Optional[str] = None
+    pixels_per_cm: Optional[float] = None
+    roi_ratio: Optional[float] = None
+    min_area_ratio: Optional[float] = None
+    downscale: Optional[int] = None
+
+def _batch_params(values) -> dict:
+    params = dict(ANALYZE_PARAMS)
+    for name, default in ANALYZE_PARAMS.items():
+        v = values.get(name)
+        if v is not None and v != "":
+            try:
+                params[name] = type(default)(v)
+            except ValueError:
+                raise HTTPException(status_code=422, detail=f"{name} 값이 올바르지 않습니다: {v}")
+    if params["downscale"] not in (1, 2, 4, 8):
+        raise HTTPException(status_code=422, detail="downscale은 1, 2, 4, 8 중 하나여야 합니다.")
+    # 보정값은 기본값만 대신함 (요청에 pixels_per_cm을 직접 넣었으면 그 값 사용)
+    for name, v in device_params(values.get("device_id")).items():
+        if values.get(name) is None or values.get(name) == "":
+            params[name] = v
+    return params
+
+def _path_jobs(paths: List[str], params: dict):
+    for i, path in enumerate(paths):
+        yield (i, os.path.basename(path)), analyze_plant_height_file, (path,), params
+
+async def _upload_jobs(uploads, params: dict):
+    # 업로드 파일은 풀에 넣기 직전에 하나씩 읽음 (동시에 메모리에 올라가는 건 window 개수만큼)
+    # - 큰 임시파일(디스크) 읽기가 이벤트 루프를 막지 않게 UploadFile의 async read 사용 (스레드에서 읽음)
+    for i, upload in enumerate(uploads):
+        await upload.seek(0)
+        yield (i, upload.filename), analyze_plant_height_detailed, (await upload.read(),), params
+
+@router.post("/analyze_batch")
+async def analyze_image_batch(request: Request):
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        uploads = [f for f in form.getlist("files") if hasattr(f, "file")]
+        params = _batch_params(form)
+        jobs, count = _upload_jobs(uploads, params), len(uploads)
+    else:
+        try:
+            body = BatchPaths.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+        params = _batch_params(body.model_dump())
+        jobs, count = _path_jobs(body.file_paths, params), len(body.file_paths)
+        form = None
+
+    async def _stream():
+        started = time.perf_counter()
+        ok = failed = 0
+        try:
+            async for (index, name), result in image_pool.imap_unordered(jobs):
+                if isinstance(result, BaseException):
+                    failed += 1
+                    reason = "timeout" if isinstance(result, asyncio.TimeoutError) else "error"
+                    ANALYZE_RESULTS.labels("batch", reason).inc()
+                    line = {"index": index, "name": name, "success": False,
+                            "message": str(result) or reason}
+                else:
+                    ok += 1
+                    observe_stages(result)
+                    height = result["height"]
+                    ANALYZE_RESULTS.labels("batch", "ok" if height > 0 else "not_found").inc()
+                    line = {"index": index, "name": name, "success": True, "height": height}
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+
+            elapsed = time.perf_counter() - started
+            ANALYZE_SECONDS.labels("batch").observe(elapsed)
+            yield json.dumps({"done": True, "count": count, "ok": ok, "failed": failed,
+                              "seconds": round(elapsed, 3)}) + "\n"
+        finally:
+            if form is not None:
+                await form.close()
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+# ✅ 식물별 성장 추적: /image/track (services/growth_tracker.py)
+# - 같은 식물 사진을 시간 순서대로 보내면 직전 위치 주변만 분석하고, 키를 칼만 필터로 보정해서 성장 속도 계산
+# - 추적 결과는 위치 정보(bbox)가 필요해서 분석 캐시는 사용하지 않음
+# - 파일 저장은 요청마다 하지 않고 GROWTH_SAVE_SECONDS초 동안 모아서 한 번 (파일 쓰기는 스레드에서)
+# - uvicorn --workers N(SENSOR_AGGREGATOR_PORT): 추적 상태(칼만 필터/bbox)와 파일 저장은 leader 워커에만 있음
+#   follower는 사진 분석만 직접 하고, 탐색 영역 조회/결과 반영/조회/초기화는 leader에게 보냄 (services/leader_rpc.py)
+#   파일은 leader가 처음 쓸 때 읽음 -> follower는 읽지도 저장하지도 않아서 leader 파일을 덮어쓰지 않음
+GROWTH_TRACK_FILE = os.getenv("GROWTH_TRACK_FILE", "growth_tracks.json")
+GROWTH_SAVE_SECONDS = float(os.getenv("GROWTH_SAVE_SECONDS", "5"))
+_tracker = GrowthTracker()
+_tracker_loaded = False
+_track_save_task = None
+_track_save_lock = asyncio.Lock()
+
+def _local_tracker() -> GrowthTracker:
+    """이 워커가 직접 관리하는 추적 상태 (leader/단일 워커, 처음 쓸 때 파일에서 읽음)"""
+    global _tracker_loaded
+    if not _tracker_loaded:
+        _tracker.load_file(GROWTH_TRACK_FILE)
+        _tracker_loaded = True
+    return _tracker
+
+async def save_tracks():
+    """바뀐 추적 상태를 파일로 저장 (Main.py 종료 시에도 호출)"""
+    if not GROWTH_TRACK_FILE or not _tracker.changed:
+        return
+    async with _track_save_lock:  # 같은 임시 파일에 두 번 동시에 쓰지 않게
+        await asyncio.to_thread(write_file, GROWTH_TRACK_FILE, _tracker.dump())
+
+async def _save_tracks_later():
+    global _track_save_task
+    await asyncio.sleep(GROWTH_SAVE_SECONDS)
+    _track_save_task = None  # 저장 중에 바뀐 내용은 다음 예약으로
+    try:
+        await save_tracks()
+    except OSError as e:
+        logger.error("❌ 성장 추적 파일 저장 실패: %s", e)
+
+def _schedule_track_save():
+    global _track_save_task
+    if GROWTH_TRACK_FILE and _track_save_task is None:
+        _track_save_task = asyncio.create_task(_save_tracks_later())
+
+async def close_tracks():
+    """예약된 저장을 취소하고 지금 바로 저장"""
+    global _track_save_task
+    if _track_save_task is not None:
+        _track_save_task.cancel()
+        _track_save_task = None
+    await save_tracks()
+
+# leader 요청 형식 (JSON): R 탐색 영역 {"plant_id"} / T 결과 반영 {"plant_id", "result", "ts"}
+#                        G 시계열 {"plant_id", "limit"} / X 초기화 {"plant_id"} -> 응답은 각 함수 반환값 JSON
+def _track_search_rect(req: dict):
+    return _local_tracker().search_rect(req["plant_id"])
+
+def _track_update(req: dict) -> dict:
+    point = _local_tracker().update(req["plant_id"], req["result"], req["ts"])
+    _schedule_track_save()
+    return point
+
+def _track_series(req: dict):
+    return _local_tracker().series(req["plant_id"], req["limit"])
+
+def _track_reset(req: dict) -> bool:
+    removed = _local_tracker().reset(req["plant_id"])
+    if removed:
+        _schedule_track_save()
+    return removed
+
+_TRACK_OPS = {b"R": _track_search_rect, b"T": _track_update, b"G": _track_series, b"X": _track_reset}
+
+def _track_on_leader(fn):
+    return lambda data: json.dumps(fn(json.loads(data)), ensure_ascii=False).encode()
+
+for _kind, _fn in _TRACK_OPS.items():
+    leader_rpc.register(_kind, _track_on_leader(_fn))
+
+async def _track_call(kind: bytes, **req):
+    """추적 상태 작업 (follower면 leader에게 맡김 -> 식물별 필터 상태를 한 프로세스에서만 관리)"""
+    reply = await leader_rpc.call(kind, json.dumps(req).encode())
+    if reply is None:
+        return _TRACK_OPS[kind](req)
+    return json.loads(reply)
+
+class TrackImage(BaseModel):
+    plant_id: int
+    file_path: str
+    device_id: Optional[str] = None
+    timestamp: Optional[float] = None  # 촬영 시각(epoch 초), 없으면 파일 수정 시각
+
+@router.post("/track")
+async def track_image(data: TrackImage):
+    if not os.path.exists(data.file_path):
+        logger.warning("❌ 파일 없음: %s", data.file_path)
+        ANALYZE_RESULTS.labels("track", "no_file").inc()
+        return {"success": False, "message": "No File"}
+
+    with ANALYZE_SECONDS.labels("track").time():
+        search_rect = await _track_call(b"R", plant_id=data.plant_id)
+        result = await run_analysis(analyze_plant_height_file, data.file_path,
+                                    search_rect=search_rect,
+                                    **{**ANALYZE_PARAMS, **device_params(data.device_id)})
+    observe_stages(result)
+    ts = data.timestamp if data.timestamp is not None else os.path.getmtime(data.file_path)
+    # 추적에 필요한 값만 (leader로 보낼 때 JSON으로 보냄)
+    tracked = {"height": float(result["height"]), "tracked": bool(result.get("tracked")),
+               "bbox": result.get("bbox"), "frame": result.get("frame")}
+    point = await _track_call(b"T", plant_id=data.plant_id, result=tracked, ts=ts)
+
+    ANALYZE_RESULTS.labels("track", "ok" if point["height"] > 0 else "not_found").inc()
+    return {"success": True, "plant_id": data.plant_id, **point}
+
+@router.get("/growth/{plant_id}")
+async def growth_series(plant_id: int, limit: Optional[int] = None):
+    """성장 시계열 (측정 키 / 보정 키 / 성장 속도)"""
+    series = await _track_call(b"G", plant_id=plant_id, limit=limit)
+    if series is None:
+        raise HTTPException(status_code=404, detail=f"추적 기록이 없습니다: plant_id={plant_id}")
+    return series
+
+@router.delete("/track/{plant_id}")
+async def reset_track(plant_id: int):
+    """화분/카메라 위치를 바꿨을 때 추적 초기화"""
+    removed = await _track_call(b"X", plant_id=plant_id)
+    return {"success": removed, "plant_id": plant_id}
+
+# ✅ 카메라 보정: /image/calibrate (services/calibration.py)
+# - 기준 사진: 식물 + 크기를 아는 정사각형 마커(기본: 자홍색 2cm)를 같이 찍은 사진
+# - 결과(pixels_per_cm / HSV 범위 / 커널 크기)를 device_id로 저장 -> 이후 분석 요청에 device_id만 보내면 적용
+class CalibrateImage(BaseModel):
+    device_id: str
+    file_path: str
+    marker_size_cm: float = MARKER_SIZE_CM
+    marker_lower: Optional[List[int]] = None  # 마커 HSV 범위 (기본 MARKER_LOWER/UPPER)
+    marker_upper: Optional[List[int]] = None
+    save: bool = True  # False면 계산 결과만 확인
+
+@router.post("/calibrate")
+async def calibrate_device(data: CalibrateImage):
+    if not os.path.exists(data.file_path):
+        return {"success": False, "message": "No File"}
+    try:
+        values = await run_analysis(calibrate_file, data.file_path, marker_size_cm=data.marker_size_cm,
+                                    marker_lower=tuple(data.marker_lower or MARKER_LOWER),
+                                    marker_upper=tuple(data.marker_upper or MARKER_UPPER),
+                                    roi_ratio=ANALYZE_PARAMS["roi_ratio"])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if not data.save:
+        return {"success": True, "device_id": data.device_id, "saved": False, **values}
+    # 다른 워커가 저장한 기기 위에 덮어써야 파일에서 그 기기가 사라지지 않음
+    _sync_calibration()
+    record = _calibration.set(data.device_id, values)
+    if CALIBRATION_FILE:
+        _calibration.save_file(CALIBRATION_FILE)
+    logger.info("📐 카메라 보정 저장: %s %s", data.device_id, record)
+    return {"success": True, "device_id": data.device_id, "saved": True, **record}
+
+@router.get("/calibration/{device_id}")
+async def get_calibration(device_id: str):
+    _sync_calibration()
+    record = _calibration.get(device_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"보정 기록이 없습니다: device_id={device_id}")
+    return {"device_id": device_id, **record}
+
+@router.delete("/calibration/{device_id}")
+async def delete_calibration(device_id: str):
+    _sync_calibration()
+    removed = _calibration.remove(device_id)
+    if removed and CALIBRATION_FILE:
+        _calibration.save_file(CALIBRATION_FILE)
+    return {"success": removed, "device_id": device_id}
@@ -21,6 +21,7 @@ load_dotenv(dotenv_path=ENV_PATH)
 print("✅ OPENAI_API_KEY loaded?", bool(os.getenv("OPENAI_API_KEY")))
 
 import json
+import time
 from typing import Optional, List, Dict, Any
 
 from fastapi import APIRouter, HTTPException
@@ -30,8 +31,18 @@ from pydantic import BaseModel, Field
 # - pip install openai 필요
 from openai import OpenAI
 
+from services import metrics
+
 router = APIRouter()
 
+# ✅ /metrics 지표
+# - kind: notification | summary | skill (어떤 엔드포인트에서 호출했는지)
+LLM_SECONDS = metrics.Histogram("llm_call_seconds", "LLM API 호출 시간", ("kind", "result"),
+                                buckets=(0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0, 120.0))
+LLM_FALLBACKS = metrics.Counter("llm_fallback_total", "LLM 대신 고정 문장(fallback)으로 응답한 수", ("kind",))
+LLM_REQUESTS = metrics.Counter("llm_requests_total", "LLM 엔드포인트 요청 수", ("kind",))
+LLM_TOKENS = metrics.Counter("llm_tokens_total", "LLM 사용 토큰 수", ("kind", "type"))
+
 # ✅ Node가 보내줄 요청(JSON) 형태 정의 (계약/스펙)
 class NotificationRequest(BaseModel):
     plant_id: int
@@ -106,6 +117,7 @@ DEFAULT_GUIDE = {
 # 2) fallback (LLM 실패 시)
 # -----------------------------
 def fallback_notification(req: NotificationRequest) -> NotificationResponse:
+    LLM_FALLBACKS.labels("notification").inc()
     guide = EVENT_GUIDE.get(req.event_type, DEFAULT_GUIDE)
     return NotificationResponse(
         title=guide["title"],
@@ -285,6 +297,7 @@ def build_summary_prompt(events: List[NotificationRequest]) -> str:
     return prompt
 
 def fallback_summary(events: List[NotificationRequest]) -> NotificationResponse:
+    LLM_FALLBACKS.labels("summary").inc()
     primary = pick_primary_event(events)
     guide = EVENT_GUIDE.get(primary.event_type, DEFAULT_GUIDE)
 
@@ -301,7 +314,8 @@ def fallback_summary(events: List[NotificationRequest]) -> NotificationResponse:
 # -----------------------------
 # 4) LLM 호출 함수
 # -----------------------------
-def call_llm(prompt: str) -> dict:
+def call_llm(prompt: str, kind: str = "other") -> dict:
+    # kind: /metrics 라벨용 (호출한 엔드포인트 구분)
     # OpenAI 클라이언트 생성
     # - timeout: LLM이 응답 안 줄 때 무한 대기 방지
     client = OpenAI(
@@ -312,11 +326,23 @@ def call_llm(prompt: str) -> dict:
 
     # LLM 호출
     # ❌ response_format 제거 (현재 SDK에서 에러 원인)
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        response_format={ "type": "json_object" } # JSON으로만 받기
-    )
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            response_format={ "type": "json_object" } # JSON으로만 받기
+        )
+    except Exception:
+        LLM_SECONDS.labels(kind, "error").observe(time.perf_counter() - started)
+        raise
+    LLM_SECONDS.labels(kind, "ok").observe(time.perf_counter() - started)
+
+    # 토큰 사용량 (비용 추적용)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        LLM_TOKENS.labels(kind, "prompt").inc(usage.prompt_tokens or 0)
+        LLM_TOKENS.labels(kind, "completion").inc(usage.completion_tokens or 0)
 
     # responses API는 text를 여러 output으로 줄 수 있음
     # output_text는 "모든 텍스트 응답을 합친 문자열"
@@ -357,11 +383,12 @@ def make_notification(req: NotificationRequest):
 
     # 0) 이벤트 타입에 따른 기본 가이드 (fallback 품질의 기준점)
     guide = EVENT_GUIDE.get(req.event_type, DEFAULT_GUIDE)
+    LLM_REQUESTS.labels("notification").inc()
 
     try:
         # 1) 프롬프트 생성 → LLM 호출
         prompt = build_prompt(req)
-        data = call_llm(prompt)  # dict 기대
+        data = call_llm(prompt, kind="notification")  # dict 기대
 
         # 2) LLM이 dict가 아닌 값을 줄 수 있으니 1차 방어
         if not isinstance(data, dict):
@@ -430,11 +457,12 @@ def make_notification_summary(req: NotificationSummaryRequest):
 
     primary = pick_primary_event(events)
     guide = EVENT_GUIDE.get(primary.event_type, DEFAULT_GUIDE)
+    LLM_REQUESTS.labels("summary").inc()
 
     try:
         prompt = build_summary_prompt(events)
         print("2. 프롬프트 완성!")
-        data = call_llm(prompt)
+        data = call_llm(prompt, kind="summary")
         print("3. AI 응답 도착!")
         if not isinstance(data, dict):
             return fallback_summary(events).model_dump()
@@ -524,9 +552,10 @@ def build_skill_prompt(req: SkillInterpretRequest) -> str:
 
 @router.post("/skill_interpret")
 def skill_interpret(req: SkillInterpretRequest):
+    LLM_REQUESTS.labels("skill").inc()
     try:
         prompt = build_skill_prompt(req)
-        data = call_llm(prompt)
+        data = call_llm(prompt, kind="skill")
         if not isinstance(data, dict):
             raise ValueError("LLM returned non-dict")
 
@@ -554,6 +583,7 @@ def skill_interpret(req: SkillInterpretRequest):
     except Exception as e:
         print("❌ skill_interpret error:", repr(e), flush=True)
         # fallback
+        LLM_FALLBACKS.labels("skill").inc()
         return SkillInterpretResponse(
             title="숙련도 리포트 요약",
             summary="현재 점수를 바탕으로 관리 패턴을 분석했어요. 작은 루틴을 유지하면 점수는 빠르게 오를 수 있어요.",
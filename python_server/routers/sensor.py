@@ -1,9 +1,24 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.exceptions import RequestValidationError
 # 데이터 검증 및 규격 정의를 위한 pydantic 라이브러리 / BaseModel 클래스
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+from typing import List, Optional
 from datetime import datetime, timedelta
 import asyncio
+import json
+import os
+import struct
+import time
 import httpx  # pip install httpx
+import numpy as np
+
+from services.sensor_buffer import SensorBuffer, PACKED_DTYPE, ingest_block
+from services.sensor_spool import SensorSpool
+from services.flush_scheduler import DeadlineScheduler, window_end
+from services.sensor_forwarder import SensorForwarder, start_aggregator_server, start_rpc_server
+from services.thresholds import ThresholdTable, EVENT_NAMES, evaluate, event_lists
+from services.sensor_events import EventEngine
+from services import leader_rpc, metrics
 
 
 # Main.py에서 불러올 router 만들기!
@@ -17,93 +32,481 @@ class SensorIn(BaseModel):
     light: float
     soil: float
     
-_buffers = {}  # { plant_id: {"start": datetime, "rows": [SensorIn,...]} }
+_buffers = {}  # { plant_id: SensorBuffer }  (services/sensor_buffer.py 참고)
+_spool: Optional[SensorSpool] = None  # 디스크 스풀 (Main.py 시작 시 open_spool로 설정)
+
+# ✅ 집계 구간 길이(초). 자정 기준으로 정렬됨 (3600이면 매 정시에 전송)
+# - 테스트 빨리 하려면 SENSOR_WINDOW_SECONDS=60 으로 실행
+WINDOW_SECONDS = int(os.getenv("SENSOR_WINDOW_SECONDS", "3600"))
+# 전송 실패 시 재시도 간격(초)
+RETRY_SECONDS = 10
+
+# 식물별 구간 마감 시각 스케줄러 (flush_hourly_to_node가 가장 빠른 마감까지만 잠듦)
+_scheduler = DeadlineScheduler()
+
+def _schedule_new(plant_ids):
+    """새로 만들어진 버퍼(첫 센서값)의 구간 마감 시각 등록"""
+    for plant_id in plant_ids:
+        if plant_id not in _scheduler:
+            _scheduler.schedule(plant_id, window_end(_buffers[plant_id].start, WINDOW_SECONDS))
+
+# 멀티 워커 모드 (start_shared_aggregation 참고)
+# - leader 워커: _aggregator_server로 다른 워커의 센서값을 받아 로컬 버퍼에 집계
+# - follower 워커: _forwarder로 leader에게 전달만 함 (로컬 버퍼/스풀/flush 없음)
+# - 워커마다 상태가 따로 있으면 안 되는 요청(이벤트 판정, 식물별 통계 캐시)도 leader만 처리:
+#   follower는 leader_rpc.call로 보내고 결과만 받음 (services/leader_rpc.py)
+_aggregator_server = None
+_rpc_server = None
+_forwarder: Optional[SensorForwarder] = None
+
+_record = struct.Struct("<iffff")  # PACKED_DTYPE 1건과 같은 배치
+
+# ✅ /metrics 지표 (services/metrics.py)
+INGEST_READINGS = metrics.Counter(
+    "sensor_ingest_readings_total", "수신한 센서값 건수", ("endpoint", "mode"))
+INGEST_BATCH_SIZE = metrics.Histogram(
+    "sensor_ingest_batch_size", "ingest_batch 요청 1건의 센서값 수",
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000, 50000))
+BUFFER_READINGS = metrics.Gauge(
+    "sensor_buffer_readings", "현재 구간에 쌓인 식물별 센서값 수", ("plant_id",))
+BUFFER_BYTES = metrics.Gauge("sensor_buffer_bytes", "센서 버퍼 전체 메모리 사용량(byte)")
+FLUSH_SECONDS = metrics.Histogram("sensor_flush_seconds", "마감된 구간 1회 전송(Node hourly)에 걸린 시간")
+FLUSH_PLANTS = metrics.Counter("sensor_flush_plants_total", "Node로 보낸 식물별 구간 수", ("result",))
+
+def _collect_buffer_metrics():
+    BUFFER_READINGS.clear()
+    for plant_id, buf in list(_buffers.items()):
+        BUFFER_READINGS.labels(plant_id).set(buf.count)
+    BUFFER_BYTES.set(sum(buf.nbytes for buf in list(_buffers.values())))
+
+metrics.register_collector(_collect_buffer_metrics)
+
+def open_spool(spool_dir: str, **options) -> SensorSpool:
+    """스풀을 열고, 아직 Node로 전송 안 된 센서값을 버퍼로 복구"""
+    global _spool
+    spool = SensorSpool(spool_dir, **options)
+    plant_ids, values, ts = spool.replay()
+    if len(plant_ids):
+        ingest_block(_buffers, plant_ids, values, datetime.now())
+        # 복구된 식물의 집계 시작 시각 = 가장 오래된 레코드 시각
+        for plant_id in np.unique(plant_ids).tolist():
+            first = ts[plant_ids == plant_id].min()
+            _buffers[plant_id].start = min(_buffers[plant_id].start, datetime.fromtimestamp(first))
+        _schedule_new(np.unique(plant_ids).tolist())
+        print(f"♻️ 스풀 복구: {len(plant_ids)}건 / 식물 {len(np.unique(plant_ids))}개")
+    _spool = spool
+    return spool
+
+def close_spool():
+    global _spool
+    if _spool is not None:
+        _spool.close()
+        _spool = None
+
+def _ingest_local(plant_ids: np.ndarray, values: np.ndarray) -> dict:
+    """센서값 묶음을 스풀 + 로컬 버퍼에 반영"""
+    if _spool is not None:
+        _spool.append(plant_ids, values)
+    added = ingest_block(_buffers, plant_ids, values, datetime.now())
+    _schedule_new(added)
+    return added
+
+def _ingest_packed(data: bytes) -> dict:
+    records = np.frombuffer(data, dtype=PACKED_DTYPE)
+    values = np.stack([records["temp"], records["hum"], records["light"], records["soil"]], axis=1)
+    return _ingest_local(records["plant_id"].astype(np.int64), values)
+
+async def start_shared_aggregation(port: int, become_leader) -> str:
+    """
+    uvicorn --workers N 용: 워커들 중 하나만 집계를 맡도록 역할을 정한다.
+    - 127.0.0.1:port를 bind하면 leader -> become_leader() 실행 (스풀/flush 시작)
+    - 이미 사용 중이면 follower -> 센서값을 leader에게 전달
+    - leader 요청 서버(이벤트 판정/통계 캐시)는 port + 1 (leader만 bind)
+    반환: "leader" | "follower"
+    """
+    global _aggregator_server, _forwarder
+
+    async def try_leader() -> bool:
+        global _aggregator_server, _rpc_server
+        try:
+            _aggregator_server = await start_aggregator_server(port, _ingest_packed)
+        except OSError:
+            return False
+        try:
+            _rpc_server = await start_rpc_server(port + 1, leader_rpc.handlers)
+        except OSError as e:
+            print(f"❌ leader 요청 포트({port + 1}) 사용 불가:", e)
+            _aggregator_server.close()
+            await _aggregator_server.wait_closed()
+            _aggregator_server = None
+            return False
+        await become_leader()
+        return True
+
+    if await try_leader():
+        return "leader"
+
+    async def follow():
+        global _forwarder
+        leftover = await _forwarder.run()  # leader로 승격되면 반환
+        _forwarder = None
+        leader_rpc.close()
+        if leftover:
+            _ingest_packed(leftover)
+        print("✅ 센서 집계 담당(leader)으로 전환")
+
+    _forwarder = SensorForwarder(port, try_leader)
+    leader_rpc.follow(port + 1)
+    asyncio.create_task(follow())
+    return "follower"
+
+async def stop_shared_aggregation():
+    for server in (_aggregator_server, _rpc_server):
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    leader_rpc.close()
 
 @router.post("/ingest")
 async def ingest(data: SensorIn):
-    now = datetime.now()
+    if _forwarder is not None:
+        _forwarder.send(_record.pack(data.plant_id, data.temp, data.hum, data.light, data.soil))
+        INGEST_READINGS.labels("ingest", "forwarded").inc()
+        return {"status": "ok", "message": "forwarded"}
+
+    INGEST_READINGS.labels("ingest", "local").inc()
+
+    if _spool is not None:
+        _spool.append(np.array([data.plant_id]),
+                      np.array([[data.temp, data.hum, data.light, data.soil]], dtype=np.float32))
     buf = _buffers.get(data.plant_id)
 
     if not buf:
-        _buffers[data.plant_id] = {"start": now, "rows": [data]}
+        buf = _buffers[data.plant_id] = SensorBuffer(datetime.now())
+        buf.append(data.temp, data.hum, data.light, data.soil)
+        _schedule_new((data.plant_id,))
         return {"status": "ok", "message": "buffer created"}
 
-    buf["rows"].append(data)
-    return {"status": "ok", "message": "buffer appended", "count": len(buf["rows"])}
+    buf.append(data.temp, data.hum, data.light, data.soil)
+    return {"status": "ok", "message": "buffer appended", "count": buf.count}
+
+# 일괄 검증용 (리스트 전체를 pydantic-core에서 한 번에 파싱/검증)
+_batch_adapter = TypeAdapter(List[SensorIn])
+
+# 게이트웨이 일괄 전송: /sensor/ingest_batch
+# - Content-Type: application/json          -> [SensorIn, SensorIn, ...]
+# - Content-Type: application/octet-stream  -> PACKED_DTYPE 레코드(20 byte)를 이어붙인 바이너리
+async def _read_batch(request: Request, dtype=np.float32):
+    """
+    일괄 요청 body -> (plant_ids, values, packed) 로 변환 + 검증
+    - packed: 바이너리로 들어온 경우 원본 bytes (아니면 None)
+    - dtype: values 자료형 (버퍼/스풀 저장은 float32, 임계치 판정은 /sensor/analyze와 같게 float64)
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+
+    packed = None
+    if content_type.startswith("application/octet-stream"):
+        if len(body) % PACKED_DTYPE.itemsize:
+            raise RequestValidationError([{
+                "type": "value_error", "loc": ("body",), "input": len(body),
+                "msg": f"바이너리 길이가 레코드 크기({PACKED_DTYPE.itemsize} byte)의 배수가 아닙니다.",
+            }])
+        records = np.frombuffer(body, dtype=PACKED_DTYPE)
+        packed = body
+        plant_ids = records["plant_id"].astype(np.int64)
+        values = np.stack([records["temp"], records["hum"], records["light"], records["soil"]], axis=1)
+    else:
+        try:
+            rows = _batch_adapter.validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+        plant_ids = np.fromiter((r.plant_id for r in rows), dtype=np.int64, count=len(rows))
+        values = np.array([(r.temp, r.hum, r.light, r.soil) for r in rows], dtype=np.float64).reshape(-1, 4)
+    values = values.astype(dtype, copy=False)
+
+    # NaN/inf 값이 섞여 있으면 평균이 깨지므로 묶음 전체를 거절
+    bad = np.flatnonzero(~np.isfinite(values).all(axis=1))
+    if bad.size:
+        raise RequestValidationError([{
+            "type": "value_error", "loc": ("body", int(i)), "input": None,
+            "msg": "센서값이 숫자가 아닙니다(NaN/inf).",
+        } for i in bad[:20].tolist()])
+
+    return plant_ids, values, packed
+
+@router.post("/ingest_batch")
+async def ingest_batch(request: Request):
+    plant_ids, values, packed = await _read_batch(request)
+    INGEST_BATCH_SIZE.observe(len(values))
+
+    if _forwarder is not None:
+        if packed is None:
+            records = np.empty(len(values), dtype=PACKED_DTYPE)
+            records["plant_id"] = plant_ids
+            for i, ch in enumerate(("temp", "hum", "light", "soil")):
+                records[ch] = values[:, i]
+            packed = records.tobytes()
+        _forwarder.send(packed)
+        INGEST_READINGS.labels("ingest_batch", "forwarded").inc(len(values))
+        return {"status": "ok", "count": int(len(values)), "forwarded": True}
+
+    added = _ingest_local(plant_ids, values)
+    INGEST_READINGS.labels("ingest_batch", "local").inc(len(values))
+    return {"status": "ok", "count": int(len(values)), "plants": added}
+
+# 버퍼 상태 확인용 (식물별 개수/메모리 사용량)
+@router.get("/buffers")
+async def buffers_status():
+    plants = {plant_id: buf.report() for plant_id, buf in _buffers.items()}
+    return {
+        "plants": plants,
+        "total_bytes": sum(buf.nbytes for buf in _buffers.values()),
+        "spool": _spool.report() if _spool is not None else None,
+        "forwarder": _forwarder.report() if _forwarder is not None else None,
+    }
+
+def _hourly_payload(plant_id: int, buf: SensorBuffer, now: datetime) -> dict:
+    payload = {
+        "plant_id": plant_id,
+        "start_at": buf.start.strftime("%Y-%m-%d %H:%M:%S"),
+        "end_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+        "count": buf.count,
+    }
+    # 채널별 avg/min/max/std/p5/p50/p95 -> temp_avg, temp_min, ... 형태로 펼치기
+    # (Node 쪽 기존 필드명 유지: light는 lux_*)
+    for ch, st in buf.stats().items():
+        key = "lux" if ch == "light" else ch
+        for name, value in st.items():
+            payload[f"{key}_{name}"] = value
+    return payload
+
+def _restore(plant_id: int, sent: SensorBuffer):
+    """전송 실패한 구간을 현재 버퍼에 다시 합쳐서 RETRY_SECONDS 뒤에 재전송"""
+    buf = _buffers.get(plant_id)
+    if buf is None:
+        _buffers[plant_id] = sent
+    else:
+        buf.merge(sent)
+    _scheduler.schedule(plant_id, datetime.now() + timedelta(seconds=RETRY_SECONDS))
 
-async def flush_hourly_to_node(node_url: str):
+async def _send_one(client: httpx.AsyncClient, node_url: str, sem: asyncio.Semaphore,
+                    plant_id: int, sent: SensorBuffer, payload: dict) -> bool:
+    async with sem:
+        try:
+            resp = await client.post(node_url, json=payload)
+            resp.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"❌ hourly 전송 실패 (plant_id={plant_id}):", e)
+            _restore(plant_id, sent)
+            return False
+
+async def flush_hourly_to_node(node_url: str, client: httpx.AsyncClient,
+                               bulk_url: Optional[str] = None, concurrency: int = 8):
+    """
+    식물별 집계 구간(WINDOW_SECONDS)이 끝날 때마다 센서 통계를 Node 서버로 전송
+    - 가장 빠른 구간 마감 시각까지만 잠들었다가, 마감된 식물만 꺼내서 보냄
+    - client: Main.py 시작 시 만든 커넥션 풀 클라이언트를 재사용 (매번 TCP 연결 X)
+    - bulk_url: 설정하면 전송할 식물 전체를 POST 한 번으로 묶어서 보냄 ({"items": [...]})
+    - concurrency: 식물별 전송 시 동시에 보내는 최대 요청 수
+    """
+    sem = asyncio.Semaphore(concurrency)
     while True:
-        await asyncio.sleep(10)  # 10초마다 체크
+        await _scheduler.wait()
         now = datetime.now()
 
-        for plant_id in list(_buffers.keys()):
-            buf = _buffers[plant_id]
-            start = buf["start"]
-            rows = buf["rows"]
-
-            # ✅ 테스트 빨리 하려면 hours=1을 minutes=1로 잠깐 바꿔도 됨
-            #  if (now - start) >= timedelta(hours=1) and rows:
-            if (now - start) >= timedelta(minutes=1) and rows:
-                n = len(rows)
-                payload = {
-                    "plant_id": plant_id,
-                    "start_at": start.strftime("%Y-%m-%d %H:%M:%S"),
-                    "end_at": now.strftime("%Y-%m-%d %H:%M:%S"),
-                    "temp_avg": sum(r.temp for r in rows) / n,
-                    "hum_avg": sum(r.hum for r in rows) / n,
-                    "lux_avg": sum(r.light for r in rows) / n,
-                    "soil_avg": sum(r.soil for r in rows) / n,
-                }
-                print(payload["lux_avg"])
-                try:
-                    async with httpx.AsyncClient(timeout=10.0) as client:
-                        resp = await client.post(node_url, json=payload)
-                        resp.raise_for_status()
-
-                # 다음 1시간 버퍼로 리셋
-                    _buffers[plant_id] = {"start": now, "rows": []}
-
-                except Exception as e:
-                    print("❌ hourly 전송 실패:", e)
+        if _spool is not None:
+            _spool.sync()
 
-# 분석 경로 설정 /sensor/analyze가 최종 경로
-@router.post("/analyze")
-async def analyze_sensor(data: SensorIn):
-    print(f"데이터 수신 성공: {data}")
+        # 마감된 버퍼는 _buffers에서 빼낸 뒤 보냄
+        # (전송 대기 중에 들어온 센서값은 새 버퍼 = 다음 구간으로 들어감)
+        # upto: 이 구간에 포함된 스풀의 마지막 seq (전송 성공 시 스풀에서 지움)
+        due = []
+        upto = {}
+        for plant_id in _scheduler.pop_due(now.timestamp()):
+            buf = _buffers.pop(plant_id, None)
+            if buf is None or not buf.count:
+                continue
+            due.append((plant_id, buf, _hourly_payload(plant_id, buf, now)))
+            if _spool is not None and plant_id in _spool.last_seq:
+                upto[plant_id] = _spool.last_seq[plant_id]
 
-    # ✅ 임계치(일단 하드코딩) - 나중에 DB에서 불러오면 됨
-    TEMP_MIN = 21
-    TEMP_MAX = 25
-    HUM_MIN = 40
-    HUM_MAX = 70
-    LUX_MIN = 300
-    SOIL_MAX = 3000   # 너 화면에서 WATER 기준치처럼 쓰는 값이 soil이라면 이렇게
+        if not due:
+            continue
 
-    # ✅ 이벤트 판정
-    events = []
+        started = time.perf_counter()
+        failed_count = 0
+        if bulk_url:
+            try:
+                resp = await client.post(bulk_url, json={"items": [p for _, _, p in due]})
+                resp.raise_for_status()
+                results = resp.json().get("results", [])
+                # Node가 건별 결과를 주면 실패한 식물만 되돌림
+                failed = {r.get("plant_id") for r in results if not r.get("success")}
+                for plant_id, sent, _ in due:
+                    if plant_id in failed:
+                        _restore(plant_id, sent)
+                        upto.pop(plant_id, None)
+                        failed_count += 1
+            except Exception as e:
+                print("❌ hourly 묶음 전송 실패:", e)
+                for plant_id, sent, _ in due:
+                    _restore(plant_id, sent)
+                upto.clear()
+                failed_count = len(due)
+        else:
+            # 한 식물이 실패/지연돼도 나머지는 계속 전송
+            ok = await asyncio.gather(*(
+                _send_one(client, node_url, sem, plant_id, sent, payload)
+                for plant_id, sent, payload in due
+            ))
+            for (plant_id, _, _), success in zip(due, ok):
+                if not success:
+                    upto.pop(plant_id, None)
+                    failed_count += 1
 
-    if data.temp < TEMP_MIN:
-        events.append("TEMP_LOW")
-    elif data.temp > TEMP_MAX:
-        events.append("TEMP_HIGH")
+        FLUSH_SECONDS.observe(time.perf_counter() - started)
+        FLUSH_PLANTS.labels("ok").inc(len(due) - failed_count)
+        if failed_count:
+            FLUSH_PLANTS.labels("failed").inc(failed_count)
 
-    if data.hum < HUM_MIN:
-        events.append("HUM_LOW")
-    elif data.hum > HUM_MAX:
-        events.append("HUM_HIGH")
+        if _spool is not None:
+            _spool.commit(upto)
 
-    if data.light < LUX_MIN:
-        events.append("LUX_LOW")
+# 식물별 임계치 테이블 (Node가 PUT /sensor/thresholds로 등록, 파일에도 저장)
+THRESHOLDS_FILE = os.getenv("SENSOR_THRESHOLDS_FILE", "plant_thresholds.json")
+_thresholds = ThresholdTable()
+_thresholds.load_file(THRESHOLDS_FILE)
 
-    if data.soil > SOIL_MAX:
-        events.append("SOIL_HIGH")  # (토양값 의미에 따라 이름은 바꿔도 됨)
+def _bound(name: str):
+    # PLANT_DICT 컬럼명(대문자) / 소문자 둘 다 허용, 없으면 기존 값 유지
+    return Field(None, validation_alias=AliasChoices(name, name.lower()))
 
-    event_occurred = len(events) > 0
-    event_type = events[0] if event_occurred else "NORMAL"  # 일단 1개만 대표로
+# 임계치 1건 규격 (숫자가 아니면 422)
+class ThresholdRow(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
 
-    return {
+    PLANT_ID: int = Field(validation_alias=AliasChoices("PLANT_ID", "plant_id"))
+    TEMP_MIN: Optional[float] = _bound("TEMP_MIN")
+    TEMP_MAX: Optional[float] = _bound("TEMP_MAX")
+    HUM_MIN: Optional[float] = _bound("HUM_MIN")
+    HUM_MAX: Optional[float] = _bound("HUM_MAX")
+    LUX_MIN: Optional[float] = _bound("LUX_MIN")
+    LUX_MAX: Optional[float] = _bound("LUX_MAX")
+    SOIL_MIN: Optional[float] = _bound("SOIL_MIN")
+    SOIL_MAX: Optional[float] = _bound("SOIL_MAX")
+
+def _sync_thresholds():
+    """멀티 워커: 다른 워커가 PUT으로 파일을 바꿨으면 다시 읽음"""
+    if THRESHOLDS_FILE:
+        _thresholds.reload_if_changed(THRESHOLDS_FILE)
+
+@router.put("/thresholds")
+async def put_thresholds(rows: List[ThresholdRow]):
+    """
+    식물별 임계치 등록 (PLANT_DICT 컬럼명 그대로)
+    예) [{"plant_id": 1, "TEMP_MIN": 16, "TEMP_MAX": 20, "HUM_MIN": 40, "HUM_MAX": 70,
+          "LUX_MIN": 800, "LUX_MAX": 10000}]
+    """
+    # 다른 워커가 저장한 내용 위에 덮어써야 파일에서 그 변경이 사라지지 않음
+    _sync_thresholds()
+    count = _thresholds.update([r.model_dump() for r in rows])
+    if THRESHOLDS_FILE:
+        _thresholds.save_file(THRESHOLDS_FILE)
+    return {"status": "ok", "updated": count, "plants": len(_thresholds)}
+
+@router.get("/thresholds/{plant_id}")
+async def get_thresholds(plant_id: int):
+    _sync_thresholds()
+    return {"plant_id": plant_id, **_thresholds.get(plant_id)}
+
+# ✅ 이벤트 알림 방식
+# - "transition"(기본): 상태가 바뀔 때(enter)만 event_occurred=True -> Node의 LLM 호출이 그때만 발생
+# - "raw": 기존처럼 임계치를 넘은 측정마다 event_occurred=True
+EVENT_MODE = os.getenv("SENSOR_EVENT_MODE", "transition")
+_events = EventEngine()
+
+def _describe(plant_id: int, values: np.ndarray, limits: np.ndarray, events: list) -> dict:
+    """
+    판정 결과 -> 응답 필드
+    - events: 이번 측정값 기준으로 임계치를 넘은 이벤트 전체
+    - event_occurred/event_type: 알림을 보낼 대표 이벤트 (대표 이벤트의 센서값/임계치 포함)
+    """
+    if EVENT_MODE == "raw":
+        notify = events
+        extra = {}
+    else:
+        extra = _events.update(plant_id, values, limits)
+        notify = [t["event"] for t in extra["transitions"] if t["kind"] == "enter"]
+
+    event_occurred = len(notify) > 0
+    event_type = notify[0] if event_occurred else "NORMAL"  # 일단 1개만 대표로
+    result = {
         "event_occurred": event_occurred,
         "event_type": event_type,
         "events": events,   # <- 여러 개도 확인 가능
-        "data": data
+        **extra,            # transitions(enter/exit), active(현재 유지 중인 이상 상태)
+    }
+    if event_occurred:
+        ch = EVENT_NAMES.index(event_type) // 2
+        lo, hi = limits[2 * ch], limits[2 * ch + 1]
+        result["sensor_value"] = float(values[ch])
+        result["threshold_min"] = float(lo) if np.isfinite(lo) else None
+        result["threshold_max"] = float(hi) if np.isfinite(hi) else None
+    return result
+
+def _judge(plant_ids: np.ndarray, values: np.ndarray) -> list:
+    """센서값 묶음 판정 -> 건별 {"plant_id", **_describe} (상태 전이는 묶음 안의 순서대로 반영)"""
+    _sync_thresholds()
+    limits = _thresholds.lookup(plant_ids)
+    flags = evaluate(values, limits)
+    return [
+        {"plant_id": plant_id, **_describe(plant_id, values[i], limits[i], events)}
+        for i, (plant_id, events) in enumerate(zip(plant_ids.tolist(), event_lists(flags)))
+    ]
+
+# leader 판정 서버 요청 형식 (float64 그대로 보내서 로컬 판정과 같은 값으로 비교)
+_JUDGE_DTYPE = np.dtype([("plant_id", "<i8"), ("values", "<f8", (4,))])
+
+def _judge_packed(data: bytes) -> bytes:
+    """leader: follower가 보낸 판정 요청 처리 -> JSON 결과"""
+    records = np.frombuffer(data, dtype=_JUDGE_DTYPE)
+    return json.dumps(_judge(records["plant_id"], records["values"])).encode()
+
+leader_rpc.register(b"J", _judge_packed)
+
+async def _judge_shared(plant_ids: np.ndarray, values: np.ndarray) -> list:
+    """이벤트 판정 (follower면 leader에게 맡김 -> 식물별 상태 전이를 한 프로세스에서만 관리)"""
+    records = np.empty(len(values), dtype=_JUDGE_DTYPE)
+    records["plant_id"] = plant_ids
+    records["values"] = values
+    reply = await leader_rpc.call(b"J", records.tobytes())
+    if reply is None:
+        return _judge(plant_ids, values)
+    return json.loads(reply)
+
+# 분석 경로 설정 /sensor/analyze가 최종 경로
+@router.post("/analyze")
+async def analyze_sensor(data: SensorIn):
+    print(f"데이터 수신 성공: {data}")
+
+    # ✅ 식물별 임계치로 이벤트 판정 (등록 안 된 식물은 기본 임계치)
+    values = np.array([[data.temp, data.hum, data.light, data.soil]], dtype=np.float64)
+    result = (await _judge_shared(np.array([data.plant_id], dtype=np.int64), values))[0]
+    del result["plant_id"]
+
+    return {**result, "data": data}
+
+# 여러 건 한 번에 판정: /sensor/analyze_batch (body 형식은 /sensor/ingest_batch와 동일)
+# - 반환 results[i]는 /sensor/analyze 응답과 같은 필드 (data 대신 plant_id)
+# - 상태 전이는 요청 안의 순서대로 반영
+@router.post("/analyze_batch")
+async def analyze_sensor_batch(request: Request):
+    plant_ids, values, _ = await _read_batch(request, dtype=np.float64)
+    results = await _judge_shared(plant_ids, values)
+    return {
+        "count": len(results),
+        "event_count": sum(r["event_occurred"] for r in results),
+        "results": results,
     }
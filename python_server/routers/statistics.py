@@ -1,83 +1,174 @@
 # 데이터 통계 라우터
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, Dict, List, Literal, Optional, Union
+import json
 import pandas as pd
-from datetime import datetime
+
+from services.plant_stats import compute_fleet_stats, compute_stats, frame_from_arrow
+from services.stats_cache import StatsCache
+from services import leader_rpc
 
 router = APIRouter()
 
+# 식물별 증분 통계 캐시 (plant_id를 보낸 요청만 사용, services/stats_cache.py)
+# - uvicorn --workers N(SENSOR_AGGREGATOR_PORT): 캐시는 센서 집계 담당(leader) 워커에만 있음
+#   follower가 받은 /stats 요청은 파싱하지 않고 본문 그대로 leader에게 보내서 처리 (워커마다 cursor가 달라 409가 나지 않게)
+#   (plant_id가 있는지는 본문을 파싱해야 알 수 있으므로 follower는 전부 보냄, /fleet는 상태가 없으므로 받은 워커가 직접 계산)
+_stats_cache = StatsCache()
+
 # 데이터 규격 정의 (Node에서 보내주는 데이터 형태)
-class StatsRequest(BaseModel):
-    hourly: List[dict]
-    events: List[dict]
-
-@router.post("/stats")
-async def analyze_stats(data: StatsRequest):
-    # 1. 데이터를 Pandas DataFrame으로 변환
-    df_hourly = pd.DataFrame(data.hourly)
-    df_events = pd.DataFrame(data.events)
-    # print("--- 관수 데이터 디버깅 ---")
-    # print("전체 이벤트 개수:", len(df_events))
-
-    # 2. 온습도 데이터
-    if not df_hourly.empty: # 값이 하나라도 있다면 True 반환
-        # 시간 형식으로 확실히 변환 (문자열 방지)
-        df_hourly['CREATED_AT'] = pd.to_datetime(df_hourly['CREATED_AT'])
-        # 과거(오전) -> 현재(오후) 순서로 정렬
-        df_hourly = df_hourly.sort_values(by='CREATED_AT', ascending=True)        # 결측치 처리 ( interpolate(method='linear')> 중간에 빈 값 채우기 : 선형 방식)
-        for col in ['TEMP_AVG', 'HUM_AVG', 'LIGHT_AVG']:
-            df_hourly[col] = df_hourly[col].interpolate(method='linear').fillna(0)    
-    
-    # 3. 관수 통계 분석 (WATER_DROP_DETECTED)
-    # 날짜 형식 변환
-    # str > datetime 객체로 변환, dt 접근자를 통해 효과적인 분석 및 관리 가능
-    # print("현재 컬럼들:", df_events.columns)
-    df_events['EVENT_DATE'] = pd.to_datetime(df_events['EVENT_DATE'])
-    now = datetime.now()
-
-    # 물 준 이벤트만 필터링 및 날짜순 정렬
-    water_df = df_events[df_events['EVENT_TYPE'] == 'WATER_DROP_DETECTED'].copy()
-    water_df = water_df.sort_values(by='EVENT_DATE')
-    # print("물준 이벤트:", water_df)
-
-    # (1) 평균 관수 주기 계산 (전체 기록 대상)
-    # diff() : 차이 계산, dt.days : 날짜로 변환(숫자)
-    intervals = water_df['EVENT_DATE'].diff().dt.days.dropna()
-    avg_water_interval = intervals.mean() if not intervals.empty else 0
-
-    # (2) 이번 달 총 횟수 계산
-    this_month_df = water_df[water_df['EVENT_DATE'].dt.month == now.month]
-    total_count_this_month = len(this_month_df)
-
-    # (3) 주차별 횟수 계산 (1주차~4주차)
-    # (d.day - 1) // 7 + 1 로직으로 월별 주차 계산
-    this_month_df['week_of_month'] = this_month_df['EVENT_DATE'].apply(lambda d: (d.day - 1) // 7 + 1)
-    
-    weekly_counts = []
-    for i in range(1, 5):
-        count = len(this_month_df[this_month_df['week_of_month'] == i])
-        weekly_counts.append({"label": f"{i}주차", "value": count})
-
-
-    # 4. 분석 결과 조립
-    result = {
-        # 그래프용 라벨 (HH:MM)
-        "labels": df_hourly['CREATED_AT'].apply(lambda x: str(x)[11:16]).tolist() if not df_hourly.empty else [],
-        "temp_data": df_hourly['TEMP_AVG'].tolist() if not df_hourly.empty else [],
-        "hum_data": df_hourly['HUM_AVG'].tolist() if not df_hourly.empty else [],
-        "light_data": df_hourly['LIGHT_AVG'].tolist() if not df_hourly.empty else [],
-        
-        # 디자인 시안 하단 수치들
-        "analysis": {
-            "avg_temp": round(df_hourly['TEMP_AVG'].mean(), 1) if not df_hourly.empty else 0,
-            "avg_hum": round(df_hourly['HUM_AVG'].mean(), 1) if not df_hourly.empty else 0,
-            "avg_light": int(df_hourly['LIGHT_AVG'].mean()) if not df_hourly.empty else 0,
-            
-            "water_avg_interval": round(avg_water_interval, 1),  # 평균 주기
-            "water_total_month": total_count_this_month,         # 이번 달
-            "water_weekly": weekly_counts                        # 주차별 횟수 리스트
-        }
-    }
-
-    return result
\ No newline at end of file
+# - 행 형식: [{"CREATED_AT": ..., "TEMP_AVG": ...}, ...] (기존)
+# - 컬럼 형식: {"CREATED_AT": [...], "TEMP_AVG": [...]} -> 행마다 dict를 검증/생성하지 않고 컬럼 그대로 DataFrame
+# - plant_id (선택): 식물별 캐시 사용 -> 처음엔 전체 이력, 이후엔 응답의 cursor와 그 이후 행만 보냄
+# - resolution / points / days (선택): 긴 기간 그래프용 다운샘플링 (services/stats_rollup.py)
+#   resolution: raw(시간별 그대로) / hour / day / week(롤업 평균), points: 최대 점 수(LTTB), days: 최근 N일
+class StatsOptions(BaseModel):
+    plant_id: Optional[int] = None
+    cursor: Optional[Dict[str, Optional[str]]] = None
+    resolution: Optional[Literal["raw", "hour", "day", "week"]] = None
+    points: Optional[int] = Field(None, ge=3, le=10000)
+    days: Optional[int] = Field(None, ge=1)
+
+class StatsRequest(StatsOptions):
+    hourly: Union[List[dict], Dict[str, List[Any]]]
+    events: Union[List[dict], Dict[str, List[Any]]]
+
+# 여러 식물 한 번에 (/fleet): hourly / events 모두 PLANT_ID 컬럼 포함
+# - series=False면 그래프 시리즈 없이 analysis + 순위만 (목록 화면용)
+class FleetOptions(BaseModel):
+    series: bool = True
+
+class FleetRequest(FleetOptions):
+    hourly: Union[List[dict], Dict[str, List[Any]]]
+    events: Union[List[dict], Dict[str, List[Any]]]
+
+async def _read_frames(request: Request, options_model=StatsOptions, body_model=StatsRequest):
+    """
+    요청 본문 -> (df_hourly, df_events, 옵션)
+    - application/json: body_model (행 형식 / 컬럼 형식)
+    - multipart/form-data: hourly / events 파트에 Arrow IPC (stream 또는 file) -> 그대로 DataFrame (pyarrow 필요)
+      options_model 항목은 일반 폼 필드 (cursor는 JSON 문자열)
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        try:
+            frames = []
+            for name in ("hourly", "events"):
+                part = form.get(name)
+                frames.append(frame_from_arrow(await part.read() if hasattr(part, "read") else b""))
+        except RuntimeError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+        except Exception as e:  # 잘못된 Arrow 데이터
+            raise HTTPException(status_code=422, detail=f"Arrow 데이터를 읽을 수 없습니다: {e}")
+        finally:
+            await form.close()
+        fields = {k: v for k, v in form.items() if k in options_model.model_fields and isinstance(v, str) and v}
+        try:
+            if "cursor" in fields:
+                fields["cursor"] = json.loads(fields["cursor"])
+            options = options_model.model_validate(fields)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"cursor 형식 오류: {e}")
+        return frames[0], frames[1], options
+
+    try:
+        data = body_model.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    try:
+        return pd.DataFrame(data.hourly), pd.DataFrame(data.events), data
+    except ValueError as e:  # 컬럼 형식에서 컬럼 길이가 다름
+        raise HTTPException(status_code=422, detail=str(e))
+
+_ARROW_PARTS = {
+    "hourly": {"type": "string", "format": "binary", "description": "Arrow IPC"},
+    "events": {"type": "string", "format": "binary", "description": "Arrow IPC"},
+}
+
+def _stats(df_hourly: pd.DataFrame, df_events: pd.DataFrame, options: StatsOptions) -> dict:
+    """온습도 정리 + 관수 통계 (services/plant_stats.py, 행 단위 apply 없이 컬럼 연산)"""
+    chart = {"resolution": options.resolution, "points": options.points, "days": options.days}
+    if options.plant_id is None:
+        return compute_stats(df_hourly, df_events, **chart)
+
+    # 식물별 캐시: 새 행만 누적 (services/stats_cache.py)
+    plant = _stats_cache.update(options.plant_id, options.cursor, df_hourly, df_events)
+    if plant is None:
+        # 캐시가 없거나(서버 재시작) cursor가 다름 -> Node가 cursor 없이 전체 이력을 다시 보내야 함
+        raise HTTPException(status_code=409, detail="통계 캐시가 없습니다. cursor 없이 전체 데이터를 다시 보내주세요.")
+    return {**plant.stats(**chart), "cursor": plant.cursor()}
+
+# leader 요청 형식: content-type + "\n" + 요청 본문 그대로 -> 응답: {"status": 200, "body": ...} 또는 {"status", "detail"}
+def _replayed_request(data: bytes) -> Request:
+    content_type, _, body = data.partition(b"\n")
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "headers": [(b"content-type", content_type)]}
+    return Request(scope, receive)
+
+async def _stats_on_leader(data: bytes) -> bytes:
+    """leader: follower가 보낸 /stats 요청 처리"""
+    try:
+        df_hourly, df_events, options = await _read_frames(_replayed_request(data))
+        reply = {"status": 200, "body": _stats(df_hourly, df_events, options)}
+    except HTTPException as e:
+        reply = {"status": e.status_code, "detail": e.detail}
+    return json.dumps(reply, ensure_ascii=False).encode()
+
+def _reset_on_leader(data: bytes) -> bytes:
+    return json.dumps(_stats_cache.reset(int(data))).encode()
+
+leader_rpc.register(b"S", _stats_on_leader)
+leader_rpc.register(b"D", _reset_on_leader)
+
+@router.post("/stats", openapi_extra={"requestBody": {"content": {
+    "application/json": {"schema": StatsRequest.model_json_schema()},
+    "multipart/form-data": {"schema": {"type": "object", "properties": {
+        **_ARROW_PARTS,
+        "plant_id": {"type": "integer"},
+        "cursor": {"type": "string", "description": "이전 응답의 cursor (JSON)"},
+        "resolution": {"type": "string", "enum": ["raw", "hour", "day", "week"]},
+        "points": {"type": "integer", "minimum": 3, "maximum": 10000},
+        "days": {"type": "integer", "minimum": 1},
+    }}},
+}}})
+async def analyze_stats(request: Request):
+    # 1. follower면 본문 그대로 leader에게 (파싱/계산 모두 leader가 처리)
+    content_type = request.headers.get("content-type", "").encode("latin-1")
+    reply = await leader_rpc.call(b"S", content_type + b"\n" + await request.body())
+    if reply is not None:
+        reply = json.loads(reply)
+        if reply["status"] != 200:
+            raise HTTPException(status_code=reply["status"], detail=reply["detail"])
+        return reply["body"]
+
+    # 2. 데이터를 Pandas DataFrame으로 변환 (행 형식 / 컬럼 형식 JSON / Arrow)
+    df_hourly, df_events, options = await _read_frames(request)
+
+    # 3. 통계 계산 (plant_id가 있으면 식물별 캐시)
+    return _stats(df_hourly, df_events, options)
+
+@router.delete("/stats/{plant_id}")
+async def reset_stats(plant_id: int):
+    # 데이터를 수정/삭제했을 때 캐시 삭제 (다음 요청은 전체 이력으로 다시 계산)
+    reply = await leader_rpc.call(b"D", str(plant_id).encode())
+    deleted = _stats_cache.reset(plant_id) if reply is None else json.loads(reply)
+    return {"plant_id": plant_id, "deleted": deleted}
+
+@router.post("/fleet", openapi_extra={"requestBody": {"content": {
+    "application/json": {"schema": FleetRequest.model_json_schema()},
+    "multipart/form-data": {"schema": {"type": "object", "properties": {**_ARROW_PARTS, "series": {"type": "boolean"}}}},
+}}})
+async def analyze_fleet(request: Request):
+    # 여러 식물의 통계를 한 번에 (식물마다 /stats를 호출하고 DataFrame을 만드는 대신 묶어서 계산)
+    df_hourly, df_events, options = await _read_frames(request, FleetOptions, FleetRequest)
+    try:
+        return compute_fleet_stats(df_hourly, df_events, series=options.series)
+    except ValueError as e:  # PLANT_ID 컬럼 없음
+        raise HTTPException(status_code=422, detail=str(e))
@@ -0,0 +1,155 @@
+# python_server/services/analysis_cache.py
+# ✅ 역할: 식물 키 분석 결과 캐시 (같은 사진을 다시 분석하지 않음)
+# - Node 재시도, /analyze와 /image/analyze 중복 호출, 대시보드 재요청 등으로 같은 사진이 여러 번 들어옴
+# - 키 = blake2b(이미지 bytes + 분석 파라미터(pixels_per_cm, roi_ratio, min_area_ratio, downscale, HSV 범위))
+#   -> 파일 이름/경로가 달라도 내용이 같으면 같은 결과
+# - 1단계: 메모리 LRU (max_entries개)
+# - 2단계: 디스크 (cache_dir/ab/abcdef....json, 전체 용량 max_disk_bytes 넘으면 오래된 것부터 삭제)
+#   -> 서버 재시작 / uvicorn 워커 여러 개여도 같이 사용
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from services import metrics
+
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "4096"))
+# 디스크 캐시 폴더 (빈 값이면 메모리만 사용)
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", "analysis_cache")
+ANALYSIS_CACHE_DISK_BYTES = int(os.getenv("ANALYSIS_CACHE_DISK_BYTES", str(64 * 1024 * 1024)))
+
+CACHE_LOOKUPS = metrics.Counter("image_cache_lookups_total", "분석 결과 캐시 조회 결과", ("result",))
+_HIT_MEMORY = CACHE_LOOKUPS.labels("memory")
+_HIT_DISK = CACHE_LOOKUPS.labels("disk")
+_MISS = CACHE_LOOKUPS.labels("miss")
+
+
+def cache_key(image_bytes, params: dict) -> str:
+    """이미지 내용 + 분석 파라미터 해시 (params 순서와 무관)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(memoryview(image_bytes))
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_SIZE, cache_dir: str = ANALYSIS_CACHE_DIR,
+                 max_disk_bytes: int = ANALYSIS_CACHE_DISK_BYTES):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # { key: 결과 } (뒤쪽이 최근 사용)
+        self._files = OrderedDict()   # { key: 파일 크기 } (앞쪽이 오래된 것)
+        self.disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if cache_dir:
+            self._scan()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _scan(self) -> None:
+        """시작 시 디스크에 남아 있는 캐시 파일 목록 복구 (수정 시각 순)"""
+        entries = []
+        if os.path.isdir(self.cache_dir):
+            for shard in os.scandir(self.cache_dir):
+                if not shard.is_dir():
+                    continue
+                for f in os.scandir(shard.path):
+                    if f.name.endswith(".json"):
+                        st = f.stat()
+                        entries.append((st.st_mtime, f.name[:-5], st.st_size))
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+            self.disk_bytes += size
+        self._evict_disk()
+
+    def get(self, key: str):
+        """저장된 결과 반환 (없으면 None)"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            _HIT_MEMORY.inc()
+            return self._memory[key]
+
+        # 다른 워커 프로세스가 저장한 파일일 수도 있으므로 목록에 없어도 열어봄
+        if self.cache_dir:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    value = json.load(f)
+            except FileNotFoundError:
+                self.disk_bytes -= self._files.pop(key, 0)
+            except (OSError, ValueError):
+                self._drop_file(key)
+            else:
+                if key not in self._files:
+                    self._files[key] = os.path.getsize(self._path(key))
+                    self.disk_bytes += self._files[key]
+                self._files.move_to_end(key)
+                self._remember(key, value)
+                self.disk_hits += 1
+                _HIT_DISK.inc()
+                return value
+
+        self.misses += 1
+        _MISS.inc()
+        return None
+
+    def put(self, key: str, value) -> None:
+        self._remember(key, value)
+        if not self.cache_dir or key in self._files:
+            return
+        path = self._path(key)
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("⚠️ 분석 캐시 저장 실패:", e)
+            return
+        self._files[key] = len(data)
+        self.disk_bytes += len(data)
+        self._evict_disk()
+
+    def _remember(self, key: str, value) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _drop_file(self, key: str) -> None:
+        self.disk_bytes -= self._files.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict_disk(self) -> None:
+        while self._files and self.disk_bytes > self.max_disk_bytes:
+            self._drop_file(next(iter(self._files)))
+            self.evictions += 1
+
+    def report(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._files),
+            "disk_bytes": self.disk_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+        }
+
+
+# 서버 전체에서 공유하는 캐시
+analysis_cache = AnalysisCache()
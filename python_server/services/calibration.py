@@ -0,0 +1,190 @@
+# python_server/services/calibration.py
+# ✅ 역할: 카메라(기기)별 분석 파라미터 보정
+# - 기본 HSV 범위(LOWER_GREEN/UPPER_GREEN)와 pixels_per_cm(55), 5x5 커널은 특정 조명/거리 기준 고정값
+#   -> 기기마다 기준 사진 1장(식물 + 크기를 아는 정사각형 마커)으로 다시 계산해서 저장
+# - pixels_per_cm: 마커(기본: 자홍색 2cm 정사각형 스티커) 한 변의 픽셀 길이 / 실제 길이
+# - HSV 범위: 기준 사진의 초록 영역(넓은 범위로 1차 검출) 분포의 백분위수 + 여유값
+# - 커널 크기: 약 1mm에 해당하는 픽셀 수 (55px/cm면 5x5)
+# - 저장: JSON 파일 { device_id: {...} } + 메모리 (분석 요청마다 dict 조회 1번)
+#   uvicorn --workers N: 다른 워커가 보정/삭제하면 파일의 (mtime, size)만 보고 다시 읽음 (reload_if_changed)
+
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from services.image_buffers import map_file
+
+# 마커 색상 HSV 범위 (식물/흙과 겹치지 않는 색)
+MARKER_LOWER = (140, 80, 80)
+MARKER_UPPER = (170, 255, 255)
+MARKER_SIZE_CM = 2.0
+
+# 1차 초록 검출용 넓은 범위 (여기서 실제 분포를 보고 좁힘)
+_WIDE_LOWER = (25, 25, 25)
+_WIDE_UPPER = (95, 255, 255)
+_HUE_MARGIN = 6
+_SV_MARGIN = 20
+# 보정에 필요한 최소 초록 픽셀 수
+_MIN_GREEN_PIXELS = 500
+# 커널 1칸 = 약 0.1cm
+_KERNEL_CM = 0.09
+
+
+def _odd(n: float) -> int:
+    return max(1, int(round(n)) | 1)
+
+
+def calibrate(image_bytes, marker_size_cm: float = MARKER_SIZE_CM, marker_lower=MARKER_LOWER,
+              marker_upper=MARKER_UPPER, roi_ratio: float = 0.7) -> dict:
+    """
+    기준 사진 -> {"pixels_per_cm", "lower_hsv", "upper_hsv", "kernel_size", "marker_px", "green_pixels"}
+    - 마커나 초록 영역을 못 찾으면 ValueError (메시지 그대로 응답에 사용)
+    """
+    if marker_size_cm <= 0:
+        raise ValueError("marker_size_cm는 0보다 커야 합니다.")
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("이미지를 읽을 수 없습니다.")
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+
+    # 1) 마커 -> pixels_per_cm (가장 큰 마커색 영역의 최소 외접 사각형)
+    marker = cv2.inRange(hsv, np.array(marker_lower, np.uint8), np.array(marker_upper, np.uint8))
+    contours, _ = cv2.findContours(marker, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        raise ValueError("마커를 찾지 못했습니다. (마커 색/범위 확인)")
+    largest = max(contours, key=cv2.contourArea)
+    (_, _), (mw, mh), _ = cv2.minAreaRect(largest)
+    if min(mw, mh) < 8:
+        raise ValueError(f"마커가 너무 작습니다. ({mw:.0f}x{mh:.0f}px)")
+    if min(mw, mh) / max(mw, mh) < 0.6:
+        raise ValueError(f"마커가 정사각형으로 보이지 않습니다. ({mw:.0f}x{mh:.0f}px, 정면에서 촬영 필요)")
+    marker_px = float(np.sqrt(mw * mh))
+    pixels_per_cm = marker_px / float(marker_size_cm)
+
+    # 2) 초록 영역 -> HSV 범위 (분석과 같은 중앙 ROI, 마커 픽셀 제외)
+    H, W = hsv.shape[:2]
+    if 0.0 < roi_ratio < 1.0:
+        rw, rh = int(W * roi_ratio), int(H * roi_ratio)
+        x0, y0 = (W - rw) // 2, (H - rh) // 2
+        hsv, marker = hsv[y0:y0 + rh, x0:x0 + rw], marker[y0:y0 + rh, x0:x0 + rw]
+    wide = cv2.inRange(hsv, np.array(_WIDE_LOWER, np.uint8), np.array(_WIDE_UPPER, np.uint8))
+    wide[marker > 0] = 0
+    # 넓은 범위에는 배경 잡음도 섞이므로 가장 큰 덩어리(식물) 안의 픽셀만 사용
+    k = _odd(pixels_per_cm * _KERNEL_CM)
+    opened = cv2.morphologyEx(wide, cv2.MORPH_OPEN, np.ones((k, k), np.uint8))
+    contours, _ = cv2.findContours(opened, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        raise ValueError("초록 영역을 찾지 못했습니다.")
+    plant = np.zeros_like(wide)
+    cv2.drawContours(plant, [max(contours, key=cv2.contourArea)], -1, 255, cv2.FILLED)
+    green = hsv[(plant > 0) & (wide > 0)]
+    if len(green) < _MIN_GREEN_PIXELS:
+        raise ValueError(f"초록 영역이 너무 작습니다. ({len(green)}px)")
+
+    h_lo, h_hi = np.percentile(green[:, 0], (2, 98))
+    s_lo, v_lo = np.percentile(green[:, 1], 2), np.percentile(green[:, 2], 2)
+    lower = (int(max(0, h_lo - _HUE_MARGIN)), int(max(0, s_lo - _SV_MARGIN)), int(max(0, v_lo - _SV_MARGIN)))
+    upper = (int(min(179, h_hi + _HUE_MARGIN)), 255, 255)
+
+    return {
+        "pixels_per_cm": round(pixels_per_cm, 3),
+        "lower_hsv": lower,
+        "upper_hsv": upper,
+        "kernel_size": k,
+        "marker_px": round(marker_px, 1),
+        "green_pixels": int(len(green)),
+    }
+
+
+def calibrate_file(file_path: str, **kwargs) -> dict:
+    """파일 경로로 보정 (프로세스 풀 워커에서 실행)"""
+    with map_file(file_path) as view:
+        return calibrate(view, **kwargs)
+
+
+class CalibrationStore:
+    """기기별 보정값 (JSON 파일 + 메모리)"""
+
+    def __init__(self):
+        self._devices = {}  # { device_id: {"pixels_per_cm", "lower_hsv", "upper_hsv", "kernel_size", ...} }
+        self._params = {}   # { device_id: 분석 함수에 바로 넘길 파라미터 } (요청마다 새로 만들지 않음)
+        self._file_key = None  # 마지막으로 읽거나 쓴 파일의 (mtime, size)
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def get(self, device_id: str):
+        return self._devices.get(device_id)
+
+    def params(self, device_id: str) -> dict:
+        """분석 파라미터 (pixels_per_cm / lower_hsv / upper_hsv / kernel_size / retry_full), 보정 안 된 기기는 빈 dict"""
+        return self._params.get(device_id, {}) if device_id else {}
+
+    def set(self, device_id: str, values: dict) -> dict:
+        record = {
+            "pixels_per_cm": float(values["pixels_per_cm"]),
+            "lower_hsv": [int(v) for v in values["lower_hsv"]],
+            "upper_hsv": [int(v) for v in values["upper_hsv"]],
+            "kernel_size": int(values.get("kernel_size") or 5),
+            "updated_at": values.get("updated_at") or time.time(),
+        }
+        for k in ("marker_px", "green_pixels"):
+            if k in values:
+                record[k] = values[k]
+        self._devices[device_id] = record
+        self._params[device_id] = {
+            "pixels_per_cm": record["pixels_per_cm"],
+            "lower_hsv": tuple(record["lower_hsv"]),
+            "upper_hsv": tuple(record["upper_hsv"]),
+            "kernel_size": record["kernel_size"],
+            # 보정된 기기는 HSV 범위가 맞춰져 있으므로 축소본에서 못 찾으면 식물이 없는 것으로 봄
+            "retry_full": False,
+        }
+        return record
+
+    def remove(self, device_id: str) -> bool:
+        self._params.pop(device_id, None)
+        return self._devices.pop(device_id, None) is not None
+
+    def load_file(self, path: str) -> int:
+        if not path or not os.path.exists(path):
+            return 0
+        key = _file_key(path)
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        for device_id, values in rows.items():
+            self.set(device_id, values)
+        self._file_key = key
+        return len(rows)
+
+    def reload_if_changed(self, path: str) -> bool:
+        """
+        다른 프로세스가 파일을 바꿨으면 보정값을 파일 내용으로 교체
+        - uvicorn --workers N: POST /image/calibrate, DELETE는 워커 하나에만 도착하므로
+          나머지 워커는 분석 전에 파일의 (mtime, size)만 확인해서 다시 읽음
+        """
+        key = _file_key(path)
+        if key is None or key == self._file_key:
+            return False
+        fresh = CalibrationStore()
+        fresh.load_file(path)
+        self._devices, self._params, self._file_key = fresh._devices, fresh._params, fresh._file_key
+        return True
+
+    def save_file(self, path: str) -> None:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._devices, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        self._file_key = _file_key(path)
+
+
+def _file_key(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
@@ -0,0 +1,137 @@
+# python_server/services/debug_writer.py
+# ✅ 역할: 디버그 이미지 저장을 요청 처리와 분리 (백그라운드 스레드)
+# - 분석 함수는 저장할 데이터만 큐에 넣고 바로 반환 -> PNG 인코딩/디스크 쓰기는 writer 스레드가 처리
+# - DEBUG_SAMPLE_EVERY=N: N번에 1번만 저장 (1이면 매번)
+# - DEBUG_MAX_BYTES: 디버그 폴더 전체 용량 상한, 넘으면 오래된 파일부터 삭제(rotation)
+# - 큐가 가득 차면(디스크가 느릴 때) 기다리지 않고 이번 건은 버림
+#
+# 프로세스 풀 워커는 저장할 데이터만 돌려주고 writer는 서버 프로세스에만 둠 (routers/image.py run_analysis)
+# - 워커마다 writer가 있으면 샘플링/용량 상한이 워커 수만큼 늘어나고,
+#   워커는 os._exit로 끝나서 atexit flush가 안 돌아 큐에 남은 이미지가 사라짐
+# (스레드는 처음 submit될 때 시작, 서버 종료 시 Main.py에서 flush)
+
+import atexit
+import logging
+import os
+import queue
+import threading
+
+DEBUG_SAMPLE_EVERY = max(1, int(os.getenv("DEBUG_SAMPLE_EVERY", "1")))
+DEBUG_MAX_BYTES = int(os.getenv("DEBUG_MAX_BYTES", str(200 * 1024 * 1024)))
+DEBUG_QUEUE_SIZE = int(os.getenv("DEBUG_QUEUE_SIZE", "32"))
+# PNG 압축 레벨 0~9 (기본 1: 파일은 조금 크지만 인코딩이 몇 배 빠름)
+DEBUG_PNG_COMPRESSION = int(os.getenv("DEBUG_PNG_COMPRESSION", "1"))
+
+logger = logging.getLogger(__name__)
+
+# 다른 프로세스(uvicorn --workers N)가 쓴 파일도 반영하려고 N건마다 폴더를 다시 훑음
+_RESCAN_EVERY = 50
+
+
+class DebugWriter:
+    def __init__(self, max_bytes: int = DEBUG_MAX_BYTES, sample_every: int = DEBUG_SAMPLE_EVERY,
+                 queue_size: int = DEBUG_QUEUE_SIZE):
+        self.max_bytes = max_bytes
+        self.sample_every = sample_every
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._seen = 0
+        self._files = {}  # { debug_dir: [(mtime, path, size), ...] } 오래된 순
+        self._writes = 0
+        self.written = 0
+        self.dropped = 0
+
+    def sample(self) -> bool:
+        """이번 요청을 저장할 차례인지 (N번에 1번)"""
+        with self._lock:
+            self._seen += 1
+            return (self._seen - 1) % self.sample_every == 0
+
+    def submit(self, debug_dir: str, fn, *args, **kwargs) -> bool:
+        """
+        fn(*args, **kwargs)를 writer 스레드에서 실행 (fn은 저장한 파일 경로 리스트를 반환)
+        - 넘기는 배열은 호출한 쪽에서 이후에 수정하지 않아야 함 (복사 없이 그대로 넘김)
+        """
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="debug-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+        try:
+            self._queue.put_nowait((debug_dir, fn, args, kwargs))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """큐에 남은 저장 작업이 끝날 때까지 대기 (서버 종료/테스트용)"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        try:
+            self._queue.put((None, done.set, (), {}), timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            debug_dir, fn, args, kwargs = self._queue.get()
+            try:
+                paths = fn(*args, **kwargs) or []
+                if debug_dir is not None:
+                    self.written += len(paths)
+                    self._rotate(debug_dir, paths)
+            except Exception as e:
+                logger.warning("⚠️ debug 저장 실패: %s", e)
+
+    def _scan(self, debug_dir: str) -> list:
+        files = []
+        for entry in os.scandir(debug_dir):
+            if entry.is_file():
+                st = entry.stat()
+                files.append((st.st_mtime, entry.path, st.st_size))
+        files.sort()
+        return files
+
+    def _rotate(self, debug_dir: str, new_paths: list) -> None:
+        """폴더 용량이 max_bytes를 넘으면 오래된 파일부터 삭제"""
+        self._writes += 1
+        files = self._files.get(debug_dir)
+        if files is None or self._writes % _RESCAN_EVERY == 0:
+            files = self._files[debug_dir] = self._scan(debug_dir)
+        else:
+            for path in new_paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, path, st.st_size))
+
+        total = sum(size for _, _, size in files)
+        removed = 0
+        while files[removed:] and total > self.max_bytes:
+            _, path, size = files[removed]
+            removed += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        if removed:
+            del files[:removed]
+
+    def report(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "sample_every": self.sample_every,
+        }
+
+
+# 프로세스마다 1개 (서버에서는 서버 프로세스의 것만 씀, 워커는 run_analysis로 데이터만 돌려줌)
+debug_writer = DebugWriter()
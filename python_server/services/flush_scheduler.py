@@ -0,0 +1,64 @@
+# python_server/services/flush_scheduler.py
+# ✅ 역할: "마감 시각(deadline)" 기준 스케줄러
+# - 식물별 집계 구간이 끝나는 시각을 힙(heap)에 넣어두고
+# - 가장 빠른 마감 시각까지만 잠들었다가 깨어남 (할 일 없을 때 전체 식물을 훑지 않음)
+# - 더 빠른 마감이 새로 들어오면 바로 깨워서 다시 잠드는 시간을 계산
+
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta
+
+
+def window_end(start: datetime, window_seconds: int) -> datetime:
+    """
+    start가 속한 구간의 끝 시각 (자정 기준 window_seconds 단위로 정렬)
+    예) 1시간 구간이면 13:42 -> 14:00, 10분 구간이면 13:42 -> 13:50
+    """
+    midnight = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    elapsed = (start - midnight).total_seconds()
+    return midnight + timedelta(seconds=(elapsed // window_seconds + 1) * window_seconds)
+
+
+class DeadlineScheduler:
+    def __init__(self):
+        self._heap = []        # [(deadline_ts, key), ...]
+        self._deadlines = {}   # { key: 현재 유효한 deadline_ts } (힙에 남은 옛 항목은 무시)
+        self._wakeup = asyncio.Event()
+
+    def __contains__(self, key) -> bool:
+        return key in self._deadlines
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, key, deadline: datetime) -> None:
+        """key의 마감 시각을 등록(이미 있으면 교체)"""
+        ts = deadline.timestamp()
+        self._deadlines[key] = ts
+        heapq.heappush(self._heap, (ts, key))
+        if self._heap[0][1] == key:
+            self._wakeup.set()  # 가장 빠른 마감이 바뀌었으면 대기 중인 루프를 깨움
+
+    def pop_due(self, now: float = None) -> list:
+        """마감 시각이 지난 key 목록을 꺼냄"""
+        now = time.time() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            ts, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == ts:
+                del self._deadlines[key]
+                due.append(key)
+        return due
+
+    async def wait(self) -> None:
+        """가장 빠른 마감 시각까지 대기 (중간에 더 빠른 마감이 들어오면 다시 계산)"""
+        while True:
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            if delay is not None and delay <= 0:
+                return
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                return
@@ -0,0 +1,218 @@
+# python_server/services/growth_tracker.py
+# ✅ 역할: 식물별 사진 이력으로 키 변화(성장) 추적
+# - 식물마다 직전 사진에서 찾은 식물 영역(bbox)을 기억 -> 다음 사진은 그 주변(search_rect)만 분석
+#   (HSV 변환/마스크/컨투어를 전체 ROI가 아니라 작은 영역에서만 함, 못 찾으면 analyze 쪽에서 중앙 ROI로 재분석)
+# - 사진마다 조명 때문에 튀는 키를 칼만 필터(키 + 하루 성장 속도)로 보정
+#   예측과 너무 다른 값(3σ 밖)은 이상치로 보고 반영 안 함 (연속 GROWTH_RESET_AFTER번이면 실제 변화로 보고 다시 시작)
+# - 결과: 사진별 (시각, 측정 키, 보정 키, 성장 속도 cm/day) 시계열
+# - 상태는 메모리에 두고 JSON 파일에도 저장 (서버 재시작 후에도 이어서 추적, routers/image.py)
+#   저장할 때는 바뀐 식물만 다시 인코딩 (나머지는 직전 저장 때 만든 JSON 문자열 재사용)
+
+import json
+import os
+import time
+from collections import deque
+
+# 식물당 보관할 측정 이력 개수
+GROWTH_HISTORY = int(os.getenv("GROWTH_HISTORY", "500"))
+# 탐색 영역 = 직전 bbox를 가로/세로 크기의 이 비율만큼 넓힌 영역 (식물이 자라는 위쪽은 2배)
+GROWTH_SEARCH_MARGIN = float(os.getenv("GROWTH_SEARCH_MARGIN", "0.25"))
+# 칼만 필터 파라미터
+# - 측정 잡음(cm): 같은 식물을 찍어도 조명/각도로 생기는 키 오차 정도
+# - 성장 잡음(cm/day^2 기준 분산 밀도): 성장 속도가 얼마나 빨리 바뀔 수 있는지
+GROWTH_MEASUREMENT_STD = float(os.getenv("GROWTH_MEASUREMENT_STD", "0.5"))
+GROWTH_PROCESS_NOISE = float(os.getenv("GROWTH_PROCESS_NOISE", "0.05"))
+GROWTH_RESET_AFTER = int(os.getenv("GROWTH_RESET_AFTER", "3"))
+
+_GATE = 9.0  # 이상치 판정: 정규화 잔차^2 > 3^2
+_DAY = 86400.0
+
+
+class PlantTrack:
+    """식물 1개의 추적 상태"""
+
+    def __init__(self, plant_id: int):
+        self.plant_id = plant_id
+        self.bbox = None          # [x, y, w, h] 원본 해상도 좌표
+        self.frame = None         # [W, H] 마지막 사진 해상도
+        self.x = None             # [키(cm), 성장 속도(cm/day)]
+        self.P = None             # 2x2 공분산 [[p00, p01], [p10, p11]]
+        self.ts = None            # 마지막으로 필터에 반영한 시각 (epoch 초)
+        self.outliers = 0         # 연속 이상치 수
+        self.history = deque(maxlen=GROWTH_HISTORY)
+
+    def search_rect(self, margin: float = GROWTH_SEARCH_MARGIN):
+        """직전 bbox 주변 탐색 영역 (x, y, w, h) (이전 위치가 없으면 None)"""
+        if self.bbox is None:
+            return None
+        x, y, w, h = self.bbox
+        mx, my = int(w * margin) + 8, int(h * margin) + 8
+        return (x - mx, y - 2 * my, w + 2 * mx, h + 3 * my)
+
+    def _reset(self, z: float, ts: float) -> None:
+        r = GROWTH_MEASUREMENT_STD ** 2
+        self.x = [z, 0.0]
+        self.P = [[r, 0.0], [0.0, 1.0]]
+        self.ts = ts
+        self.outliers = 0
+
+    def _filter(self, z: float, ts: float) -> bool:
+        """
+        칼만 필터 1스텝 (등속 모델: 키 += 속도 x dt)
+        - 반환: 이상치로 보고 반영하지 않았으면 True
+        """
+        if self.x is None:
+            self._reset(z, ts)
+            return False
+
+        dt = max(0.0, (ts - self.ts) / _DAY)
+        (h, v), ((p00, p01), (p10, p11)) = self.x, self.P
+        q = GROWTH_PROCESS_NOISE
+        # 예측
+        h = h + v * dt
+        p00, p01, p10, p11 = (p00 + dt * (p10 + p01) + dt * dt * p11 + q * dt ** 3 / 3,
+                              p01 + dt * p11 + q * dt ** 2 / 2,
+                              p10 + dt * p11 + q * dt ** 2 / 2,
+                              p11 + q * dt)
+        # 갱신
+        s = p00 + GROWTH_MEASUREMENT_STD ** 2
+        y = z - h
+        if y * y / s > _GATE:
+            self.outliers += 1
+            if self.outliers >= GROWTH_RESET_AFTER:
+                self._reset(z, ts)  # 이상치가 계속되면 화분 이동 등 실제 변화로 봄
+                return False
+            return True
+
+        k0, k1 = p00 / s, p10 / s
+        self.x = [h + k0 * y, v + k1 * y]
+        self.P = [[(1 - k0) * p00, (1 - k0) * p01], [p10 - k1 * p00, p11 - k1 * p01]]
+        self.ts = ts
+        self.outliers = 0
+        return False
+
+    def update(self, ts: float, result: dict) -> dict:
+        """분석 결과(analyze_plant_height_detailed) 1건 반영 -> 이력 1줄 반환"""
+        height = float(result.get("height") or 0.0)
+        point = {"ts": ts, "height": height, "tracked": bool(result.get("tracked"))}
+
+        if height <= 0:
+            point.update(smoothed=None, rate=None, status="not_found")
+        elif self.ts is not None and ts < self.ts:
+            point.update(smoothed=None, rate=None, status="late")  # 이미 더 나중 사진을 반영함
+        else:
+            outlier = self._filter(height, ts)
+            point.update(smoothed=round(self.x[0], 2), rate=round(self.x[1], 3),
+                         status="outlier" if outlier else "ok")
+            if not outlier and result.get("bbox"):
+                self.bbox, self.frame = list(result["bbox"]), list(result.get("frame") or [])
+
+        self.history.append(point)
+        return point
+
+    def summary(self) -> dict:
+        return {
+            "plant_id": self.plant_id,
+            "height": round(self.x[0], 2) if self.x else None,
+            "rate_cm_per_day": round(self.x[1], 3) if self.x else None,
+            "updated_at": self.ts,
+            "bbox": self.bbox,
+            "count": len(self.history),
+        }
+
+    def to_dict(self) -> dict:
+        return {"plant_id": self.plant_id, "bbox": self.bbox, "frame": self.frame, "x": self.x, "P": self.P,
+                "ts": self.ts, "outliers": self.outliers, "history": list(self.history)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PlantTrack":
+        track = cls(int(d["plant_id"]))
+        track.bbox, track.frame = d.get("bbox"), d.get("frame")
+        track.x, track.P, track.ts = d.get("x"), d.get("P"), d.get("ts")
+        track.outliers = int(d.get("outliers") or 0)
+        track.history.extend(d.get("history") or [])
+        return track
+
+
+class GrowthTracker:
+    def __init__(self):
+        self._tracks = {}  # { plant_id: PlantTrack }
+        self._encoded = {}  # { plant_id: 저장용 JSON 문자열 }
+        self._dirty = set()  # 마지막 dump 이후 바뀐(삭제 포함) plant_id
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def get(self, plant_id: int):
+        return self._tracks.get(plant_id)
+
+    def search_rect(self, plant_id: int):
+        track = self._tracks.get(plant_id)
+        return track.search_rect() if track is not None else None
+
+    def update(self, plant_id: int, result: dict, ts: float = None) -> dict:
+        track = self._tracks.get(plant_id)
+        if track is None:
+            track = self._tracks[plant_id] = PlantTrack(plant_id)
+        self._dirty.add(plant_id)
+        return track.update(time.time() if ts is None else float(ts), result)
+
+    def reset(self, plant_id: int) -> bool:
+        """화분/카메라 위치를 바꿨을 때 추적 상태 삭제"""
+        self._dirty.add(plant_id)
+        return self._tracks.pop(plant_id, None) is not None
+
+    def series(self, plant_id: int, limit: int = None) -> dict:
+        """
+        성장 시계열
+        - points: [{"ts", "height"(측정), "smoothed"(보정), "rate"(cm/day), "status", "tracked"}, ...]
+        - daily_growth: 보정 키 기준 첫 측정 ~ 마지막 측정 평균 성장 속도 (cm/day)
+        """
+        track = self._tracks.get(plant_id)
+        if track is None:
+            return None
+        points = list(track.history)
+        if limit:
+            points = points[-limit:]
+        ok = [p for p in points if p["status"] == "ok"]
+        daily = None
+        if len(ok) >= 2 and ok[-1]["ts"] > ok[0]["ts"]:
+            daily = round((ok[-1]["smoothed"] - ok[0]["smoothed"]) / ((ok[-1]["ts"] - ok[0]["ts"]) / _DAY), 3)
+        return {**track.summary(), "daily_growth": daily, "points": points}
+
+    def load_file(self, path: str) -> int:
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        for d in rows:
+            track = PlantTrack.from_dict(d)
+            self._tracks[track.plant_id] = track
+            self._dirty.add(track.plant_id)
+        return len(rows)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self._dirty)
+
+    def dump(self) -> str:
+        """저장할 JSON 문자열 (바뀐 식물만 다시 인코딩, 트랙을 바꾸는 쪽과 같은 스레드에서 호출)"""
+        for plant_id in self._dirty:
+            track = self._tracks.get(plant_id)
+            if track is None:
+                self._encoded.pop(plant_id, None)
+            else:
+                self._encoded[plant_id] = json.dumps(track.to_dict(), ensure_ascii=False)
+        self._dirty.clear()
+        return "[" + ",".join(self._encoded.values()) + "]"
+
+    def save_file(self, path: str) -> None:
+        write_file(path, self.dump())
+
+
+def write_file(path: str, text: str) -> None:
+    """dump() 결과를 파일로 (임시 파일에 쓰고 교체, 스레드에서 호출해도 됨)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
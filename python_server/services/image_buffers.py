@@ -0,0 +1,144 @@
+# python_server/services/image_buffers.py
+# ✅ 역할: 큰 사진을 복사 없이 워커 프로세스로 넘기기
+# - 업로드: 미리 만들어 둔 공유 메모리(SharedMemory) 슬롯에 readinto로 바로 받음
+#   -> 워커는 이름으로 붙어서(np.frombuffer) 그대로 디코딩 (bytes 생성/pickle 복사 없음)
+#   슬롯은 작업이 "실제로 끝난 뒤" 반납하고 다음 업로드에 재사용
+# - 디스크 파일: mmap으로 열어서 해시 계산/디코딩 (파일 전체를 bytes로 읽지 않음)
+#
+# 슬롯 수 = 워커 수 x 2 (워커가 바로 집어갈 만큼만)
+# - 슬롯을 기다리는 업로드는 starlette 임시파일(1MB 넘으면 디스크)에 그대로 있으므로 메모리를 차지하지 않음
+# - 슬롯 크기보다 큰 사진은 기존 방식(bytes)으로 처리
+
+import asyncio
+import mmap
+import os
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+from services.image_pool import IMAGE_WORKERS
+
+IMAGE_SHM_SLOTS = int(os.getenv("IMAGE_SHM_SLOTS", str(IMAGE_WORKERS * 2)))
+IMAGE_SHM_SLOT_BYTES = int(os.getenv("IMAGE_SHM_SLOT_BYTES", str(16 * 1024 * 1024)))
+_READ_CHUNK = 1024 * 1024
+
+
+class SharedSlot:
+    """공유 메모리 버퍼 1개 (업로드 1건용)"""
+
+    def __init__(self, size: int):
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.name = self.shm.name
+        self.capacity = size
+        self.size = 0
+
+    def read_from(self, fileobj) -> int:
+        """파일 객체 내용을 슬롯에 바로 채움 (슬롯보다 크면 ValueError)"""
+        fileobj.seek(0)
+        buf = self.shm.buf
+        n = 0
+        while True:
+            if n == self.capacity:
+                if fileobj.read(1):
+                    raise ValueError("슬롯보다 큰 파일")
+                break
+            got = fileobj.readinto(buf[n:min(n + _READ_CHUNK, self.capacity)])
+            if not got:
+                break
+            n += got
+        self.size = n
+        return n
+
+    def view(self) -> memoryview:
+        return self.shm.buf[:self.size]
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedBufferPool:
+    def __init__(self, slots: int = IMAGE_SHM_SLOTS, slot_bytes: int = IMAGE_SHM_SLOT_BYTES):
+        self.max_slots = max(1, slots)
+        self.slot_bytes = slot_bytes
+        self._free = []
+        self._all = []
+        self._available = asyncio.Semaphore(self.max_slots)
+        self.waiting = 0
+
+    async def acquire(self, size: int = None):
+        """
+        빈 슬롯이 날 때까지 기다렸다가 반환 (처음엔 필요할 때 하나씩 만듦)
+        - size가 슬롯보다 크면 None -> 호출한 쪽에서 bytes로 처리
+        """
+        if size is not None and size > self.slot_bytes:
+            return None
+        self.waiting += 1
+        try:
+            await self._available.acquire()
+        finally:
+            self.waiting -= 1
+        if self._free:
+            return self._free.pop()
+        try:
+            slot = SharedSlot(self.slot_bytes)
+        except OSError as e:
+            print("⚠️ 공유 메모리 슬롯 생성 실패:", e)
+            self._available.release()
+            return None
+        self._all.append(slot)
+        return slot
+
+    def release(self, slot: SharedSlot) -> None:
+        slot.size = 0
+        self._free.append(slot)
+        self._available.release()
+
+    def close(self) -> None:
+        for slot in self._all:
+            try:
+                slot.close()
+            except (OSError, BufferError):
+                pass
+        self._all.clear()
+        self._free.clear()
+
+    def report(self) -> dict:
+        return {"slots": len(self._all), "free": len(self._free), "waiting": self.waiting,
+                "max_slots": self.max_slots, "slot_bytes": self.slot_bytes}
+
+
+# ---- 워커 프로세스 쪽 ----
+_attached = {}  # { 슬롯 이름: SharedMemory } (워커마다 슬롯당 1번만 붙음)
+
+
+def attach(name: str) -> shared_memory.SharedMemory:
+    shm = _attached.get(name)
+    if shm is None:
+        # 프로세스 풀 워커는 서버 프로세스의 resource_tracker를 같이 쓰므로
+        # 여기서 붙어도 슬롯 정리(unlink)는 서버 쪽 close()에서 한 번만 일어남
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+
+@contextmanager
+def map_file(path: str):
+    """파일을 읽기 전용 mmap으로 열어서 memoryview 반환 (빈 파일은 b"")"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    try:
+        yield view
+    finally:
+        try:
+            view.release()
+            mm.close()
+        except BufferError:
+            pass  # 아직 참조하는 배열이 있으면 GC 때 닫힘
+
+
+# 서버(부모 프로세스)에서 쓰는 슬롯 풀
+shared_buffers = SharedBufferPool()
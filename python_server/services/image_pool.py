@@ -0,0 +1,197 @@
+# python_server/services/image_pool.py
+# ✅ 역할: 이미지 분석(CPU 작업)을 별도 프로세스 풀에서 실행
+# - analyze_plant_height(imdecode/HSV/모폴로지/컨투어)를 async 핸들러에서 바로 돌리면
+#   사진 1장 분석하는 동안 이벤트 루프가 멈춰서 /sensor/ingest 같은 요청이 전부 밀림
+# - 작업은 ProcessPoolExecutor로 보내고, 이벤트 루프는 결과만 기다림
+# - 대기열 상한(max_pending)을 넘으면 바로 PoolBusy (라우터에서 429로 응답)
+# - 작업별 제한 시간(timeout)을 넘으면 asyncio.TimeoutError (라우터에서 504로 응답)
+#   ※ 이미 실행 중인 작업은 프로세스 안에서 끝날 때까지 돌기 때문에
+#     슬롯은 "실제로 끝났을 때" 반납함 (타임아웃이 나도 대기열이 무한정 늘지 않음)
+# - 워커가 비정상 종료(메모리 부족 등)하면 BrokenProcessPool (라우터에서 503으로 응답, 다음 제출 때 풀 재시작)
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from services import metrics
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# 실행 중 + 대기 중 작업 최대 개수 (기본: 워커 수 x 4)
+IMAGE_MAX_PENDING = int(os.getenv("IMAGE_MAX_PENDING", str(IMAGE_WORKERS * 4)))
+# 작업 1건 제한 시간(초)
+IMAGE_JOB_TIMEOUT = float(os.getenv("IMAGE_JOB_TIMEOUT", "30"))
+
+# 서버/워커 공통 로그 형식 (Main.py에서 LOG_LEVEL로 레벨 설정, 워커는 서버 레벨을 그대로 따름)
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(processName)s] %(name)s: %(message)s"
+
+POOL_PENDING = metrics.Gauge("image_pool_pending", "이미지 프로세스 풀에 들어가 있는 작업 수")
+POOL_REJECTED = metrics.Counter("image_pool_rejected_total", "대기열이 가득 차서 거절한 작업 수")
+POOL_TIMEOUTS = metrics.Counter("image_pool_timeouts_total", "제한 시간을 넘긴 작업 수")
+
+
+def _init_worker(level: int) -> None:
+    # spawn 워커는 서버의 logging 설정을 물려받지 않으므로 같은 레벨로 다시 설정
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+async def _as_async(jobs):
+    """일반 반복자 / async generator 둘 다 async generator로"""
+    if hasattr(jobs, "__aiter__"):
+        async for job in jobs:
+            yield job
+    else:
+        for job in jobs:
+            yield job
+
+
+async def _next(jobs):
+    try:
+        return await jobs.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+class PoolBusy(Exception):
+    """대기열이 가득 참 (잠시 후 재시도)"""
+
+
+class ImagePool:
+    def __init__(self, workers: int = IMAGE_WORKERS, max_pending: int = IMAGE_MAX_PENDING,
+                 timeout: float = IMAGE_JOB_TIMEOUT):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self.pending = 0
+        self._executor = None
+
+    def start(self) -> None:
+        if self._executor is None:
+            # fork는 스레드가 떠 있는 서버 프로세스를 그대로 복제하므로 spawn 사용 (Windows와 동작도 같음)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker,
+                                                 initargs=(logging.getLogger().getEffectiveLevel(),))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _release(self) -> None:
+        self.pending -= 1
+        POOL_PENDING.set(self.pending)
+
+    def check(self, extra: int = 0) -> None:
+        """대기열 자리 확인만 (작업을 넣기 전에 다른 자원을 기다려야 할 때, extra = 이미 기다리는 요청 수)"""
+        if self.pending + extra >= self.max_pending:
+            POOL_REJECTED.inc()
+            raise PoolBusy(f"이미지 분석 대기열이 가득 찼습니다. ({self.pending + extra}/{self.max_pending})")
+
+    def _submit(self, fn, args, kwargs, on_done=None):
+        """
+        대기열 자리 확인 후 워커에 작업 제출 (concurrent.futures.Future 반환)
+        - on_done(): 워커에서 작업이 실제로 끝났을 때 이벤트 루프에서 호출 (타임아웃이 나도 끝날 때 호출)
+        """
+        if self.pending >= self.max_pending:
+            raise PoolBusy(f"이미지 분석 대기열이 가득 찼습니다. ({self.pending}/{self.max_pending})")
+        self.start()
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            # 워커가 비정상 종료(메모리 부족 등)하면 풀을 새로 만듦
+            # (깨진 풀도 관리 스레드/남은 워커를 정리해야 하므로 먼저 shutdown)
+            print("⚠️ 이미지 프로세스 풀 재시작")
+            old, self._executor = self._executor, None
+            old.shutdown(wait=False, cancel_futures=True)
+            self.start()
+            future = self._executor.submit(fn, *args, **kwargs)
+
+        self.pending += 1
+        POOL_PENDING.set(self.pending)
+        loop = asyncio.get_running_loop()
+
+        def _on_done(_):
+            # 풀 내부 스레드에서 호출됨 -> 카운터 변경은 이벤트 루프에서
+            try:
+                loop.call_soon_threadsafe(self._release)
+                if on_done is not None:
+                    loop.call_soon_threadsafe(on_done)
+            except RuntimeError:
+                pass  # 서버 종료로 루프가 이미 닫힘
+
+        future.add_done_callback(_on_done)
+        return future
+
+    async def _wait(self, future, timeout: float = None):
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future),
+                                          timeout=self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            future.cancel()  # 아직 시작 전이면 취소됨
+            raise
+
+    async def run(self, fn, *args, timeout: float = None, on_done=None, **kwargs):
+        """
+        fn(*args, **kwargs)를 워커 프로세스에서 실행하고 결과 반환
+        - fn/인자는 pickle 가능해야 함 (모듈 최상위 함수)
+        - 대기열이 가득 차면 PoolBusy, 제한 시간 초과 시 asyncio.TimeoutError
+        - 실행 중 워커가 죽으면 BrokenProcessPool
+        - on_done(): 작업이 워커에서 실제로 끝난 뒤 호출 (공유 메모리 슬롯 반납 등, 제출 실패 시 바로 호출)
+        """
+        try:
+            future = self._submit(fn, args, kwargs, on_done)
+        except (PoolBusy, BrokenProcessPool) as e:
+            if isinstance(e, PoolBusy):
+                POOL_REJECTED.inc()
+            if on_done is not None:
+                on_done()
+            raise
+        return await self._wait(future, timeout)
+
+    async def imap_unordered(self, jobs, window: int = None, timeout: float = None):
+        """
+        여러 작업을 풀에 나눠 넣고 끝나는 순서대로 (key, 결과 또는 예외) 를 내보냄 (async generator)
+        - jobs: (key, fn, args, kwargs) 반복자 (async generator도 가능). 필요할 때만 하나씩 꺼내므로
+          업로드 파일 읽기 등이 미리 몰리지 않음
+        - window: 이 묶음이 동시에 넣어두는 최대 작업 수 (기본: 워커 수 x 2)
+        - 풀이 가득 차 있으면(다른 요청 처리 중) 거절하지 않고 자리가 날 때까지 기다림
+        """
+        window = window or self.workers * 2
+        jobs = _as_async(jobs)
+        job = await _next(jobs)
+        running = {}  # { asyncio.Task: key }
+        try:
+            while running or job is not None:
+                while job is not None and len(running) < window:
+                    key, fn, args, kwargs = job
+                    try:
+                        future = self._submit(fn, args, kwargs)
+                    except PoolBusy:
+                        break
+                    running[asyncio.ensure_future(self._wait(future, timeout))] = key
+                    job = await _next(jobs)
+
+                if not running:
+                    await asyncio.sleep(0.05)  # 다른 요청 작업으로 풀이 가득 참
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    key = running.pop(task)
+                    exc = task.exception()
+                    yield key, (exc if exc is not None else task.result())
+        finally:
+            for task in running:
+                task.cancel()
+            await jobs.aclose()
+
+    def report(self) -> dict:
+        return {"workers": self.workers, "pending": self.pending, "max_pending": self.max_pending}
+
+
+# 서버 전체에서 공유하는 풀 (Main.py 시작/종료 시 start/shutdown)
+image_pool = ImagePool()
@@ -0,0 +1,52 @@
+# python_server/services/leader_rpc.py
+# ✅ 역할: uvicorn --workers N 환경에서 "워커마다 따로 있으면 안 되는 상태"를 leader 워커에게 맡기기
+# - leader/follower는 routers/sensor.py start_shared_aggregation에서 정해짐 (센서 집계 leader = 요청 처리 leader)
+# - 각 라우터는 종류(1 byte)별 handler를 register로 등록하고, 요청마다 call을 먼저 호출
+#   follower면 leader의 응답(bytes)을 받고, leader/단일 워커면 None -> 호출한 쪽에서 직접 처리
+# - 전송(요청 서버 / LeaderClient)은 services/sensor_forwarder.py
+#
+# 등록된 종류: J 이벤트 판정(routers/sensor.py), S/D 식물별 통계 캐시(routers/statistics.py),
+#             R/T/G/X 성장 추적(routers/image.py)
+
+from typing import Optional
+
+from services.sensor_forwarder import LeaderClient
+
+
+class LeaderUnavailable(ConnectionError):
+    """leader 전환 중이라 요청을 보낼 수 없음 (Main.py에서 503으로 응답)"""
+
+
+handlers = {}  # { 종류(1 byte): handler(data: bytes) -> bytes } leader 요청 서버가 사용
+_client: Optional[LeaderClient] = None
+
+
+def register(kind: bytes, handler) -> None:
+    """leader에서만 처리할 요청 종류 등록"""
+    handlers[kind] = handler
+
+
+def follow(port: int) -> None:
+    """follower가 됨: 이후 call은 leader(port)에게 보냄"""
+    global _client
+    close()
+    _client = LeaderClient(port)
+
+
+def close() -> None:
+    """leader로 승격/서버 종료: 이후 call은 None (직접 처리)"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+async def call(kind: bytes, data: bytes) -> Optional[bytes]:
+    """follower면 leader에게 요청하고 응답 반환, leader/단일 워커면 None"""
+    if _client is None:
+        return None
+    try:
+        return await _client.call(kind, data)
+    except ConnectionError as e:
+        print("❌ leader 요청 실패:", e)
+        raise LeaderUnavailable(str(e)) from e
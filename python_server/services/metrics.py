@@ -0,0 +1,176 @@
+# python_server/services/metrics.py
+# ✅ 역할: Prometheus 텍스트 형식 /metrics 용 간단한 지표 모음
+# - 외부 라이브러리 없이 Counter / Gauge / Histogram 만 구현
+# - 측정은 "숫자 더하기 + bisect" 수준이라 핫패스(ingest, 이미지 분석)에 넣어도 부담 없음
+# - 식물별 버퍼 크기처럼 조회 시점에 계산하면 되는 값은 register_collector로 등록
+#
+# 사용 예)
+#   INGEST = Counter("sensor_ingest_readings_total", "수신한 센서값 수", ("endpoint",))
+#   INGEST.labels("ingest").inc()
+#   with FLUSH_SECONDS.time(): ...
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# 기본 지연시간 버킷(초): 0.5ms ~ 60s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+_collectors = []
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in list(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def render(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {self.value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def clear(self) -> None:
+        """라벨별 값 전체 삭제 (collector에서 매번 새로 채울 때 사용)"""
+        with self._lock:
+            self._children.clear()
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def render(self, name, labelnames, key):
+        lines = []
+        acc = 0
+        for bound, c in zip(self.bounds, self.counts):
+            acc += c
+            le = 'le="%s"' % bound
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {acc}")
+        le = 'le="+Inf"'
+        lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {self.count}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key)} {self.sum}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key)} {self.count}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+
+def register_collector(fn) -> None:
+    """/metrics 조회 직전에 호출할 함수 등록 (Gauge 값을 그때그때 채우는 용도)"""
+    _collectors.append(fn)
+
+
+def render() -> str:
+    """등록된 전체 지표를 Prometheus 텍스트 형식으로"""
+    for fn in _collectors:
+        try:
+            fn()
+        except Exception as e:
+            print("⚠️ metrics collector 실패:", e)
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
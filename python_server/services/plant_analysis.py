@@ -1,12 +1,54 @@
+import logging
 import os
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence
 
 import cv2
 import numpy as np
 
+from services import metrics
+from services.debug_writer import debug_writer, DEBUG_PNG_COMPRESSION
+from services.image_buffers import attach, map_file
 
-def analyze_plant_height(
+logger = logging.getLogger(__name__)
+
+# ✅ 분석 단계 이름 (analyze_plant_height_detailed 결과의 "stages" 키 = /metrics stage 라벨)
+STAGES = ("decode", "cvt_color", "in_range", "morph_open", "morph_close",
+          "find_contours", "contour_filter", "debug")
+
+# ✅ 단계별 처리 시간 (/metrics)
+# - 분석은 프로세스 풀 워커에서 돌기 때문에 워커에서 직접 기록하면 서버 /metrics에 안 보임
+#   -> 워커는 결과(stages)에 시간을 담아 돌려주고, 서버 프로세스에서 observe_stages()로 기록
+# - debug: 디버그 저장 요청(큐에 넣기)까지만 (실제 PNG 저장은 writer 스레드)
+STAGE_SECONDS = metrics.Histogram("image_stage_seconds", "식물 키 분석 단계별 처리 시간", ("stage",))
+_STAGE_METRICS = {name: STAGE_SECONDS.labels(name) for name in STAGES}
+
+
+# ✅ 축소 디코딩 배율 -> imread 플래그 (JPEG는 디코딩 단계에서 바로 작게 풀어서 훨씬 빠름)
+_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+# 축소본에서 이 사유로 실패하면 원본 해상도로 재분석 (decode_failed / bad_scale 등은 해상도와 무관)
+_RETRY_REASONS = ("no_contour", "too_small")
+
+
+# ✅ 초록색(식물) HSV 범위 (조명 따라 조절 필요)
+LOWER_GREEN = (35, 40, 40)
+UPPER_GREEN = (85, 255, 255)
+
+
+def analyze_plant_height(image_bytes, **kwargs) -> float:
+    """
+    이미지 바이트 -> 식물 키(cm)만 반환 (인자는 analyze_plant_height_detailed와 같음)
+    """
+    return analyze_plant_height_detailed(image_bytes, **kwargs)["height"]
+
+
+def analyze_plant_height_detailed(
     image_bytes: bytes,
     pixels_per_cm: float = 55.0,
     debug: bool = False,
@@ -14,29 +56,110 @@ def analyze_plant_height(
     tag: Optional[str] = None,
     roi_ratio: float = 0.7,
     min_area_ratio: float = 0.05,
-) -> float:
-    
-    print("📍 [DEBUG] analyze_plant_height loaded from:", __file__)
-    print("📍 [DEBUG] received pixels_per_cm:", pixels_per_cm)
-    print("📍 [DEBUG] received debug:", debug)
-
-
+    downscale: int = 1,
+    profile: bool = False,
+    search_rect: Optional[Sequence[int]] = None,
+    lower_hsv: Sequence[int] = LOWER_GREEN,
+    upper_hsv: Sequence[int] = UPPER_GREEN,
+    kernel_size: int = 5,
+    retry_full: bool = True,
+    debug_to_parent: bool = False,
+) -> dict:
     """
     이미지 바이트 -> HSV 초록색 영역 검출 -> 식물 키(cm) 추정
 
     반영:
     - OPEN + CLOSE 적용 (노이즈 제거 + 구멍 메우기)
-    - 작은 컨투어 제거(min_area_ratio)
+    - 작은 컨투어 제거(min_area_ratio, 기본 중앙 ROI 면적 기준)
     - y_min~y_max 기반 높이 측정 (boundingRect보다 안정적)
     - debug=True이면 debug_dir에 결과 이미지 저장
+    - downscale(1/2/4/8): 1/N 크기로 디코딩해서 분석 (pixels_per_cm도 1/N로 맞춤)
+      오차는 최대 약 N픽셀/pixels_per_cm (55px/cm, N=4면 ±0.1cm 수준)
+      축소본에서 식물을 못 찾으면(no_contour / too_small) 원본 해상도로 한 번 더 분석 (retry_full=False면 안 함)
+      debug 이미지는 최종 결과를 낸 분석 1번만 저장
+    - debug_to_parent=True: 프로세스 풀 워커용. 직접 저장하지 않고 저장할 데이터를 result["debug_images"]로 돌려줌
+      (서버 프로세스가 submit_debug_images로 저장 -> 샘플링/용량 상한이 서버 전체 기준, 종료 시 남은 것도 저장)
+    - lower_hsv/upper_hsv/kernel_size: 초록 HSV 범위와 모폴로지 커널 (기기별 보정값, services/calibration.py)
+      커널은 축소 배율만큼 줄임 (5 -> 1/2: 3x3, 1/4 이상: 생략)
+    - profile=True이면 단계별 픽셀 수(pixels)도 셈 (countNonZero 때문에 마스크를 한 번 더 훑음)
+    - search_rect=(x, y, w, h): 원본 해상도 좌표의 탐색 영역 (services/growth_tracker.py가 직전 위치로 계산)
+      중앙 ROI 대신 이 영역만 분석하고, 못 찾거나 식물이 영역 경계에 닿으면 같은 디코딩 결과로 중앙 ROI 재분석
+
+    반환:
+    {
+      "height": 12.3,            # cm (못 찾으면 0.0)
+      "pixel_height": 123,       # 분석 해상도 기준 픽셀 높이
+      "reason": None,            # 실패 사유: decode_failed / no_contour / too_small / bad_scale / error
+      "downscale": 4, "retried": False,
+      "tracked": False,          # search_rect 영역 분석 결과를 그대로 썼는지
+      "bbox": [x, y, w, h],      # 식물(가장 큰 컨투어) 영역, 원본 해상도 좌표 (찾았을 때만)
+      "frame": [W, H],           # 원본 해상도 크기 (디코딩됐을 때만)
+      "stages": {"decode": 0.0123, ...},   # 초 (STAGES, 재분석했으면 모두 합산)
+      "pixels": {...}                      # profile=True일 때만
+    }
     """
+    if downscale not in _DECODE_FLAGS:
+        raise ValueError(f"downscale은 {sorted(_DECODE_FLAGS)} 중 하나여야 합니다: {downscale}")
+
+    stages = dict.fromkeys(STAGES, 0.0)
+    green = (np.array(lower_hsv, dtype=np.uint8), np.array(upper_hsv, dtype=np.uint8), int(kernel_size))
+    result = _analyze(image_bytes, pixels_per_cm, debug, debug_dir, tag,
+                      roi_ratio, min_area_ratio, downscale, stages, profile, search_rect, green)
+    result["retried"] = False
+    if result["height"] == 0.0 and downscale > 1 and retry_full and result["reason"] in _RETRY_REASONS:
+        logger.info("↩️ 1/%d 축소본에서 검출 실패(%s), 원본 해상도로 재분석", downscale, result["reason"])
+        result = _analyze(image_bytes, pixels_per_cm, debug, debug_dir, tag,
+                          roi_ratio, min_area_ratio, 1, stages, profile, None, green)
+        result["retried"] = True
+    pending = result.pop("_debug", None)
+    if pending is not None:
+        if debug_to_parent:
+            result["debug_images"] = _debug_job(*pending, debug_dir=debug_dir, tag=tag)
+        else:
+            _debug_save(*pending, debug_dir=debug_dir, tag=tag, stages=stages)
+    result["stages"] = stages
+    return result
+
+
+def observe_stages(result: dict) -> None:
+    """워커가 돌려준 단계별 시간을 이 프로세스의 /metrics에 기록 (서버 프로세스에서 호출)"""
+    stages = result.get("stages") if isinstance(result, dict) else None
+    if not stages:
+        return
+    for name, seconds in stages.items():
+        if seconds and name in _STAGE_METRICS:
+            _STAGE_METRICS[name].observe(seconds)
+
+
+def _analyze(
+    image_bytes: bytes,
+    pixels_per_cm: float,
+    debug: bool,
+    debug_dir: str,
+    tag: Optional[str],
+    roi_ratio: float,
+    min_area_ratio: float,
+    downscale: int,
+    stages: dict,
+    profile: bool,
+    search_rect: Optional[Sequence[int]],
+    green: tuple,
+) -> dict:
+    """1회 디코딩 + 분석 (stages에 단계별 시간을 더함, green = (lower, upper, kernel_size))"""
+    result = {"height": 0.0, "pixel_height": 0, "reason": None, "downscale": downscale, "tracked": False}
+
+    logger.debug("analyze start: tag=%s pixels_per_cm=%s downscale=%d debug=%s search_rect=%s",
+                 tag, pixels_per_cm, downscale, debug, search_rect)
     try:
+        t = time.perf_counter()
         nparr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img = cv2.imdecode(nparr, _DECODE_FLAGS[downscale])
+        _lap(stages, "decode", t)
 
         if img is None:
-            print("❌ 이미지를 읽을 수 없습니다.")
-            return 0.0
+            logger.warning("❌ 이미지를 읽을 수 없습니다. (tag=%s)", tag)
+            result["reason"] = "decode_failed"
+            return result
 
         H, W = img.shape[:2]
 
@@ -44,72 +167,189 @@ def analyze_plant_height(
         if 0.0 < roi_ratio < 1.0:
             roi_w = int(W * roi_ratio)
             roi_h = int(H * roi_ratio)
-            x0 = (W - roi_w) // 2
-            y0 = (H - roi_h) // 2
-            roi = img[y0:y0 + roi_h, x0:x0 + roi_w].copy()
-            roi_offset = (x0, y0)
+            center = ((W - roi_w) // 2, (H - roi_h) // 2, roi_w, roi_h)
+        else:
+            center = (0, 0, W, H)
+        # 작은 컨투어 기준 면적은 항상 중앙 ROI 기준 (탐색 영역이 작아도 같은 기준)
+        min_area = (center[2] * center[3]) * float(min_area_ratio)
+
+        if search_rect is not None:
+            # 탐색 영역도 중앙 ROI 안으로 자름 (전체 분석과 같은 결과가 나오게)
+            window = _scale_rect(search_rect, downscale, center)
+            if window is not None:
+                tracked = _measure(img, window, min_area, pixels_per_cm, downscale, stages, profile, tag,
+                                   green, bounds=center)
+                if tracked["height"] > 0 and not tracked["edge"]:
+                    result["tracked"] = True
+                    return _finish(tracked, result, img, debug, tag)
+                logger.info("🔎 탐색 영역에서 %s, 중앙 ROI로 재분석 (tag=%s)",
+                            "식물이 경계에 닿음" if tracked["height"] > 0 else "검출 실패", tag)
+
+        measured = _measure(img, center, min_area, pixels_per_cm, downscale, stages, profile, tag, green)
+        return _finish(measured, result, img, debug, tag)
+    except Exception as e:
+        logger.warning("⚠️ 분석 중 에러 발생: %s", e)
+        result["height"] = 0.0
+        result["reason"] = "error"
+        return result
+
+
+def _scale_rect(rect: Sequence[int], downscale: int, bounds: Sequence[int]):
+    """원본 해상도 (x, y, w, h) -> 디코딩 해상도 기준으로 줄이고 bounds 영역 안으로 자름 (비면 None)"""
+    x, y, w, h = (int(v) for v in rect)
+    bx, by, bw, bh = bounds
+    x0 = min(max(bx, x // downscale), bx + bw)
+    y0 = min(max(by, y // downscale), by + bh)
+    x1 = min(max(bx, -(-(x + w) // downscale)), bx + bw)
+    y1 = min(max(by, -(-(y + h) // downscale)), by + bh)
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+def _finish(measured: dict, result: dict, img, debug: bool, tag: Optional[str]) -> dict:
+    """
+    채택한 _measure 결과를 result에 합침
+    - debug: 저장할 데이터만 result["_debug"]에 담아 둠 (재분석하면 버리고, 최종 결과의 것만 저장)
+    """
+    roi, mask, contour, roi_offset, y_min, y_max = measured.pop("_debug")
+    if debug:
+        result["_debug"] = (img, roi, mask, contour, roi_offset, y_min, y_max)
+    result.update(measured)
+    if result["height"] > 0:
+        logger.info("✅ 최종 분석 결과: %.1fcm (pixel_height=%d, downscale=%d, tracked=%s, tag=%s)",
+                    result["height"], result["pixel_height"], result["downscale"], result["tracked"], tag)
+    return result
+
+
+def _measure(img, rect, min_area: float, pixels_per_cm: float, downscale: int, stages: dict,
+             profile: bool, tag: Optional[str], green: tuple,
+             bounds: Optional[Sequence[int]] = None) -> dict:
+    """
+    디코딩된 이미지의 rect=(x, y, w, h) 영역에서 식물 키 측정
+    - edge: 식물 bbox가 영역 경계(bounds 경계와 겹치는 쪽 제외)에 닿았는지 -> 탐색 영역이 좁았을 수 있음
+    - _debug: 디버그 저장에 쓸 (roi, mask, contour, roi_offset, y_min, y_max) (_finish에서 꺼냄)
+    """
+    clock = time.perf_counter
+    H, W = img.shape[:2]
+    x0, y0, rw, rh = rect
+    roi = img[y0:y0 + rh, x0:x0 + rw]  # 복사 없이 view (cvtColor가 새 배열을 만듦)
+    roi_offset = (x0, y0)
+    out = {"height": 0.0, "pixel_height": 0, "reason": None, "edge": False,
+           "frame": [W * downscale, H * downscale]}
+    pixels = None
+    if profile:
+        pixels = out["pixels"] = {"image": H * W, "roi": rw * rh}
+
+    t = clock()
+    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+    t = _lap(stages, "cvt_color", t)
+
+    # 초록색 범위(조명 따라 조절 필요 -> 기기별 보정값)
+    lower_green, upper_green, kernel_size = green
+
+    mask = cv2.inRange(hsv, lower_green, upper_green)
+    t = _lap(stages, "in_range", t)
+    if pixels is not None:
+        pixels["green"] = cv2.countNonZero(mask)
+        t = clock()
+
+    # 노이즈 제거 + 구멍 메우기 (커널도 축소 배율에 맞춰 줄임: 5x5 기준 1 -> 5x5, 2 -> 3x3, 4/8 -> 생략)
+    ksize = max(1, kernel_size // downscale) | 1
+    if ksize > 1:
+        kernel = np.ones((ksize, ksize), np.uint8)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        t = _lap(stages, "morph_open", t)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+        t = _lap(stages, "morph_close", t)
+    if pixels is not None:
+        pixels["mask"] = cv2.countNonZero(mask)
+        t = clock()
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    t = _lap(stages, "find_contours", t)
+
+    # 작은 컨투어 제거 (면적은 한 번만 계산해서 가장 큰 것까지 같이 찾음)
+    kept = 0
+    largest_contour, largest_area = None, 0.0
+    for c in contours:
+        area = cv2.contourArea(c)
+        if area >= min_area:
+            kept += 1
+            if largest_contour is None or area > largest_area:
+                largest_contour, largest_area = c, area
+    _lap(stages, "contour_filter", t)
+    if pixels is not None:
+        pixels["contours"] = len(contours)
+        pixels["kept_contours"] = kept
+        pixels["largest_area"] = largest_area
+
+    if largest_contour is None:
+        if not contours:
+            logger.info("🌱 초록색 식물을 찾지 못했습니다. (0.0cm 반환, tag=%s)", tag)
+            out["reason"] = "no_contour"
         else:
-            roi = img
-            roi_offset = (0, 0)
+            logger.info("🌱 초록색 영역이 너무 작습니다. (0.0cm 반환, tag=%s)", tag)
+            out["reason"] = "too_small"
+        out["_debug"] = (roi, mask, None, roi_offset, None, None)
+        return out
 
-        hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+    ys = largest_contour[:, :, 1]
+    y_min = int(ys.min())
+    y_max = int(ys.max())
+    pixel_height = max(0, y_max - y_min)
+    out["pixel_height"] = pixel_height
 
-        # 초록색 범위(조명 따라 조절 필요)
-        lower_green = np.array([35, 40, 40], dtype=np.uint8)
-        upper_green = np.array([85, 255, 255], dtype=np.uint8)
+    bx, by, bw, bh = cv2.boundingRect(largest_contour)
+    out["bbox"] = [(x0 + bx) * downscale, (y0 + by) * downscale, bw * downscale, bh * downscale]
+    if bounds is not None:
+        ox, oy, ow, oh = bounds
+        out["edge"] = ((bx <= 0 and x0 > ox) or (by <= 0 and y0 > oy)
+                       or (bx + bw >= rw and x0 + rw < ox + ow) or (by + bh >= rh and y0 + rh < oy + oh))
 
-        mask = cv2.inRange(hsv, lower_green, upper_green)
+    out["_debug"] = (roi, mask, largest_contour, roi_offset, y_min, y_max)
+    logger.debug("🔍 감지된 식물 픽셀 높이(y-range): %dpx", pixel_height)
 
-        # 노이즈 제거 + 구멍 메우기
-        kernel = np.ones((5, 5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    if pixels_per_cm <= 0:
+        logger.warning("⚠️ pixels_per_cm 값이 올바르지 않습니다: %s (0.0cm 반환)", pixels_per_cm)
+        out["reason"] = "bad_scale"
+        return out
+
+    # 축소본 픽셀 기준이므로 pixels_per_cm도 같은 비율로 줄여서 계산
+    out["height"] = round(pixel_height / (float(pixels_per_cm) / downscale), 1)
+    return out
+
+
+def _lap(stages: dict, name: str, started: float) -> float:
+    """stages[name]에 started부터 지금까지 걸린 시간을 더하고 지금 시각 반환"""
+    now = time.perf_counter()
+    stages[name] += now - started
+    return now
 
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if not contours:
-            print("🌱 초록색 식물을 찾지 못했습니다. (0.0cm 반환)")
-            if debug:
-                _debug_save(img, roi, mask, None, roi_offset, debug_dir=debug_dir, tag=tag)
-            return 0.0
-
-        # 작은 컨투어 제거
-        min_area = (roi.shape[0] * roi.shape[1]) * float(min_area_ratio)
-        contours = [c for c in contours if cv2.contourArea(c) >= min_area]
-        if not contours:
-            print("🌱 초록색 영역이 너무 작습니다. (0.0cm 반환)")
-            if debug:
-                _debug_save(img, roi, mask, None, roi_offset, debug_dir=debug_dir, tag=tag)
-            return 0.0
-
-        largest_contour = max(contours, key=cv2.contourArea)
-
-        ys = largest_contour[:, :, 1]
-        y_min = int(ys.min())
-        y_max = int(ys.max())
-        pixel_height = max(0, y_max - y_min)
-
-        print(f"🔍 감지된 식물 픽셀 높이(y-range): {pixel_height}px")
-
-        if pixels_per_cm <= 0:
-            print("⚠️ pixels_per_cm 값이 올바르지 않습니다. (0.0cm 반환)")
-            if debug:
-                _debug_save(img, roi, mask, largest_contour, roi_offset,
-                            y_min=y_min, y_max=y_max, debug_dir=debug_dir, tag=tag)
-            return 0.0
-        
-        plant_height_cm = round(pixel_height / float(pixels_per_cm), 1)
-        print(f"✅ 최종 분석 결과: {plant_height_cm:.1f}cm")
-        print("pixel_height:", pixel_height)
-        print("pixels_per_cm:", pixels_per_cm)
-
-        if debug:
-            _debug_save(img, roi, mask, largest_contour, roi_offset,
-                        y_min=y_min, y_max=y_max, debug_dir=debug_dir, tag=tag)
-
-        return plant_height_cm
-    except Exception as e:
-        print(f"⚠️ 분석 중 에러 발생: {e}")
-        return 0.0
+
+def analyze_plant_height_file(file_path: str, **kwargs) -> dict:
+    """파일 경로로 분석 (mmap으로 열어서 bytes로 읽지 않고 바로 디코딩, 결과는 detailed와 같음)"""
+    with map_file(file_path) as view:
+        return analyze_plant_height_detailed(view, **kwargs)
+
+
+def analyze_plant_height_shared(name: str, size: int, **kwargs) -> dict:
+    """공유 메모리 슬롯(services/image_buffers.py)에 담긴 사진 분석 (워커 프로세스에서 실행)"""
+    view = attach(name).buf[:size]
+    try:
+        return analyze_plant_height_detailed(view, **kwargs)
+    finally:
+        try:
+            view.release()
+        except BufferError:
+            pass
+
+
+def _debug_job(full_img, roi_img, mask, contour, roi_offset, y_min=None, y_max=None,
+               debug_dir: str = "debug_outputs", tag: Optional[str] = None) -> tuple:
+    """_write_debug_images 인자 (배열은 복사 없이 그대로)"""
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return (full_img, roi_img.shape[:2], mask, contour, roi_offset, y_min, y_max, debug_dir, tag or "plant", stamp)
 
 
 def _debug_save(
@@ -122,44 +362,60 @@ def _debug_save(
     y_max=None,
     debug_dir: str = "debug_outputs",
     tag: Optional[str] = None,
+    stages: Optional[dict] = None,
 ):
-    """debug=True일 때 마스크/결과 이미지를 debug_dir에 저장"""
-    try:
-        os.makedirs(debug_dir, exist_ok=True)
-        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        tag = tag or "plant"
-
-        mask_path = os.path.join(debug_dir, f"{tag}_{stamp}_mask.png")
-        roi_path = os.path.join(debug_dir, f"{tag}_{stamp}_roi.png")
-        full_path = os.path.join(debug_dir, f"{tag}_{stamp}_full.png")
-
-        cv2.imwrite(mask_path, mask)
-
-        vis = roi_img.copy()
-        if contour is not None:
-            cv2.drawContours(vis, [contour], -1, (0, 0, 255), 2)
-            if y_min is not None:
-                cv2.line(vis, (0, y_min), (vis.shape[1] - 1, y_min), (255, 0, 0), 2)
-            if y_max is not None:
-                cv2.line(vis, (0, y_max), (vis.shape[1] - 1, y_max), (255, 0, 0), 2)
-
-        cv2.imwrite(roi_path, vis)
-
-        full_vis = full_img.copy()
-        x0, y0 = roi_offset
-        if (x0, y0) != (0, 0):
-            h, w = roi_img.shape[:2]
-            cv2.rectangle(full_vis, (x0, y0), (x0 + w, y0 + h), (0, 255, 255), 2)
-
-        cv2.imwrite(full_path, full_vis)
-
-        print(f"🧪 debug 저장 완료: {mask_path} / {roi_path} / {full_path}")
-
-       
-        
-
-    except Exception as e:
-        print(f"⚠️ debug 저장 실패: {e}")
- 
-
-
+    """
+    debug=True일 때 마스크/결과 이미지 저장을 백그라운드 writer에 맡김 (services/debug_writer.py)
+    - 요청 처리 중에는 큐에 넣기만 함 (복사/PNG 인코딩/디스크 쓰기는 writer 스레드에서)
+    - DEBUG_SAMPLE_EVERY=N이면 N번에 1번만 저장
+    """
+    t0 = time.perf_counter()
+    if debug_writer.sample():
+        job = _debug_job(full_img, roi_img, mask, contour, roi_offset, y_min, y_max, debug_dir, tag)
+        debug_writer.submit(debug_dir, _write_debug_images, *job)
+    if stages is not None:
+        _lap(stages, "debug", t0)
+
+
+def submit_debug_images(result) -> None:
+    """워커가 돌려준 debug_images를 이 프로세스의 writer에 맡김 (서버 프로세스에서 호출, result에서는 뺌)"""
+    job = result.pop("debug_images", None) if isinstance(result, dict) else None
+    if job is not None:
+        debug_writer.submit(job[7], _write_debug_images, *job)
+
+
+def _write_debug_images(full_img, roi_shape, mask, contour, roi_offset, y_min, y_max,
+                        debug_dir: str, tag: str, stamp: str) -> list:
+    """writer 스레드에서 실행: mask / roi / full PNG 3장 저장 후 경로 반환"""
+    t0 = time.perf_counter()
+    os.makedirs(debug_dir, exist_ok=True)
+
+    mask_path = os.path.join(debug_dir, f"{tag}_{stamp}_mask.png")
+    roi_path = os.path.join(debug_dir, f"{tag}_{stamp}_roi.png")
+    full_path = os.path.join(debug_dir, f"{tag}_{stamp}_full.png")
+    png = [cv2.IMWRITE_PNG_COMPRESSION, DEBUG_PNG_COMPRESSION]
+
+    cv2.imwrite(mask_path, mask, png)
+
+    # 원본은 1번만 복사하고, ROI 결과는 그 복사본의 view에 그려서 저장
+    full_vis = full_img.copy()
+    x0, y0 = roi_offset
+    h, w = roi_shape
+    vis = full_vis[y0:y0 + h, x0:x0 + w]
+    if contour is not None:
+        cv2.drawContours(vis, [contour], -1, (0, 0, 255), 2)
+        if y_min is not None:
+            cv2.line(vis, (0, y_min), (w - 1, y_min), (255, 0, 0), 2)
+        if y_max is not None:
+            cv2.line(vis, (0, y_max), (w - 1, y_max), (255, 0, 0), 2)
+
+    cv2.imwrite(roi_path, vis, png)
+
+    if (x0, y0) != (0, 0):
+        cv2.rectangle(full_vis, (x0, y0), (x0 + w, y0 + h), (0, 255, 255), 2)
+
+    cv2.imwrite(full_path, full_vis, png)
+
+    logger.debug("🧪 debug 저장 완료(%.1fms): %s / %s / %s",
+                 (time.perf_counter() - t0) * 1000, mask_path, roi_path, full_path)
+    return [mask_path, roi_path, full_path]
@@ -0,0 +1,328 @@
+# python_server/services/plant_stats.py
+# ✅ 역할: /statistics/stats 계산 (온습도/조도 그래프 + 관수 통계)
+# - 행 단위 apply/lambda 없이 컬럼 연산으로만 계산
+#   라벨(HH:MM): 분 단위 룩업 테이블 / 주차(1~4주차): (day - 1) // 7 + 1 을 np.bincount로 한 번에 집계
+# - 날짜 파싱: Node mysql2가 보내는 "2025-02-10T03:00:00.000Z"는 numpy로 바로 (형식 추측 비용 없음)
+# - 입력은 DataFrame (routers/statistics.py에서 변환)
+#   행 형식 [{...}, ...] / 컬럼 형식 {"CREATED_AT": [...], ...} JSON, Arrow IPC (pyarrow 설치 시)
+# - points / resolution / days를 주면 그래프 시리즈를 다운샘플링 (services/stats_rollup.py)
+# - compute_fleet_stats: 여러 식물(PLANT_ID)을 한 번에 (식물별로 DataFrame을 나누지 않고 정렬 + 구간 연산)
+
+import io
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from services import stats_rollup
+
+try:
+    import pyarrow.ipc as pa_ipc  # 선택 설치 (pip install pyarrow)
+except ImportError:
+    pa_ipc = None
+
+HOURLY_COLUMNS = ("TEMP_AVG", "HUM_AVG", "LIGHT_AVG")
+WATER_EVENT = "WATER_DROP_DETECTED"
+WEEKS = 4  # 1~4주차 (29일 이후는 기존처럼 집계하지 않음)
+# 식물 간 순위를 매기는 지표 (analysis 항목, 큰 값이 1위)
+RANK_METRICS = ("avg_temp", "avg_hum", "avg_light", "water_avg_interval", "water_total_month")
+
+# 분(0~1439) -> "HH:MM" 라벨 (dt.strftime은 행마다 문자열 포맷이라 느림)
+_HHMM = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)], dtype=object)
+
+
+def frame_from_arrow(data: bytes) -> pd.DataFrame:
+    """Arrow IPC (stream 또는 file 형식) -> DataFrame (pyarrow 없으면 RuntimeError)"""
+    if pa_ipc is None:
+        raise RuntimeError("Arrow 입력을 쓰려면 pyarrow를 설치해야 합니다. (pip install pyarrow)")
+    if not data:
+        return pd.DataFrame()
+    source = io.BytesIO(data)
+    if data[:6] == b"ARROW1":
+        return pa_ipc.open_file(source).read_pandas()
+    return pa_ipc.open_stream(source).read_pandas()
+
+
+def _parse_utc_iso(values) -> np.ndarray:
+    # "....Z"(UTC) 문자열만: Z를 떼고 numpy가 바로 파싱 (UTC 기준 naive, 다른 형식이면 ValueError)
+    out = []
+    for v in values:
+        if v[-1:] != "Z":
+            raise ValueError(v)
+        out.append(v[:-1])
+    return np.array(out, dtype="datetime64[ms]")
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    날짜 컬럼 -> datetime
+    - Node(mysql2) JSON의 "2025-02-10T03:00:00.000Z"는 numpy 파싱 (pandas 형식 추측보다 몇 배 빠름)
+      라벨/월/일/간격 계산은 UTC 그대로라 기존(tz-aware UTC)과 결과가 같음
+    - 그 외(오프셋 포함, epoch, 결측 등)는 pandas ISO8601 -> 형식 추측 순서로 처리
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    try:
+        return pd.Series(_parse_utc_iso(values.to_numpy()), index=values.index, name=values.name)
+    except (ValueError, TypeError):
+        pass
+    try:
+        return pd.to_datetime(values, format="ISO8601")
+    except (ValueError, TypeError):
+        return pd.to_datetime(values)
+
+
+def utc_naive(dates: pd.Series) -> np.ndarray:
+    """parse_dates 결과 -> UTC 기준 datetime64[ns] 배열 (비교/정렬/구간 계산용으로 형식 통일)"""
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+    return dates.to_numpy(dtype="datetime64[ns]")
+
+
+def hourly_arrays(df: pd.DataFrame):
+    """시간별 데이터 -> (시각 UTC datetime64[ns] 정렬, 원본값 (컬럼 수, n) 결측 NaN)"""
+    if df.empty or "CREATED_AT" not in df.columns:
+        return np.array([], dtype="datetime64[ns]"), np.empty((len(HOURLY_COLUMNS), 0))
+    ts = utc_naive(parse_dates(df["CREATED_AT"]))
+    order = np.argsort(ts, kind="stable")
+    raw = np.full((len(HOURLY_COLUMNS), len(ts)), np.nan)
+    for i, col in enumerate(HOURLY_COLUMNS):
+        if col in df.columns:
+            raw[i] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)[order]
+    return ts[order], raw
+
+
+def chart_series(ts: np.ndarray, values: np.ndarray, resolution: str = None, points: int = None, days: int = None,
+                 rollups: dict = None, raw: np.ndarray = None) -> dict:
+    """
+    다운샘플링된 그래프 시리즈 (응답의 labels / temp_data / hum_data / light_data 대신 사용)
+    - timestamps: 각 점의 시각 (UTC ISO), envelope: 점마다 대표 구간의 최소/최대
+    """
+    resolution = resolution or "raw"
+    ts, values, lo, hi = stats_rollup.chart(ts, values, resolution, points, days, rollups, raw)
+    envelope = {}
+    for i, name in enumerate(("temp", "hum", "light")):
+        envelope[f"{name}_min"] = stats_rollup.to_list(lo[i])
+        envelope[f"{name}_max"] = stats_rollup.to_list(hi[i])
+    return {
+        "resolution": resolution,
+        "labels": stats_rollup.labels(ts, resolution),
+        "timestamps": [t + "Z" for t in np.datetime_as_string(ts, unit="s").tolist()],
+        "temp_data": stats_rollup.to_list(values[0]),
+        "hum_data": stats_rollup.to_list(values[1]),
+        "light_data": stats_rollup.to_list(values[2]),
+        "envelope": envelope,
+    }
+
+
+def prepare_hourly(df: pd.DataFrame) -> pd.DataFrame:
+    """시간별 데이터 정리: 날짜 변환 -> 시간순 정렬 -> 결측치 선형 보간(앞쪽 결측은 0)"""
+    if df.empty:
+        return df
+    df = df.copy()
+    df["CREATED_AT"] = parse_dates(df["CREATED_AT"])
+    # 과거(오전) -> 현재(오후) 순서로 정렬 (Node가 이미 정렬해서 보내면 건너뜀)
+    if not df["CREATED_AT"].is_monotonic_increasing:
+        df = df.sort_values(by="CREATED_AT", ascending=True, kind="stable")
+    for col in HOURLY_COLUMNS:
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors="coerce")  # DECIMAL 컬럼은 문자열로 올 수 있음
+        if values.isna().any():
+            values = values.interpolate(method="linear").fillna(0)
+        df[col] = values
+    return df
+
+
+def hhmm_labels(dates: pd.Series) -> list:
+    """datetime 컬럼 -> ["HH:MM", ...]"""
+    minutes = dates.dt.hour.to_numpy() * 60 + dates.dt.minute.to_numpy()
+    return _HHMM[minutes].tolist()
+
+
+def water_stats(df_events: pd.DataFrame, now: datetime = None) -> dict:
+    """
+    관수(WATER_DROP_DETECTED) 통계
+    - water_avg_interval: 전체 기록 기준 평균 관수 주기(일)
+    - water_total_month: 이번 달 횟수
+    - water_weekly: 이번 달 1~4주차 횟수
+    """
+    now = now or datetime.now()
+    if df_events.empty or "EVENT_TYPE" not in df_events.columns:
+        dates = pd.Series([], dtype="datetime64[ns]")
+    else:
+        # 물 준 이벤트만 먼저 골라서 날짜 변환 (다른 이벤트는 파싱하지 않음)
+        water = df_events["EVENT_TYPE"].to_numpy() == WATER_EVENT
+        dates = parse_dates(df_events["EVENT_DATE"][water]).sort_values()
+
+    # (1) 평균 관수 주기 (diff -> 일 단위)
+    intervals = dates.diff().dt.days.dropna()
+    avg_interval = float(intervals.mean()) if len(intervals) else 0
+
+    # (2) 이번 달 횟수 / (3) 주차별 횟수
+    this_month = dates[(dates.dt.month == now.month).to_numpy()]
+    weeks = (this_month.dt.day.to_numpy() - 1) // 7 + 1
+    counts = np.bincount(weeks, minlength=WEEKS + 2)[1:WEEKS + 1]
+
+    return {
+        "water_avg_interval": round(avg_interval, 1),
+        "water_total_month": int(len(this_month)),
+        "water_weekly": [{"label": f"{i}주차", "value": int(c)} for i, c in enumerate(counts.tolist(), start=1)],
+    }
+
+
+def compute_stats(df_hourly: pd.DataFrame, df_events: pd.DataFrame, now: datetime = None,
+                  resolution: str = None, points: int = None, days: int = None) -> dict:
+    """
+    /statistics/stats 응답 (기존 응답 형식 그대로)
+    - resolution / points / days 중 하나라도 주면 그래프 시리즈를 chart_series로 교체 (analysis는 그대로)
+    """
+    source = df_hourly
+    df_hourly = prepare_hourly(df_hourly)
+    empty = df_hourly.empty
+    chart = None
+    if resolution or points or days:
+        ts, raw = hourly_arrays(source)
+        values = np.vstack([df_hourly[c].to_numpy(dtype=float) for c in HOURLY_COLUMNS]) if not empty else raw
+        chart = chart_series(ts, values, resolution, points, days, raw=raw)
+
+    def _series(col):
+        return df_hourly[col].tolist() if not empty else []
+
+    def _mean(col):
+        return float(df_hourly[col].mean()) if not empty else 0
+
+    result = {
+        # 그래프용 라벨 (HH:MM)
+        "labels": hhmm_labels(df_hourly["CREATED_AT"]) if not empty else [],
+        "temp_data": _series("TEMP_AVG"),
+        "hum_data": _series("HUM_AVG"),
+        "light_data": _series("LIGHT_AVG"),
+
+        # 디자인 시안 하단 수치들
+        "analysis": {
+            "avg_temp": round(_mean("TEMP_AVG"), 1) if not empty else 0,
+            "avg_hum": round(_mean("HUM_AVG"), 1) if not empty else 0,
+            "avg_light": int(_mean("LIGHT_AVG")) if not empty else 0,
+            **water_stats(df_events, now),
+        },
+    }
+    if chart is not None:
+        result.update(chart)
+    return result
+
+
+def _group_interpolate(values: np.ndarray, group: np.ndarray) -> np.ndarray:
+    """
+    식물별 선형 보간 (prepare_hourly의 interpolate(linear).fillna(0)과 같은 결과)
+    - values: 식물/시각 순으로 정렬된 값, group: 행마다 식물 번호 (같은 식물끼리 붙어 있음)
+    - 가운데 결측: 같은 식물의 앞뒤 실측값 사이 직선 / 뒤쪽 결측: 마지막 실측값 / 앞쪽 결측: 0
+    """
+    valid = ~np.isnan(values)
+    if valid.all():
+        return values
+    n = len(values)
+    pos = np.arange(n)
+    prev = np.maximum.accumulate(np.where(valid, pos, -1))
+    nxt = np.minimum.accumulate(np.where(valid, pos, n)[::-1])[::-1]
+    has_prev = (prev >= 0) & (group[np.maximum(prev, 0)] == group)
+    has_next = (nxt < n) & (group[np.minimum(nxt, n - 1)] == group)
+
+    out = np.where(has_prev, values[np.maximum(prev, 0)], 0.0)
+    mid = ~valid & has_prev & has_next
+    p, q = prev[mid], nxt[mid]
+    slope = (values[q] - values[p]) / (q - p)
+    out[mid] = slope * (pos[mid] - p) + values[p]  # np.interp와 같은 계산 순서
+    out[valid] = values[valid]
+    return out
+
+
+def compute_fleet_stats(df_hourly: pd.DataFrame, df_events: pd.DataFrame, now: datetime = None,
+                        series: bool = True) -> dict:
+    """
+    여러 식물의 /statistics/stats를 한 번에 계산 (두 DataFrame 모두 PLANT_ID 컬럼 필요, 없으면 ValueError)
+    - plants: 식물마다 compute_stats와 같은 형식 + plant_id (series=False면 analysis만)
+    - ranking: RANK_METRICS별 [{"plant_id", "value"}, ...] (큰 값부터)
+    """
+    now = now or datetime.now()
+    for name, df in (("hourly", df_hourly), ("events", df_events)):
+        if not df.empty and "PLANT_ID" not in df.columns:
+            raise ValueError(f"{name}에 PLANT_ID 컬럼이 없습니다.")
+
+    # 식물 번호 (시간별/이벤트에 나온 PLANT_ID 전체, 정렬)
+    hourly_ids = df_hourly["PLANT_ID"].to_numpy() if not df_hourly.empty else np.array([])
+    event_ids = df_events["PLANT_ID"].to_numpy() if not df_events.empty else np.array([])
+    ids = [a for a in (hourly_ids, event_ids) if len(a)]  # 빈 배열(float)과 합치면 PLANT_ID가 float이 됨
+    plant_ids = pd.Index(np.concatenate(ids) if ids else []).unique().sort_values()
+    k = len(plant_ids)
+
+    # (1) 시간별: 식물 -> 시각 순 정렬 (식물마다 sort_values(kind="stable")와 같은 순서)
+    n_h = len(df_hourly) if "CREATED_AT" in df_hourly.columns else 0
+    h_group = plant_ids.get_indexer(hourly_ids) if n_h else np.array([], dtype=np.int64)
+    if n_h:
+        dates = parse_dates(df_hourly["CREATED_AT"])
+        order = np.lexsort((utc_naive(dates).astype(np.int64), h_group))
+        h_group = h_group[order]
+        labels = hhmm_labels(dates.iloc[order]) if series else None
+    counts = np.bincount(h_group, minlength=k)
+    bounds = np.r_[0, np.cumsum(counts)]
+    columns = {}
+    for col in HOURLY_COLUMNS:
+        if n_h and col in df_hourly.columns:
+            values = pd.to_numeric(df_hourly[col], errors="coerce").to_numpy(dtype=float)[order]
+        else:
+            values = np.zeros(n_h)
+        columns[col] = _group_interpolate(values, h_group)
+    # 평균은 식물 구간마다 np.mean (bincount 합계는 더하는 순서가 달라 반올림 경계에서 compute_stats와 달라질 수 있음)
+    means = {col: [v[bounds[g]:bounds[g + 1]].mean() if counts[g] else 0.0 for g in range(k)]
+             for col, v in columns.items()}
+
+    # (2) 관수: 물 준 이벤트만 식물 -> 시각 순 정렬 후 같은 식물 안에서만 간격 계산
+    if not df_events.empty and "EVENT_TYPE" in df_events.columns:
+        water = df_events["EVENT_TYPE"].to_numpy() == WATER_EVENT
+        w_dates = utc_naive(parse_dates(df_events["EVENT_DATE"][water]))
+        w_group = plant_ids.get_indexer(event_ids[water])
+        order = np.lexsort((w_dates.astype(np.int64), w_group))
+        w_dates, w_group = w_dates[order], w_group[order]
+    else:
+        w_dates, w_group = np.array([], dtype="datetime64[ns]"), np.array([], dtype=np.int64)
+    same = w_group[1:] == w_group[:-1]
+    gaps = (np.diff(w_dates) // np.timedelta64(1, "D"))[same]
+    interval_sum = np.bincount(w_group[1:][same], weights=gaps, minlength=k)
+    interval_n = np.bincount(w_group[1:][same], minlength=k)
+    month_start = w_dates.astype("datetime64[M]")
+    this_month = (month_start.astype(np.int64) % 12 + 1) == now.month
+    weeks = ((w_dates - month_start.astype("datetime64[ns]")) // np.timedelta64(1, "D") // 7 + 1)[this_month]
+    month_weeks = np.bincount(w_group[this_month] * (WEEKS + 2) + weeks, minlength=k * (WEEKS + 2))
+    month_weeks = month_weeks.reshape(k, WEEKS + 2)
+
+    plants = []
+    for g, plant_id in enumerate(plant_ids.tolist()):
+        empty = counts[g] == 0
+        interval = float(interval_sum[g] / interval_n[g]) if interval_n[g] else 0
+        plant = {"plant_id": plant_id}
+        if series:
+            lo, hi = bounds[g], bounds[g + 1]
+            plant.update({
+                "labels": labels[lo:hi] if not empty else [],
+                "temp_data": columns["TEMP_AVG"][lo:hi].tolist(),
+                "hum_data": columns["HUM_AVG"][lo:hi].tolist(),
+                "light_data": columns["LIGHT_AVG"][lo:hi].tolist(),
+            })
+        plant["analysis"] = {
+            "avg_temp": round(float(means["TEMP_AVG"][g]), 1) if not empty else 0,
+            "avg_hum": round(float(means["HUM_AVG"][g]), 1) if not empty else 0,
+            "avg_light": int(means["LIGHT_AVG"][g]) if not empty else 0,
+            "water_avg_interval": round(interval, 1),
+            "water_total_month": int(month_weeks[g].sum()),
+            "water_weekly": [{"label": f"{i}주차", "value": int(month_weeks[g, i])} for i in range(1, WEEKS + 1)],
+        }
+        plants.append(plant)
+
+    ranking = {}
+    for metric in RANK_METRICS:
+        rows = [{"plant_id": p["plant_id"], "value": p["analysis"][metric]} for p in plants]
+        ranking[metric] = sorted(rows, key=lambda r: r["value"], reverse=True)
+    return {"plants": plants, "ranking": ranking}
@@ -0,0 +1,203 @@
+# python_server/services/sensor_buffer.py
+# ✅ 역할: plant_id별 센서값을 "스트리밍 집계"로 모아두는 저장소
+# - SensorIn 객체를 리스트로 쌓지 않고, 들어오는 즉시 통계만 갱신
+#   (개수 / Welford 평균·분산 / 최소·최대)
+# - 분위수(p5/p50/p95)는 고정 크기 reservoir 샘플(미리 할당한 numpy 배열)로 추정
+# - 배열 크기가 고정이라 식물 1개당 메모리 상한이 정해져 있고, flush 비용도 데이터 양과 무관
+
+import os
+import random
+from datetime import datetime
+
+import numpy as np
+
+# 채널 순서 = 배열 컬럼 순서 (temp, hum, light, soil)
+CHANNELS = ("temp", "hum", "light", "soil")
+
+# 식물 1개당 분위수 추정용 샘플 개수 (환경변수로 조절 가능)
+BUFFER_CAPACITY = int(os.getenv("SENSOR_BUFFER_CAPACITY", "1024"))
+
+# hourly payload에 넣을 분위수
+QUANTILES = (5, 50, 95)
+
+# 게이트웨이 일괄 전송용 packed-binary 레코드 규격 (little-endian, 1건 = 20 byte)
+# plant_id(int32) | temp | hum | light | soil (float32 x 4)
+PACKED_DTYPE = np.dtype([
+    ("plant_id", "<i4"),
+    ("temp", "<f4"),
+    ("hum", "<f4"),
+    ("light", "<f4"),
+    ("soil", "<f4"),
+])
+
+_rng = np.random.default_rng()
+
+
+class SensorBuffer:
+    """식물 1개의 현재 집계 구간(start~) 스트리밍 통계"""
+
+    __slots__ = ("start", "capacity", "rows", "count", "mean", "m2", "min", "max", "last")
+
+    def __init__(self, start: datetime, capacity: int = BUFFER_CAPACITY):
+        self.start = start
+        self.capacity = capacity
+        n_ch = len(CHANNELS)
+        # (capacity, 4) float32 reservoir 샘플
+        self.rows = np.zeros((capacity, n_ch), dtype=np.float32)
+        # 채널별 Welford 누적값
+        self.mean = np.zeros(n_ch, dtype=np.float64)
+        self.m2 = np.zeros(n_ch, dtype=np.float64)
+        self.min = np.full(n_ch, np.inf)
+        self.max = np.full(n_ch, -np.inf)
+        self.last = np.zeros(n_ch, dtype=np.float32)
+        self.count = 0
+
+    def append(self, temp: float, hum: float, light: float, soil: float) -> None:
+        """센서값 1건 반영 (O(1), 객체 보관 없음)"""
+        x = self.last
+        x[:] = (temp, hum, light, soil)
+        self.count += 1
+
+        # Welford 온라인 평균/분산
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        np.minimum(self.min, x, out=self.min)
+        np.maximum(self.max, x, out=self.max)
+
+        # reservoir sampling (Algorithm R)
+        if self.count <= self.capacity:
+            self.rows[self.count - 1] = x
+        else:
+            j = random.randrange(self.count)
+            if j < self.capacity:
+                self.rows[j] = x
+
+    def extend(self, block: np.ndarray) -> None:
+        """센서값 여러 건을 한 번에 반영 (block: (n, 4) 배열)"""
+        n = len(block)
+        if not n:
+            return
+        na = self.count
+        total = na + n
+
+        # 묶음 통계를 구해서 기존 누적값과 병합 (Chan et al. 병렬 분산 공식)
+        b = block.astype(np.float64, copy=False)
+        mean_b = b.mean(axis=0)
+        m2_b = ((b - mean_b) ** 2).sum(axis=0)
+        delta = mean_b - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += m2_b + delta ** 2 * (na * n / total)
+        np.minimum(self.min, b.min(axis=0), out=self.min)
+        np.maximum(self.max, b.max(axis=0), out=self.max)
+        self.last[:] = block[-1]
+        self.count = total
+
+        # reservoir sampling: 비어 있는 칸은 그대로 채우고, 나머지는 확률적으로 교체
+        fill = max(0, min(n, self.capacity - na))
+        if fill:
+            self.rows[na:na + fill] = block[:fill]
+        if fill < n:
+            seen = np.arange(na + fill, total) + 1  # 각 값이 몇 번째 값인지 (1부터)
+            j = (_rng.random(n - fill) * seen).astype(np.int64)
+            keep = j < self.capacity
+            self.rows[j[keep]] = block[fill:][keep]
+
+    def merge(self, other: "SensorBuffer") -> None:
+        """
+        다른 버퍼(같은 식물)의 통계를 합친다. (전송 실패한 구간을 다시 돌려놓을 때 사용)
+        - 시작 시각은 더 이른 쪽으로
+        - reservoir는 양쪽 개수 비율대로 다시 뽑음
+        """
+        if not other.count:
+            return
+        na, nb = self.count, other.count
+        total = na + nb
+        sample_a = self.rows[:min(na, self.capacity)]
+        sample_b = other.rows[:min(nb, other.capacity)]
+
+        if total <= self.capacity:
+            merged = np.concatenate([sample_a, sample_b])
+        else:
+            k_a = min(len(sample_a), round(self.capacity * na / total))
+            k_b = min(len(sample_b), self.capacity - k_a)
+            merged = np.concatenate([
+                sample_a[_rng.choice(len(sample_a), k_a, replace=False)],
+                sample_b[_rng.choice(len(sample_b), k_b, replace=False)],
+            ])
+        self.rows[:len(merged)] = merged
+
+        delta = other.mean - self.mean
+        self.mean += delta * (nb / total)
+        self.m2 += other.m2 + delta ** 2 * (na * nb / total)
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        if not na:
+            self.last[:] = other.last
+        self.count = total
+        self.start = min(self.start, other.start)
+
+    def stats(self) -> dict:
+        """
+        채널별 통계 { "temp": {"avg", "min", "max", "std", "p5", "p50", "p95"}, ... }
+        - 원본값을 다시 훑지 않음 (reservoir 샘플 크기만큼만 계산)
+        """
+        n = self.count
+        std = np.sqrt(self.m2 / (n - 1)) if n > 1 else np.zeros_like(self.m2)
+        sample = self.rows[:min(n, self.capacity)]
+        qs = np.percentile(sample, QUANTILES, axis=0)
+
+        result = {}
+        for i, ch in enumerate(CHANNELS):
+            s = {
+                "avg": float(self.mean[i]),
+                "min": float(self.min[i]),
+                "max": float(self.max[i]),
+                "std": float(std[i]),
+            }
+            for q, v in zip(QUANTILES, qs[:, i].tolist()):
+                s[f"p{q}"] = v
+            result[ch] = s
+        return result
+
+    def latest(self) -> dict:
+        """가장 마지막으로 들어온 센서값"""
+        if not self.count:
+            return {}
+        return {ch: float(v) for ch, v in zip(CHANNELS, self.last)}
+
+    @property
+    def nbytes(self) -> int:
+        """이 버퍼가 차지하는 배열 메모리(byte)"""
+        return (self.rows.nbytes + self.mean.nbytes + self.m2.nbytes
+                + self.min.nbytes + self.max.nbytes + self.last.nbytes)
+
+    def report(self) -> dict:
+        return {
+            "start": self.start.strftime("%Y-%m-%d %H:%M:%S"),
+            "count": self.count,
+            "capacity": self.capacity,
+            "bytes": self.nbytes,
+            "latest": self.latest(),
+        }
+
+
+def ingest_block(buffers: dict, plant_ids: np.ndarray, values: np.ndarray, now: datetime) -> dict:
+    """
+    여러 식물의 센서값 묶음을 plant_id별로 나눠 각 버퍼에 넣는다.
+    - plant_ids: (n,) 정수 배열, values: (n, 4) 배열 (CHANNELS 순서)
+    - 반환: { plant_id: 이번에 추가된 건수 }
+    """
+    order = np.argsort(plant_ids, kind="stable")  # 같은 식물 안에서는 도착 순서 유지
+    sorted_ids = plant_ids[order]
+    sorted_vals = values[order]
+    ids, starts, counts = np.unique(sorted_ids, return_index=True, return_counts=True)
+
+    added = {}
+    for plant_id, s, n in zip(ids.tolist(), starts.tolist(), counts.tolist()):
+        buf = buffers.get(plant_id)
+        if buf is None:
+            buf = buffers[plant_id] = SensorBuffer(now)
+        buf.extend(sorted_vals[s:s + n])
+        added[plant_id] = n
+    return added
@@ -0,0 +1,102 @@
+# python_server/services/sensor_events.py
+# ✅ 역할: 센서 이벤트 "상태 전이" 엔진 (알림 폭주 방지)
+# - 임계치 근처에서 값이 오르락내리락하면 매 측정마다 TEMP_HIGH 등이 생겨서
+#   Node -> /llm/notification 호출이 계속 발생하는 문제를 줄임
+# - 식물/채널별로 NORMAL / LOW / HIGH 상태를 기억하고, 상태가 바뀔 때만 이벤트를 냄
+#   1) 히스테리시스: HIGH에서 빠져나오려면 MAX - band 아래로 내려가야 함 (LOW는 MIN + band 위로)
+#   2) 최소 유지 시간(dwell): 새 상태가 dwell초 이상 계속돼야 전이로 인정
+#   3) 쿨다운: 같은 이벤트(enter)는 cooldown초 안에 다시 알리지 않음
+
+import os
+import time
+
+from services.thresholds import EVENT_PREFIX
+
+NORMAL, LOW, HIGH = 0, -1, 1
+_STATE_NAME = {LOW: "LOW", HIGH: "HIGH"}
+
+# 채널별 히스테리시스 폭 (temp ℃, hum %, light lux, soil raw 0~4095)
+DEFAULT_BANDS = (0.5, 2.0, 50.0, 100.0)
+DWELL_SECONDS = float(os.getenv("SENSOR_EVENT_DWELL_SECONDS", "30"))
+COOLDOWN_SECONDS = float(os.getenv("SENSOR_EVENT_COOLDOWN_SECONDS", "1800"))
+
+
+class _ChannelState:
+    __slots__ = ("state", "pending", "since", "notified", "last_enter")
+
+    def __init__(self):
+        self.state = NORMAL
+        self.pending = NORMAL
+        self.since = 0.0
+        self.notified = False   # 현재 상태의 enter를 알렸는지 (알린 것만 exit도 알림)
+        self.last_enter = {}    # { LOW/HIGH: 마지막으로 enter 알린 시각 }
+
+
+class EventEngine:
+    def __init__(self, bands=DEFAULT_BANDS, dwell: float = DWELL_SECONDS, cooldown: float = COOLDOWN_SECONDS):
+        self.bands = bands
+        self.dwell = dwell
+        self.cooldown = cooldown
+        self._plants = {}  # { plant_id: [_ChannelState x 4] }
+
+    def update(self, plant_id: int, values, limits, now: float = None) -> dict:
+        """
+        센서값 1건 반영 후 결과 반환
+        - values: (temp, hum, light, soil), limits: thresholds.COLUMNS 순서 8개
+        - 반환: {"transitions": [{"event": "TEMP_HIGH", "kind": "enter"|"exit"}, ...],
+                "active": ["TEMP_HIGH", ...]}  (active = 현재 확정된 이상 상태)
+        """
+        now = time.time() if now is None else now
+        channels = self._plants.get(plant_id)
+        if channels is None:
+            channels = self._plants[plant_id] = [_ChannelState() for _ in EVENT_PREFIX]
+
+        transitions = []
+        active = []
+        for i, st in enumerate(channels):
+            v = float(values[i])
+            lo, hi = limits[2 * i], limits[2 * i + 1]
+            band = self.bands[i]
+
+            # 히스테리시스 적용한 "지금 값이 가리키는 상태"
+            if st.state == HIGH and v > hi - band:
+                target = HIGH
+            elif st.state == LOW and v < lo + band:
+                target = LOW
+            elif v > hi:
+                target = HIGH
+            elif v < lo:
+                target = LOW
+            else:
+                target = NORMAL
+
+            if target == st.state:
+                st.pending = st.state
+            else:
+                if st.pending != target:
+                    st.pending, st.since = target, now
+                if now - st.since >= self.dwell:
+                    self._transition(EVENT_PREFIX[i], st, target, now, transitions)
+
+            if st.state != NORMAL:
+                active.append(f"{EVENT_PREFIX[i]}_{_STATE_NAME[st.state]}")
+
+        return {"transitions": transitions, "active": active}
+
+    def _transition(self, prefix: str, st: _ChannelState, target: int, now: float, out: list) -> None:
+        if st.state != NORMAL and st.notified:
+            out.append({"event": f"{prefix}_{_STATE_NAME[st.state]}", "kind": "exit"})
+        st.state = st.pending = target
+        st.notified = False
+        if target != NORMAL:
+            last = st.last_enter.get(target)
+            if last is None or now - last >= self.cooldown:
+                out.append({"event": f"{prefix}_{_STATE_NAME[target]}", "kind": "enter"})
+                st.last_enter[target] = now
+                st.notified = True
+
+    def reset(self, plant_id: int = None) -> None:
+        if plant_id is None:
+            self._plants.clear()
+        else:
+            self._plants.pop(plant_id, None)
@@ -0,0 +1,204 @@
+# python_server/services/sensor_forwarder.py
+# ✅ 역할: uvicorn --workers N 환경에서 센서 집계를 "한 프로세스"로 모으기
+# - 워커마다 _buffers가 따로 있으면 식물 1개의 값이 여러 프로세스로 쪼개져서
+#   각자 부분 평균을 Node로 보내는 문제가 생김
+# - 로컬 TCP 포트(127.0.0.1:port)를 먼저 bind한 워커가 "집계 담당(leader)"
+#   나머지 워커(follower)는 받은 센서값을 packed-binary(PACKED_DTYPE)로 leader에게 전달만 함
+# - leader가 죽으면 follower 중 하나가 포트를 다시 bind해서 leader가 됨
+#
+# 전송 규격: [4 byte 길이(little-endian uint32)] + [PACKED_DTYPE 레코드들]
+#
+# ✅ 요청/응답이 필요한 것은 port + 1의 요청 서버로 leader에게 보냄
+# - 이벤트 판정: EventEngine의 히스테리시스/유지 시간/쿨다운 상태가 워커마다 따로 있으면
+#   같은 식물의 측정값이 워커마다 나뉘어서 enter 알림이 중복/누락됨
+# - 식물별 통계 캐시(/statistics/stats): 워커마다 캐시/cursor가 다르면 409 + 전체 재전송이 반복됨
+# - 성장 추적(/image/track): 워커마다 칼만 필터 상태가 나뉘고, 추적 파일을 자기 것만으로 덮어씀
+# - 요청: [4 byte 길이] + [1 byte 종류] + [내용], 응답: [4 byte 길이] + [내용]
+#   (종류별 handler 등록/호출은 services/leader_rpc.py, 내용 형식은 routers/sensor.py, routers/statistics.py 참고)
+
+import asyncio
+import collections
+import inspect
+import struct
+
+FRAME_HEADER = struct.Struct("<I")
+AGGREGATOR_HOST = "127.0.0.1"
+
+
+async def start_aggregator_server(port: int, on_records) -> asyncio.AbstractServer:
+    """
+    leader용 수신 서버 시작 (포트가 이미 사용 중이면 OSError)
+    - on_records(data: bytes): 프레임 1개(레코드 묶음)를 받을 때마다 호출
+    """
+    async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                (size,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                on_records(await reader.readexactly(size))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # follower 종료/재시작
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(_handle, AGGREGATOR_HOST, port)
+
+
+async def start_rpc_server(port: int, handlers: dict) -> asyncio.AbstractServer:
+    """
+    leader용 요청 서버 시작 (포트가 이미 사용 중이면 OSError)
+    - handlers: { 종류(1 byte): handler(data: bytes) -> bytes (async 함수도 가능) }
+      요청 1개마다 종류에 맞는 handler를 호출하고 반환값을 응답으로 보냄
+    """
+    async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                (size,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                data = await reader.readexactly(size)
+                reply = handlers[data[:1]](data[1:])
+                if inspect.isawaitable(reply):
+                    reply = await reply
+                writer.write(FRAME_HEADER.pack(len(reply)) + reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # follower 종료/재시작
+        except Exception as e:
+            print("❌ leader 요청 처리 실패:", repr(e))
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(_handle, AGGREGATOR_HOST, port)
+
+
+class LeaderClient:
+    """follower용: leader 요청 서버에 요청하고 응답을 기다림 (연결 1개를 요청 순서대로 사용)"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self._lock = asyncio.Lock()
+        self._reader = None
+        self._writer = None
+
+    async def call(self, kind: bytes, data: bytes) -> bytes:
+        """
+        요청 1개(종류 kind) 전송 -> 응답
+        - 연결이 끊겨 있으면 한 번 다시 연결 (leader가 바뀐 직후)
+        - 그래도 안 되면 ConnectionError (leader 전환 중)
+        """
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        self._reader, self._writer = await asyncio.open_connection(AGGREGATOR_HOST, self.port)
+                    self._writer.write(FRAME_HEADER.pack(len(data) + 1) + kind + data)
+                    await self._writer.drain()
+                    (size,) = FRAME_HEADER.unpack(await self._reader.readexactly(FRAME_HEADER.size))
+                    return await self._reader.readexactly(size)
+                except (asyncio.IncompleteReadError, OSError) as e:
+                    self.close()
+                    if attempt:
+                        raise ConnectionError(f"leader 요청 서버 연결 실패: {e}") from e
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+class SensorForwarder:
+    """follower용: 받은 센서값을 모아 두었다가 leader 연결로 묶어서 전송"""
+
+    def __init__(self, port: int, promote, max_pending_bytes: int = 8 * 1024 * 1024):
+        """
+        - promote(): leader 연결이 안 될 때 호출, 직접 leader가 되면 True 반환
+        - max_pending_bytes: leader가 없는 동안 메모리에 쌓아둘 최대 크기 (넘으면 오래된 것부터 버림)
+        """
+        self.port = port
+        self._promote = promote
+        self.max_pending_bytes = max_pending_bytes
+        self._pending = collections.deque()
+        self._pending_bytes = 0
+        self._ready = asyncio.Event()
+        self._inflight = 0   # 지금 전송 중인 대기열 앞쪽 항목 수 (버리면 안 됨)
+        self.dropped = 0
+
+    def send(self, data: bytes) -> None:
+        """전송 대기열에 추가 (요청 처리 중에는 대기하지 않음)"""
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        while self._pending_bytes > self.max_pending_bytes and len(self._pending) > self._inflight + 1:
+            old = self._pending[self._inflight]
+            del self._pending[self._inflight]
+            self._pending_bytes -= len(old)
+            self.dropped += len(old)
+        self._ready.set()
+
+    @staticmethod
+    async def _disconnect(writer: asyncio.StreamWriter, closed: asyncio.Future) -> None:
+        """leader 연결 정리 (연결 끊김 감시 task도 같이 취소 -> 재연결마다 task가 쌓이지 않게)"""
+        writer.close()
+        if not closed.done():
+            closed.cancel()
+        try:
+            await closed
+        except (asyncio.CancelledError, ConnectionError, OSError):
+            pass
+
+    async def run(self) -> bytes:
+        """
+        leader로 계속 전송. 이 워커가 leader로 승격되면 종료하면서
+        아직 못 보낸 데이터를 반환 (호출한 쪽에서 로컬 버퍼에 넣음)
+        """
+        writer = None
+        closed = None  # leader 쪽에서 연결이 끊기면 완료되는 task (leader는 아무것도 보내지 않음)
+        while True:
+            if writer is None:
+                try:
+                    reader, writer = await asyncio.open_connection(AGGREGATOR_HOST, self.port)
+                    closed = asyncio.ensure_future(reader.read())
+                except OSError:
+                    if await self._promote():
+                        leftover = b"".join(self._pending)
+                        self._pending.clear()
+                        self._pending_bytes = 0
+                        return leftover
+                    await asyncio.sleep(1.0)
+                    continue
+
+            ready = asyncio.ensure_future(self._ready.wait())
+            await asyncio.wait((ready, closed), return_when=asyncio.FIRST_COMPLETED)
+            if closed.done():
+                ready.cancel()
+                print("⚠️ 센서 집계 프로세스 연결 끊김, 재연결 시도")
+                await self._disconnect(writer, closed)
+                writer = closed = None
+                continue
+            self._ready.clear()
+
+            # 쌓인 것을 한 프레임으로 묶어서 전송 (성공한 만큼만 대기열에서 제거)
+            taken = len(self._pending)
+            if not taken:
+                continue
+            chunk = b"".join(self._pending)
+            self._inflight = taken
+            try:
+                writer.write(FRAME_HEADER.pack(len(chunk)) + chunk)
+                await writer.drain()
+            except (ConnectionError, OSError) as e:
+                print("⚠️ 센서 집계 프로세스 연결 끊김, 재연결 시도:", e)
+                await self._disconnect(writer, closed)
+                writer = closed = None
+                self._ready.set()
+                continue
+            finally:
+                self._inflight = 0
+
+            for _ in range(taken):
+                self._pending_bytes -= len(self._pending.popleft())
+            if self._pending:
+                self._ready.set()
+
+    def report(self) -> dict:
+        return {
+            "pending_bytes": self._pending_bytes,
+            "dropped_bytes": self.dropped,
+        }
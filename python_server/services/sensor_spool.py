@@ -0,0 +1,260 @@
+# python_server/services/sensor_spool.py
+# ✅ 역할: 센서값 "쓰기 전 기록(write-ahead) 스풀"
+# - /sensor/ingest로 들어온 값을 메모리 버퍼에 넣기 전에 디스크 세그먼트 파일에 먼저 기록
+# - uvicorn 재시작 / Node 장애 중에도 아직 전송 못 한 값이 남아 있음 -> 시작 시 replay
+# - Node 전송이 성공하면 그 식물의 "어디까지 보냈는지(seq)"를 index.json에 기록하고,
+#   모든 값이 전송 완료된 세그먼트 파일은 삭제(truncate)
+#
+# 파일 구조 (spool_dir/)
+# - seg_00000001.log ... : 고정 크기 세그먼트, mmap으로 열어서 RECORD_DTYPE 레코드를 이어서 기록
+# - index.json          : { "flushed": { plant_id: 전송 완료된 마지막 seq }, "seq": 지금까지 발급한 마지막 seq }
+#   (다 보낸 세그먼트가 지워져도 재시작 후 seq가 flushed보다 작은 값부터 다시 시작하지 않도록)
+#
+# fsync(msync)는 레코드마다 하지 않고 fsync_every건 또는 fsync_interval초마다 한 번씩 묶어서 실행
+
+import json
+import mmap
+import os
+import time
+
+import numpy as np
+
+# 레코드 1건 = 40 byte (seq가 0이면 빈 칸 = 세그먼트의 끝)
+RECORD_DTYPE = np.dtype([
+    ("seq", "<u8"),
+    ("ts", "<f8"),        # 수신 시각 (epoch 초)
+    ("plant_id", "<i4"),
+    ("values", "<f4", (4,)),  # temp, hum, light, soil
+    ("_pad", "<u4"),
+])
+
+
+class SensorSpool:
+    def __init__(
+        self,
+        spool_dir: str = "sensor_spool",
+        segment_records: int = 65536,
+        fsync_every: int = 256,
+        fsync_interval: float = 1.0,
+        max_segments: int = 64,
+    ):
+        self.dir = spool_dir
+        self.segment_records = segment_records
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.max_segments = max_segments
+
+        self.flushed = {}      # { plant_id: 전송 완료된 마지막 seq }
+        self.last_seq = {}     # { plant_id: 스풀에 기록된 마지막 seq }
+        self._segments = {}    # { 세그먼트 번호: { plant_id: 그 세그먼트 안 최대 seq } }
+        self._seq = 0
+
+        self._seg_no = 0
+        self._file = None
+        self._mm = None
+        self._view = None      # mmap 위의 RECORD_DTYPE 배열 뷰
+        self._pos = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+        os.makedirs(self.dir, exist_ok=True)
+
+    # -----------------------------
+    # 시작 시 복구
+    # -----------------------------
+    def replay(self):
+        """
+        index.json + 세그먼트 파일을 읽어서 아직 전송 안 된 레코드를 돌려준다.
+        반환: (plant_ids, values, ts) numpy 배열 3개 (seq 순서)
+        """
+        index_path = os.path.join(self.dir, "index.json")
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.flushed = {int(k): v for k, v in index.get("flushed", {}).items()}
+            # 예전 index.json(seq 없음)이어도 전송 완료 seq보다는 크게 시작
+            self._seq = max(self._seq, int(index.get("seq", 0)), max(self.flushed.values(), default=0))
+
+        pending = []
+        for seg_no in self._segment_numbers():
+            records = self._read_segment(seg_no)
+            self._seg_no = seg_no
+            self._pos = len(records)
+            if not len(records):
+                continue
+            self._seq = max(self._seq, int(records["seq"][-1]))
+            self._note_segment(seg_no, records["plant_id"], records["seq"])
+
+            # plant_id별 전송 완료 seq보다 큰 것만 남김
+            done = np.array([self.flushed.get(p, 0) for p in records["plant_id"].tolist()], dtype=np.uint64)
+            pending.append(records[records["seq"] > done])
+
+        for meta in self._segments.values():
+            for p, seq in meta.items():
+                self.last_seq[p] = max(self.last_seq.get(p, 0), seq)
+
+        # 이어서 쓸 세그먼트를 먼저 연 다음 정리 (열려 있는 세그먼트는 _drop_finished_segments가 지우지 않음)
+        self._open_segment(self._seg_no or 1, reuse=True)
+        self._drop_finished_segments()
+
+        if not pending:
+            empty = np.empty(0, dtype=RECORD_DTYPE)
+            return empty["plant_id"].astype(np.int64), empty["values"], empty["ts"]
+        records = np.concatenate(pending)
+        return records["plant_id"].astype(np.int64), records["values"], records["ts"]
+
+    # -----------------------------
+    # 기록
+    # -----------------------------
+    def append(self, plant_ids: np.ndarray, values: np.ndarray, ts: float = None) -> None:
+        """센서값 n건 기록 (plant_ids: (n,), values: (n, 4))"""
+        n = len(plant_ids)
+        if not n:
+            return
+        ts = time.time() if ts is None else ts
+        seqs = np.arange(self._seq + 1, self._seq + n + 1, dtype=np.uint64)
+        self._seq += n
+
+        done = 0
+        while done < n:
+            if self._pos >= self.segment_records:
+                self._rotate()
+            take = min(n - done, self.segment_records - self._pos)
+            out = self._view[self._pos:self._pos + take]
+            out["ts"] = ts
+            out["plant_id"] = plant_ids[done:done + take]
+            out["values"] = values[done:done + take]
+            out["seq"] = seqs[done:done + take]  # seq를 마지막에 써야 "쓰다 만" 레코드가 유효로 안 보임
+            self._note_segment(self._seg_no, plant_ids[done:done + take], seqs[done:done + take])
+            self._pos += take
+            done += take
+
+        for p, s in zip(plant_ids.tolist(), seqs.tolist()):
+            self.last_seq[p] = s
+
+        self._pending += n
+        self.sync()
+
+    def sync(self, force: bool = False) -> None:
+        """묶어둔 기록을 디스크에 반영 (msync)"""
+        if not self._pending:
+            return
+        if not force and self._pending < self.fsync_every \
+                and time.monotonic() - self._last_sync < self.fsync_interval:
+            return
+        self._mm.flush()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    # -----------------------------
+    # 전송 완료 처리
+    # -----------------------------
+    def commit(self, flushed: dict) -> None:
+        """
+        Node 전송 성공한 식물들의 seq를 기록하고, 다 보낸 세그먼트는 삭제
+        - flushed: { plant_id: 이번에 전송한 구간의 마지막 seq }
+        """
+        if not flushed:
+            return
+        for plant_id, seq in flushed.items():
+            if seq > self.flushed.get(plant_id, 0):
+                self.flushed[plant_id] = seq
+
+        index_path = os.path.join(self.dir, "index.json")
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"flushed": self.flushed, "seq": self._seq}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, index_path)
+
+        self._drop_finished_segments()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self.sync(force=True)
+            self._view = None
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    def report(self) -> dict:
+        return {
+            "dir": self.dir,
+            "segments": len(self._segments),
+            "active_segment": self._seg_no,
+            "seq": self._seq,
+            "unsynced": self._pending,
+        }
+
+    # -----------------------------
+    # 내부 함수
+    # -----------------------------
+    def _segment_path(self, seg_no: int) -> str:
+        return os.path.join(self.dir, f"seg_{seg_no:08d}.log")
+
+    def _segment_numbers(self) -> list:
+        nums = []
+        for name in os.listdir(self.dir):
+            if name.startswith("seg_") and name.endswith(".log"):
+                nums.append(int(name[4:-4]))
+        return sorted(nums)
+
+    def _read_segment(self, seg_no: int) -> np.ndarray:
+        """세그먼트에서 유효한 레코드(seq > 0인 앞부분)만 복사해서 반환"""
+        with open(self._segment_path(seg_no), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            usable = size - size % RECORD_DTYPE.itemsize
+            if not usable:
+                return np.empty(0, dtype=RECORD_DTYPE)
+            with mmap.mmap(f.fileno(), usable, access=mmap.ACCESS_READ) as mm:
+                records = np.frombuffer(mm, dtype=RECORD_DTYPE)
+                empty = np.flatnonzero(records["seq"] == 0)
+                end = int(empty[0]) if empty.size else len(records)
+                valid = records[:end].copy()
+                del records
+        return valid
+
+    def _note_segment(self, seg_no: int, plant_ids: np.ndarray, seqs: np.ndarray) -> None:
+        meta = self._segments.setdefault(seg_no, {})
+        for p, s in zip(plant_ids.tolist(), seqs.tolist()):
+            meta[p] = s  # seq는 증가 순서라 마지막 값이 최대
+
+    def _open_segment(self, seg_no: int, reuse: bool = False) -> None:
+        path = self._segment_path(seg_no)
+        size = self.segment_records * RECORD_DTYPE.itemsize
+        if not reuse or not os.path.exists(path):
+            self._pos = 0
+        self._file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        if os.fstat(self._file.fileno()).st_size < size:
+            self._file.truncate(size)  # 미리 고정 크기로 할당 (빈 칸은 0 = seq 없음)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self._view = np.frombuffer(self._mm, dtype=RECORD_DTYPE)
+        self._seg_no = seg_no
+
+    def _rotate(self) -> None:
+        self.close()
+        self._open_segment(self._seg_no + 1)
+
+        # 디스크 상한: 오래된 세그먼트부터 버림 (Node 장기 장애 대비)
+        while len(self._segments) > self.max_segments:
+            oldest = min(self._segments)
+            print(f"⚠️ 스풀 용량 초과 -> 전송 안 된 세그먼트 삭제: {self._segment_path(oldest)}")
+            for p, s in self._segments[oldest].items():
+                self.flushed[p] = max(self.flushed.get(p, 0), s)
+            self._remove_segment(oldest)
+
+    def _drop_finished_segments(self) -> None:
+        for seg_no in list(self._segments):
+            if seg_no == self._seg_no and self._mm is not None:
+                continue  # 지금 쓰는 세그먼트는 유지
+            meta = self._segments[seg_no]
+            if all(s <= self.flushed.get(p, 0) for p, s in meta.items()):
+                self._remove_segment(seg_no)
+
+    def _remove_segment(self, seg_no: int) -> None:
+        self._segments.pop(seg_no, None)
+        try:
+            os.remove(self._segment_path(seg_no))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,198 @@
+# python_server/services/stats_cache.py
+# ✅ 역할: 식물별 /statistics/stats 결과를 누적 상태로 캐시 (증분 계산)
+# - 기존: 대시보드를 열 때마다 전체 이력(시간별 + 이벤트)을 다시 받아 보간/평균/관수 주기/주차별 횟수를 처음부터 계산
+# - 캐시: 식물마다 마지막으로 반영한 시각(cursor)과 누적값만 보관
+#   시간별: 최근 STATS_WINDOW_HOURS 구간의 원본값/보간값 (새 행이 오면 마지막 실측값 이후 구간만 다시 보간)
+#   관수: 물 준 시각 목록 + 간격(일) 합계 + 월/주차별 횟수 -> 새 이벤트만 더함
+#   그래프 롤업(시/일/주): 최근 STATS_ROLLUP_DAYS일 (services/stats_rollup.py, 긴 기간 그래프는 원본 대신 이것만 사용)
+# - 요청 비용이 전체 이력이 아니라 새로 들어온 행 수에 비례
+# - 결과는 compute_stats(전체 재계산)와 같음 (시각은 UTC 기준)
+# - 프로토콜(routers/statistics.py): 응답의 cursor를 다음 요청에 그대로 보내고, 그 이후 행만 전송
+#   서버 재시작 등으로 캐시 cursor가 다르면 None 반환 -> 라우터가 409로 전체 재전송 요청
+# - 캐시는 프로세스 1개에만 둠 (uvicorn --workers N이면 leader 워커, 다른 워커는 요청을 leader로 전달)
+
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from services.plant_stats import (HOURLY_COLUMNS, WATER_EVENT, WEEKS, chart_series, hhmm_labels, hourly_arrays,
+                                  parse_dates, utc_naive)
+from services.stats_rollup import build_rollups
+
+# 캐시에 보관할 식물 수 (넘으면 가장 오래 안 쓴 식물부터 삭제)
+STATS_CACHE_PLANTS = int(os.getenv("STATS_CACHE_PLANTS", "1000"))
+# 시간별 그래프 구간 (Node 쿼리의 INTERVAL 24 HOUR와 같게)
+STATS_WINDOW_HOURS = int(os.getenv("STATS_WINDOW_HOURS", "24"))
+# 시/일/주 롤업 보관 기간 (Node가 처음 전체 이력을 보낼 때의 기간과 같게)
+STATS_ROLLUP_DAYS = int(os.getenv("STATS_ROLLUP_DAYS", "90"))
+
+_DAY = np.timedelta64(1, "D")
+
+
+def _iso(ts):
+    """datetime64 -> "2025-02-10T03:00:00.000Z" (Node가 다음 요청에 그대로 돌려줌)"""
+    return None if ts is None else str(np.datetime_as_string(ts, unit="ms")) + "Z"
+
+
+def _interpolate(values: np.ndarray) -> np.ndarray:
+    # prepare_hourly와 같은 규칙: 선형 보간, 앞쪽 결측은 0
+    return pd.Series(values).interpolate(method="linear").fillna(0).to_numpy()
+
+
+class PlantStats:
+    """식물 1개의 누적 통계 상태"""
+
+    def __init__(self, plant_id: int):
+        self.plant_id = plant_id
+        # 시간별 (최근 구간만, 컬럼별로 연속 배열: 평균을 전체 재계산과 같은 순서로 더하기 위해 (3, n))
+        self.ts = np.array([], dtype="datetime64[ns]")
+        self.raw = np.empty((len(HOURLY_COLUMNS), 0))   # 원본 (결측 NaN)
+        self.values = np.empty((len(HOURLY_COLUMNS), 0))  # 보간값
+        self.rollups = build_rollups(self.ts, self.raw)     # 시/일/주 롤업 (원본값 기준, 구간보다 오래 보관)
+        # 관수
+        self.water = np.array([], dtype="datetime64[ns]")  # 물 준 시각 (정렬)
+        self.interval_days = 0                             # 연속한 두 관수 사이 일수(내림)의 합
+        self.month_weeks = np.zeros((13, WEEKS + 2), dtype=np.int64)  # [월, 주차] 횟수 (29일~ = 5주차)
+        # 마지막으로 반영한 시각
+        self.hourly_cursor = None
+        self.events_cursor = None
+
+    def cursor(self) -> dict:
+        return {"hourly": _iso(self.hourly_cursor), "events": _iso(self.events_cursor)}
+
+    def add_hourly(self, df: pd.DataFrame) -> int:
+        """새 시간별 행 반영 (cursor 이전 행은 이미 반영된 것으로 보고 무시) -> 반영한 행 수"""
+        ts, raw = hourly_arrays(df)
+        if self.hourly_cursor is not None:
+            keep = ts > self.hourly_cursor
+            ts, raw = ts[keep], raw[:, keep]
+        if len(ts) == 0:
+            return 0
+
+        for rollup in self.rollups.values():
+            rollup.add(ts, raw)
+        n_old = len(self.ts)
+        self.ts = np.concatenate([self.ts, ts])
+        self.raw = np.concatenate([self.raw, raw], axis=1)
+        self.values = np.concatenate([self.values, raw], axis=1)
+        # 마지막 실측값 이후만 다시 보간 (그 앞은 새 행과 상관없이 값이 같음)
+        for i in range(len(HOURLY_COLUMNS)):
+            valid = np.flatnonzero(~np.isnan(self.raw[i, :n_old]))
+            start = valid[-1] if len(valid) else 0
+            self.values[i, start:] = _interpolate(self.raw[i, start:])
+        self.hourly_cursor = self.ts[-1]
+        return len(ts)
+
+    def evict(self, now: datetime = None) -> int:
+        """STATS_WINDOW_HOURS보다 오래된 시간별 행 / STATS_ROLLUP_DAYS보다 오래된 롤업 삭제 -> 삭제한 행 수 (now: UTC)"""
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        for rollup in self.rollups.values():
+            rollup.trim(np.datetime64(now - timedelta(days=STATS_ROLLUP_DAYS), "ns"))
+        cutoff = np.datetime64(now - timedelta(hours=STATS_WINDOW_HOURS), "ns")
+        k = int(np.searchsorted(self.ts, cutoff, side="left"))
+        if k == 0:
+            return 0
+        self.ts, self.raw, self.values = self.ts[k:], self.raw[:, k:], self.values[:, k:]
+        # 앞쪽 결측은 삭제된 값으로 보간돼 있었음 -> 전체 재계산처럼 0
+        for i in range(len(HOURLY_COLUMNS)):
+            valid = np.flatnonzero(~np.isnan(self.raw[i]))
+            self.values[i, :valid[0] if len(valid) else None] = 0
+        return k
+
+    def add_events(self, df: pd.DataFrame) -> int:
+        """새 이벤트 반영 (관수 이벤트만 누적값에 더함) -> 반영한 행 수"""
+        if df.empty or "EVENT_DATE" not in df.columns:
+            return 0
+        dates = utc_naive(parse_dates(df["EVENT_DATE"]))
+        keep = dates > self.events_cursor if self.events_cursor is not None else np.ones(len(dates), bool)
+        if not keep.any():
+            return 0
+        self.events_cursor = dates[keep].max()
+        if "EVENT_TYPE" not in df.columns:
+            return int(keep.sum())
+
+        new = np.sort(dates[keep & (df["EVENT_TYPE"].to_numpy() == WATER_EVENT)])
+        if len(new):
+            if len(self.water) == 0 or new[0] >= self.water[-1]:
+                # 시간순으로 온 경우: 새 간격만 더함
+                chain = np.concatenate([self.water[-1:], new])
+                self.interval_days += int((np.diff(chain) // _DAY).sum())
+                self.water = np.concatenate([self.water, new])
+            else:
+                # 늦게 기록된 과거 이벤트: 간격이 바뀌므로 전체 간격 다시 계산 (드문 경우)
+                self.water = np.sort(np.concatenate([self.water, new]))
+                self.interval_days = int((np.diff(self.water) // _DAY).sum())
+            month_start = new.astype("datetime64[M]")
+            months = month_start.astype(np.int64) % 12 + 1
+            weeks = (new - month_start.astype("datetime64[ns]")) // _DAY // 7 + 1
+            np.add.at(self.month_weeks, (months, weeks), 1)
+        return int(keep.sum())
+
+    def stats(self, now: datetime = None, resolution: str = None, points: int = None, days: int = None) -> dict:
+        """
+        compute_stats와 같은 형식의 응답
+        - resolution / points / days: 그래프 시리즈 다운샘플링 (hour/day/week는 롤업만 사용, 최근 구간 밖도 포함)
+        """
+        now = now or datetime.now()
+        empty = len(self.ts) == 0
+        means = self.values.mean(axis=1).tolist() if not empty else [0, 0, 0]
+        intervals = len(self.water) - 1
+        month = self.month_weeks[now.month]
+        result = {
+            "labels": hhmm_labels(pd.Series(self.ts)) if not empty else [],
+            "temp_data": self.values[0].tolist(),
+            "hum_data": self.values[1].tolist(),
+            "light_data": self.values[2].tolist(),
+            "analysis": {
+                "avg_temp": round(means[0], 1) if not empty else 0,
+                "avg_hum": round(means[1], 1) if not empty else 0,
+                "avg_light": int(means[2]) if not empty else 0,
+                "water_avg_interval": round(self.interval_days / intervals, 1) if intervals > 0 else 0,
+                "water_total_month": int(month.sum()),
+                "water_weekly": [{"label": f"{i}주차", "value": int(month[i])} for i in range(1, WEEKS + 1)],
+            },
+        }
+        if resolution or points or days:
+            result.update(chart_series(self.ts, self.values, resolution, points, days, self.rollups, self.raw))
+        return result
+
+
+class StatsCache:
+    """식물별 PlantStats (메모리, 최근에 쓴 STATS_CACHE_PLANTS개만 유지)"""
+
+    def __init__(self, max_plants: int = STATS_CACHE_PLANTS):
+        self.max_plants = max_plants
+        self._plants = OrderedDict()  # { plant_id: PlantStats }
+
+    def __len__(self) -> int:
+        return len(self._plants)
+
+    def get(self, plant_id: int):
+        return self._plants.get(plant_id)
+
+    def update(self, plant_id: int, cursor, df_hourly: pd.DataFrame, df_events: pd.DataFrame, now: datetime = None):
+        """
+        새 행 반영 -> PlantStats
+        - cursor 없음(None): 전체 이력으로 보고 처음부터 다시 만듦
+        - cursor 있음: 캐시의 cursor와 같을 때만 이어서 반영, 다르면(재시작/삭제됨) None -> 전체 재전송 필요
+        """
+        plant = self._plants.get(plant_id)
+        if cursor is None:
+            plant = PlantStats(plant_id)
+        elif plant is None or plant.cursor() != {"hourly": cursor.get("hourly"), "events": cursor.get("events")}:
+            return None
+
+        plant.add_hourly(df_hourly)
+        plant.add_events(df_events)
+        plant.evict(now)
+        self._plants[plant_id] = plant
+        self._plants.move_to_end(plant_id)
+        while len(self._plants) > self.max_plants:
+            self._plants.popitem(last=False)
+        return plant
+
+    def reset(self, plant_id: int) -> bool:
+        return self._plants.pop(plant_id, None) is not None
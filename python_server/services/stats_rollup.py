@@ -0,0 +1,175 @@
+# python_server/services/stats_rollup.py
+# ✅ 역할: 긴 기간 센서 그래프용 다운샘플링
+# - 90일 그래프를 시간별 원본 그대로 보내면 2천 개가 넘는 점을 전송/렌더링함
+# - LTTB(largest-triangle-three-buckets): 구간마다 앞뒤 점과 만드는 삼각형 넓이가 가장 큰 점 1개만 남김
+#   -> 점 수를 줄여도 그래프 모양(봉우리/골짜기)이 유지됨
+#   온도/습도/조도를 같은 x(시각)로 그리므로 세 값(0~1 정규화)의 넓이 합으로 한 번에 고름
+# - 최소/최대 범위(envelope): 남긴 점이 대표하는 구간의 min/max (LTTB가 빠뜨린 튀는 값도 범위로 표시)
+# - 롤업(시/일/주): 구간별 합계/개수/최소/최대를 미리 누적 (식물별 캐시 services/stats_cache.py에 보관)
+#   -> 축소해서 볼 때 원본 행을 다시 읽지 않고 롤업만 사용
+# - 시각은 UTC 기준 datetime64[ns] (services/plant_stats.hourly_arrays)
+
+import numpy as np
+
+RESOLUTIONS = ("raw", "hour", "day", "week")
+
+_HOUR = 3600 * 10**9
+_DAY = 24 * _HOUR
+_WEEK = 7 * _DAY
+_MONDAY = 4 * _DAY  # 1970-01-05(월) - 1970-01-01(목)
+
+
+def bucket_starts(ts: np.ndarray, resolution: str) -> np.ndarray:
+    """각 시각이 속한 구간 시작 (int64 ns, 주는 월요일 0시 시작)"""
+    t = ts.astype("datetime64[ns]").astype(np.int64)
+    if resolution == "hour":
+        return t - t % _HOUR
+    if resolution == "day":
+        return t - t % _DAY
+    if resolution == "week":
+        return (t - _MONDAY) // _WEEK * _WEEK + _MONDAY
+    raise ValueError(f"지원하지 않는 resolution: {resolution}")
+
+
+class Rollup:
+    """구간(시/일/주)별 합계/개수/최소/최대 (시간순으로만 추가)"""
+
+    def __init__(self, resolution: str, n_series: int):
+        self.resolution = resolution
+        self.starts = np.array([], dtype=np.int64)
+        self.sum = np.empty((n_series, 0))
+        self.count = np.empty((n_series, 0), dtype=np.int64)
+        self.min = np.empty((n_series, 0))
+        self.max = np.empty((n_series, 0))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, ts: np.ndarray, values: np.ndarray) -> None:
+        """
+        ts(정렬됨) / values (시리즈 수, n) 결측 NaN 추가
+        - 첫 구간이 마지막 구간과 같으면 합침 (새 행은 항상 이전 행보다 나중)
+        """
+        if len(ts) == 0:
+            return
+        keys = bucket_starts(ts, self.resolution)
+        bounds = np.r_[0, np.flatnonzero(np.diff(keys)) + 1]
+        valid = ~np.isnan(values)
+        starts = keys[bounds]
+        total = np.add.reduceat(np.where(valid, values, 0.0), bounds, axis=1)
+        count = np.add.reduceat(valid.astype(np.int64), bounds, axis=1)
+        lo = np.fmin.reduceat(values, bounds, axis=1)
+        hi = np.fmax.reduceat(values, bounds, axis=1)
+
+        if len(self.starts) and starts[0] == self.starts[-1]:
+            self.sum[:, -1] += total[:, 0]
+            self.count[:, -1] += count[:, 0]
+            self.min[:, -1] = np.fmin(self.min[:, -1], lo[:, 0])
+            self.max[:, -1] = np.fmax(self.max[:, -1], hi[:, 0])
+            starts, total, count, lo, hi = starts[1:], total[:, 1:], count[:, 1:], lo[:, 1:], hi[:, 1:]
+        self.starts = np.concatenate([self.starts, starts])
+        self.sum = np.concatenate([self.sum, total], axis=1)
+        self.count = np.concatenate([self.count, count], axis=1)
+        self.min = np.concatenate([self.min, lo], axis=1)
+        self.max = np.concatenate([self.max, hi], axis=1)
+
+    def trim(self, cutoff: np.datetime64) -> int:
+        """cutoff보다 앞에서 시작하는 구간 삭제 -> 삭제한 구간 수"""
+        k = int(np.searchsorted(self.starts, np.datetime64(cutoff, "ns").astype(np.int64), side="left"))
+        if k:
+            self.starts = self.starts[k:]
+            self.sum, self.count = self.sum[:, k:], self.count[:, k:]
+            self.min, self.max = self.min[:, k:], self.max[:, k:]
+        return k
+
+    def view(self):
+        """(구간 시작 datetime64[ns], 평균, 최소, 최대) (값이 없는 구간의 평균은 NaN)"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = np.where(self.count > 0, self.sum / self.count, np.nan)
+        return self.starts.astype("datetime64[ns]"), avg, self.min, self.max
+
+
+def build_rollups(ts: np.ndarray, values: np.ndarray) -> dict:
+    """{"hour": Rollup, "day": Rollup, "week": Rollup}"""
+    rollups = {r: Rollup(r, values.shape[0]) for r in RESOLUTIONS[1:]}
+    for rollup in rollups.values():
+        rollup.add(ts, values)
+    return rollups
+
+
+def lttb_indices(ts: np.ndarray, values: np.ndarray, points: int):
+    """
+    여러 시리즈 공통 LTTB -> (남길 인덱스, 각 점이 대표하는 구간 시작 인덱스)
+    - 첫 점/마지막 점은 항상 남기고, 사이를 points - 2개 구간으로 나눠 구간마다 1개
+    """
+    n = len(ts)
+    if n <= points or points < 3:
+        idx = np.arange(n)
+        return idx, idx
+
+    x = ts.astype("datetime64[ns]").astype(np.int64).astype(float)
+    x = (x - x[0]) / ((x[-1] - x[0]) or 1.0)
+    y = np.nan_to_num(values.astype(float))
+    y_min = y.min(axis=1, keepdims=True)
+    y_span = y.max(axis=1, keepdims=True) - y_min
+    y = (y - y_min) / np.where(y_span > 0, y_span, 1.0)
+
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    idx = np.empty(points, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 다음 구간 평균점 (마지막 구간의 다음은 마지막 점)
+        nlo, nhi = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        cx, cy = x[nlo:nhi].mean(), y[:, nlo:nhi].mean(axis=1, keepdims=True)
+        ax, ay = x[a], y[:, a:a + 1]
+        area = np.abs((ax - cx) * (y[:, lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay)).sum(axis=0)
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx, np.r_[0, edges]
+
+
+def downsample(ts: np.ndarray, values: np.ndarray, lo: np.ndarray, hi: np.ndarray, points: int):
+    """LTTB로 points개 이하로 줄임 -> (ts, values, 구간 최소, 구간 최대)"""
+    if not points or len(ts) <= points:
+        return ts, values, lo, hi
+    idx, bounds = lttb_indices(ts, values, points)
+    return ts[idx], values[:, idx], np.fmin.reduceat(lo, bounds, axis=1), np.fmax.reduceat(hi, bounds, axis=1)
+
+
+def chart(ts: np.ndarray, values: np.ndarray, resolution: str = "raw", points: int = None, days: int = None,
+          rollups: dict = None, raw: np.ndarray = None):
+    """
+    그래프용 시리즈 -> (ts, values, 최소, 최대)
+    - resolution="raw": 시간별 값(보간값) 그대로, hour/day/week: 롤업 평균 (rollups가 없으면 raw로 바로 만듦)
+    - days: 마지막 시각 기준 최근 N일만
+    - points: 그보다 많으면 LTTB + 최소/최대 범위
+    """
+    if resolution == "raw":
+        lo = hi = values
+    else:
+        if rollups:
+            rollup = rollups[resolution]
+        else:
+            rollup = Rollup(resolution, values.shape[0])
+            rollup.add(ts, values if raw is None else raw)
+        ts, values, lo, hi = rollup.view()
+        values = np.round(values, 2)  # 센서 값 정밀도 (누적 순서에 따른 부동소수 오차도 정리)
+    if days and len(ts):
+        k = int(np.searchsorted(ts, ts[-1] - np.timedelta64(int(days), "D"), side="left"))
+        ts, values, lo, hi = ts[k:], values[:, k:], lo[:, k:], hi[:, k:]
+    return downsample(ts, values, lo, hi, points)
+
+
+def labels(ts: np.ndarray, resolution: str) -> list:
+    """구간 단위에 맞는 라벨 (raw/hour: "MM-DD HH:MM", day/week: "YYYY-MM-DD")"""
+    text = np.datetime_as_string(ts.astype("datetime64[m]"), unit="m")
+    if resolution in ("day", "week"):
+        return [s[:10] for s in text.tolist()]
+    return [s[5:].replace("T", " ") for s in text.tolist()]
+
+
+def to_list(values: np.ndarray) -> list:
+    """NaN -> None (JSON 직렬화용)"""
+    return [None if v != v else v for v in values.tolist()]
@@ -0,0 +1,146 @@
+# python_server/services/thresholds.py
+# ✅ 역할: 식물별 센서 임계치 테이블 + 임계치 판정
+# - Plant_data.py가 만든 PLANT_DICT 컬럼(TEMP_MIN/TEMP_MAX/HUM_MIN/HUM_MAX/LUX_MIN/LUX_MAX)을
+#   plant_id 기준으로 메모리에 들고 있음 (Node가 PUT /sensor/thresholds로 보내거나 JSON 파일에서 로드)
+# - 등록 안 된 식물은 DEFAULT_THRESHOLDS(기존 하드코딩 값) 사용
+# - 센서값 여러 건을 numpy 비교 한 번으로 판정 (evaluate)
+
+import json
+import os
+
+import numpy as np
+
+# 채널 순서 = services/sensor_buffer.CHANNELS (temp, hum, light, soil)
+# 이벤트 이름 접두사는 Node의 EVENT_LOG 규칙을 따름 (light -> LUX)
+EVENT_PREFIX = ("TEMP", "HUM", "LUX", "SOIL")
+
+# 테이블 컬럼 순서: 채널별 (MIN, MAX)
+COLUMNS = ("TEMP_MIN", "TEMP_MAX", "HUM_MIN", "HUM_MAX", "LUX_MIN", "LUX_MAX", "SOIL_MIN", "SOIL_MAX")
+
+# 판정 결과 (n, 8) 불리언 배열의 열 순서와 같은 이벤트 이름
+EVENT_NAMES = tuple(f"{p}_{kind}" for p in EVENT_PREFIX for kind in ("LOW", "HIGH"))
+
+# ✅ 기본 임계치 (기존 /sensor/analyze 하드코딩 값, 없는 값은 판정 안 함)
+DEFAULT_THRESHOLDS = {
+    "TEMP_MIN": 21, "TEMP_MAX": 25,
+    "HUM_MIN": 40, "HUM_MAX": 70,
+    "LUX_MIN": 300, "LUX_MAX": np.inf,
+    "SOIL_MIN": -np.inf, "SOIL_MAX": 3000,
+}
+
+
+def _row(values: dict, base: np.ndarray) -> np.ndarray:
+    """dict(컬럼명 -> 값)를 테이블 한 줄로 변환 (값이 없으면 base 값 유지)"""
+    row = base.copy()
+    for i, col in enumerate(COLUMNS):
+        v = values.get(col, values.get(col.lower()))
+        if v is not None:
+            row[i] = float(v)
+    return row
+
+
+class ThresholdTable:
+    def __init__(self):
+        self.default = _row(DEFAULT_THRESHOLDS, np.zeros(len(COLUMNS)))
+        self._ids = np.empty(0, dtype=np.int64)               # 정렬된 plant_id
+        self._table = np.empty((0, len(COLUMNS)), dtype=np.float64)
+        self._file_key = None  # 마지막으로 읽거나 쓴 파일의 (mtime, size)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def update(self, rows: list) -> int:
+        """
+        임계치 등록/갱신
+        - rows: [{"plant_id"(또는 PLANT_ID): 1, "TEMP_MIN": 16, "TEMP_MAX": 20, ...}, ...]
+        - 반환: 반영된 식물 수
+        """
+        merged = dict(zip(self._ids.tolist(), self._table))
+        for r in rows:
+            plant_id = r.get("plant_id", r.get("PLANT_ID"))
+            if plant_id is None:
+                continue
+            plant_id = int(plant_id)
+            merged[plant_id] = _row(r, merged.get(plant_id, self.default))
+
+        ids = np.array(sorted(merged), dtype=np.int64)
+        table = np.array([merged[i] for i in ids.tolist()], dtype=np.float64).reshape(-1, len(COLUMNS))
+        self._ids, self._table = ids, table  # 한 번에 교체 (판정 중인 요청에 영향 없음)
+        return len(rows)
+
+    def lookup(self, plant_ids: np.ndarray) -> np.ndarray:
+        """plant_id 배열 -> (n, 8) 임계치 배열 (없는 식물은 기본값)"""
+        ids, table = self._ids, self._table
+        if not len(ids):
+            return np.broadcast_to(self.default, (len(plant_ids), len(COLUMNS)))
+        pos = np.searchsorted(ids, plant_ids)
+        pos_clipped = np.minimum(pos, len(ids) - 1)
+        found = ids[pos_clipped] == plant_ids
+        return np.where(found[:, None], table[pos_clipped], self.default)
+
+    def get(self, plant_id: int) -> dict:
+        row = self.lookup(np.array([plant_id], dtype=np.int64))[0]
+        return {col: (float(v) if np.isfinite(v) else None) for col, v in zip(COLUMNS, row)}
+
+    def load_file(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        key = _file_key(path)
+        with open(path, "r", encoding="utf-8") as f:
+            count = self.update(json.load(f))
+        self._file_key = key
+        return count
+
+    def reload_if_changed(self, path: str) -> bool:
+        """
+        다른 프로세스가 파일을 바꿨으면 테이블을 파일 내용으로 교체
+        - uvicorn --workers N: PUT /sensor/thresholds는 워커 하나에만 도착하므로
+          나머지 워커는 판정 전에 파일의 (mtime, size)만 확인해서 다시 읽음
+        """
+        key = _file_key(path)
+        if key is None or key == self._file_key:
+            return False
+        fresh = ThresholdTable()
+        fresh.load_file(path)
+        self._ids, self._table, self._file_key = fresh._ids, fresh._table, fresh._file_key
+        return True
+
+    def save_file(self, path: str) -> None:
+        rows = []
+        for plant_id, row in zip(self._ids.tolist(), self._table):
+            item = {"plant_id": plant_id}
+            item.update({col: float(v) for col, v in zip(COLUMNS, row) if np.isfinite(v)})
+            rows.append(item)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        self._file_key = _file_key(path)
+
+
+def _file_key(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def evaluate(values: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """
+    센서값 (n, 4) vs 임계치 (n, 8) -> 이벤트 여부 (n, 8) 불리언 (열 순서 = EVENT_NAMES)
+    - LOW: 값 < MIN, HIGH: 값 > MAX
+    """
+    flags = np.empty((len(values), len(EVENT_NAMES)), dtype=bool)
+    np.less(values, limits[:, 0::2], out=flags[:, 0::2])
+    np.greater(values, limits[:, 1::2], out=flags[:, 1::2])
+    return flags
+
+
+def event_lists(flags: np.ndarray) -> list:
+    """(n, 8) 판정 결과 -> 건별 이벤트 이름 리스트"""
+    result = [[] for _ in range(len(flags))]
+    rows, cols = np.nonzero(flags)
+    for r, c in zip(rows.tolist(), cols.tolist()):
+        result[r].append(EVENT_NAMES[c])
+    return result
@@ -0,0 +1,7 @@
+# python_server/tests/conftest.py
+# python_server 폴더 기준으로 services / routers 를 import 할 수 있게 경로 추가
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,41 @@
+# python_server/tests/test_calibration.py
+# 멀티 워커: 다른 워커가 저장한 카메라 보정값을 다시 읽는지 (services/calibration.py)
+
+from services.calibration import CalibrationStore
+
+
+def _values(pixels_per_cm: float) -> dict:
+    return {"pixels_per_cm": pixels_per_cm, "lower_hsv": [30, 40, 40], "upper_hsv": [90, 255, 255],
+            "kernel_size": 5}
+
+
+def test_reload_if_changed_picks_up_other_worker_save(tmp_path):
+    path = str(tmp_path / "calibration.json")
+    worker_a, worker_b = CalibrationStore(), CalibrationStore()
+    worker_a.load_file(path)
+    worker_b.load_file(path)
+
+    worker_a.set("cam1", _values(60.0))
+    worker_a.save_file(path)
+
+    assert worker_b.reload_if_changed(path)
+    assert worker_b.params("cam1")["pixels_per_cm"] == 60.0
+    assert not worker_b.reload_if_changed(path)
+    assert not worker_a.reload_if_changed(path)  # 자기가 쓴 파일은 다시 안 읽음
+
+
+def test_reload_drops_devices_removed_by_other_worker(tmp_path):
+    path = str(tmp_path / "calibration.json")
+    worker_a = CalibrationStore()
+    worker_a.set("cam1", _values(60.0))
+    worker_a.set("cam2", _values(40.0))
+    worker_a.save_file(path)
+    worker_b = CalibrationStore()
+    worker_b.load_file(path)
+
+    worker_a.remove("cam2")
+    worker_a.save_file(path)
+
+    assert worker_b.reload_if_changed(path)
+    assert worker_b.params("cam2") == {}
+    assert len(worker_b) == 1
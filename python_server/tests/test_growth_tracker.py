@@ -0,0 +1,123 @@
+# python_server/tests/test_growth_tracker.py
+# 성장 추적 저장 (services/growth_tracker.py / routers/image.py)
+
+import asyncio
+import json
+import socket
+
+import httpx
+from fastapi import FastAPI
+
+from routers import image
+from services import leader_rpc
+from services.growth_tracker import GrowthTracker, PlantTrack
+from services.sensor_forwarder import LeaderClient, start_rpc_server
+
+
+def _result(height: float) -> dict:
+    return {"height": height, "bbox": [10, 10, 20, 40], "frame": [100, 100]}
+
+
+def test_dump_reencodes_only_changed_tracks(monkeypatch):
+    tracker = GrowthTracker()
+    for plant_id in range(5):
+        tracker.update(plant_id, _result(10.0), ts=1000.0)
+    tracker.dump()
+
+    encoded = []
+    original = PlantTrack.to_dict
+    monkeypatch.setattr(PlantTrack, "to_dict", lambda self: encoded.append(self.plant_id) or original(self))
+    tracker.update(3, _result(10.5), ts=2000.0)
+    tracker.reset(1)
+    rows = json.loads(tracker.dump())
+
+    assert encoded == [3]
+    assert sorted(r["plant_id"] for r in rows) == [0, 2, 3, 4]
+    assert len(next(r for r in rows if r["plant_id"] == 3)["history"]) == 2
+    assert not tracker.changed
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "tracks.json")
+    tracker = GrowthTracker()
+    tracker.update(1, _result(10.0), ts=1000.0)
+    tracker.save_file(path)
+
+    loaded = GrowthTracker()
+    assert loaded.load_file(path) == 1
+    assert loaded.series(1)["points"] == tracker.series(1)["points"]
+
+
+def test_track_saves_are_batched(tmp_path, monkeypatch):
+    path = tmp_path / "tracks.json"
+    monkeypatch.setattr(image, "GROWTH_TRACK_FILE", str(path))
+    monkeypatch.setattr(image, "GROWTH_SAVE_SECONDS", 0.05)
+    monkeypatch.setattr(image, "_tracker", GrowthTracker())
+    writes = []
+    monkeypatch.setattr(image, "write_file", lambda p, text: writes.append(text))
+
+    async def scenario():
+        for i in range(10):
+            image._tracker.update(1, _result(10.0 + i * 0.1), ts=1000.0 + i)
+            image._schedule_track_save()
+        await asyncio.sleep(0.2)
+        image._tracker.update(2, _result(5.0), ts=1000.0)
+        image._schedule_track_save()
+        await image.close_tracks()  # 종료 시 예약을 기다리지 않고 바로 저장
+
+    asyncio.run(scenario())
+    assert len(writes) == 2
+    assert len(json.loads(writes[0])[0]["history"]) == 10
+    assert sorted(r["plant_id"] for r in json.loads(writes[1])) == [1, 2]
+
+
+def test_follower_track_uses_leader_state(tmp_path, monkeypatch):
+    photo = tmp_path / "plant.jpg"
+    photo.write_bytes(b"")
+    monkeypatch.setattr(image, "GROWTH_TRACK_FILE", "")
+    monkeypatch.setattr(image, "_tracker", GrowthTracker())
+    monkeypatch.setattr(image, "_tracker_loaded", True)
+    rects = []
+
+    async def fake_analysis(fn, path, search_rect=None, **kwargs):
+        rects.append(search_rect)
+        return _result(10.0 + len(rects) * 0.1)
+
+    monkeypatch.setattr(image, "run_analysis", fake_analysis)
+    calls = []
+    handlers = {kind: (lambda h: lambda data: calls.append(data) or h(data))(h)
+                for kind, h in leader_rpc.handlers.items()}
+    app = FastAPI()
+    app.include_router(image.router, prefix="/image")
+
+    async def scenario():
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = await start_rpc_server(port, handlers)
+        followers = [LeaderClient(port), LeaderClient(port)]
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                for i in range(3):  # 두 follower가 번갈아 받은 같은 식물의 사진
+                    monkeypatch.setattr(leader_rpc, "_client", followers[i % 2])
+                    await client.post("/image/track", json={"plant_id": 4, "file_path": str(photo),
+                                                            "timestamp": 1000.0 + i * 3600})
+                series = await client.get("/image/growth/4")
+                reset = await client.delete("/image/track/4")
+                missing = await client.get("/image/growth/4")
+        finally:
+            for c in followers:
+                c.close()
+            monkeypatch.setattr(leader_rpc, "_client", None)
+            server.close()
+            await server.wait_closed()
+        return series, reset, missing
+
+    series, reset, missing = asyncio.run(scenario())
+    assert rects[0] is None and rects[1] == rects[2] is not None  # 두 번째부터 leader가 기억한 위치 주변
+    assert len(series.json()["points"]) == 3
+    assert reset.json() == {"success": True, "plant_id": 4}
+    assert missing.status_code == 404
+    assert len(calls) == 3 * 2 + 3
+    assert len(image._tracker) == 0
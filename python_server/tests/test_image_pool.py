@@ -0,0 +1,92 @@
+# python_server/tests/test_image_pool.py
+# 워커 프로세스 비정상 종료 후 503 / 풀 재시작 (services/image_pool.py)
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import HTTPException
+
+from routers.image import run_analysis
+from services.image_pool import ImagePool
+
+
+def test_broken_worker_returns_503_then_pool_restarts(monkeypatch):
+    pool = ImagePool(workers=1, max_pending=4, timeout=60)
+    monkeypatch.setattr("routers.image.image_pool", pool)
+    released = []
+
+    async def scenario():
+        with pytest.raises(HTTPException) as exc:
+            await run_analysis(os._exit, 1, on_done=lambda: released.append(1))
+        assert exc.value.status_code == 503
+
+        broken = pool._executor
+        assert await pool.run(pow, 2, 10) == 1024   # 다음 제출 때 새 풀로 교체
+        assert pool._executor is not broken
+        assert broken._shutdown_thread
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert released == [1]
+    assert pool.pending == 0
+
+
+def test_submit_failure_releases_slot(monkeypatch):
+    pool = ImagePool(workers=1)
+    monkeypatch.setattr(pool, "_submit", lambda *a: (_ for _ in ()).throw(BrokenProcessPool("down")))
+    released = []
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(pool.run(pow, 2, 3, on_done=lambda: released.append(1)))
+    assert released == [1]
+
+
+def test_imap_unordered_accepts_async_jobs():
+    pool = ImagePool(workers=2)
+
+    async def jobs():
+        for i in range(5):
+            await asyncio.sleep(0)  # 업로드 읽기처럼 job을 만드는 중에 await
+            yield i, pow, (2, i), {}
+
+    async def scenario():
+        return {key: result async for key, result in pool.imap_unordered(jobs())}
+
+    try:
+        assert asyncio.run(scenario()) == {i: 2 ** i for i in range(5)}
+    finally:
+        pool.shutdown()
+
+
+def test_debug_images_are_written_by_server_process(tmp_path, monkeypatch):
+    import cv2
+    import numpy as np
+    from routers import image
+    from services.debug_writer import DebugWriter
+    from services.plant_analysis import analyze_plant_height_detailed
+
+    pool = ImagePool(workers=1)
+    writer = DebugWriter(sample_every=2)
+    monkeypatch.setattr("routers.image.image_pool", pool)
+    monkeypatch.setattr(image, "debug_writer", writer)
+    monkeypatch.setattr("services.plant_analysis.debug_writer", writer)
+    img = np.full((240, 320, 3), 235, np.uint8)
+    cv2.rectangle(img, (130, 60), (190, 200), (0, 160, 0), -1)
+    data = cv2.imencode(".jpg", img)[1].tobytes()
+
+    async def scenario():
+        return [await run_analysis(analyze_plant_height_detailed, data, debug=True,
+                                   debug_dir=str(tmp_path), tag=f"t{i}") for i in range(4)]
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    writer.flush()
+    assert all(r["height"] > 0 and "debug_images" not in r for r in results)
+    assert sorted(p.name.split("_")[0] for p in tmp_path.iterdir()) == ["t0"] * 3 + ["t2"] * 3
+    assert writer.written == 6
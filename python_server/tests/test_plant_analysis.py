@@ -0,0 +1,43 @@
+# python_server/tests/test_plant_analysis.py
+# 축소 디코딩 후 원본 해상도 재분석 (services/plant_analysis.py)
+
+import cv2
+import numpy as np
+import pytest
+
+import services.plant_analysis as pa
+
+
+def _jpeg(green: bool) -> bytes:
+    img = np.full((480, 640, 3), 235, np.uint8)
+    if green:
+        cv2.rectangle(img, (250, 120), (390, 400), (0, 160, 0), -1)
+    return cv2.imencode(".jpg", img)[1].tobytes()
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pa, "_debug_save", lambda *args, **kwargs: calls.append(args))
+    return calls
+
+
+def test_retry_saves_debug_images_once(saved):
+    result = pa.analyze_plant_height_detailed(_jpeg(False), downscale=4, debug=True)
+    assert result["reason"] == "no_contour" and result["retried"]
+    assert len(saved) == 1
+    assert saved[0][0].shape[:2] == (480, 640)  # 원본 해상도 분석의 이미지
+    assert "_debug" not in result
+
+
+def test_no_retry_for_bad_scale(saved):
+    result = pa.analyze_plant_height_detailed(_jpeg(True), downscale=4, pixels_per_cm=0, debug=True)
+    assert result["reason"] == "bad_scale"
+    assert not result["retried"]
+    assert len(saved) == 1
+
+
+def test_found_on_reduced_pass(saved):
+    result = pa.analyze_plant_height_detailed(_jpeg(True), downscale=4)
+    assert result["height"] > 0 and not result["retried"]
+    assert saved == []
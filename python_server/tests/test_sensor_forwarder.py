@@ -0,0 +1,68 @@
+# python_server/tests/test_sensor_forwarder.py
+# 멀티 워커 이벤트 판정: follower의 판정 요청이 leader 한 곳의 상태로 처리되는지 (services/sensor_forwarder.py)
+
+import asyncio
+import socket
+
+import numpy as np
+import pytest
+
+from routers import sensor
+from services import leader_rpc
+from services.sensor_events import EventEngine
+from services.sensor_forwarder import LeaderClient, start_rpc_server
+from services.thresholds import ThresholdTable
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_rpc_roundtrip_after_leader_appears():
+    async def scenario():
+        port = _free_port()
+        client = LeaderClient(port)
+        with pytest.raises(ConnectionError):  # leader 전환 중 (판정 서버 없음)
+            await client.call(b"R", b"abc")
+
+        server = await start_rpc_server(port, {b"R": lambda data: data[::-1]})
+        try:
+            assert await client.call(b"R", b"abc") == b"cba"
+            assert await client.call(b"R", b"") == b""
+        finally:
+            client.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
+
+
+def test_follower_analyze_uses_leader_event_state(monkeypatch):
+    monkeypatch.setattr(sensor, "THRESHOLDS_FILE", "")
+    monkeypatch.setattr(sensor, "_thresholds", ThresholdTable())
+    monkeypatch.setattr(sensor, "_events", EventEngine(dwell=0, cooldown=3600))
+    monkeypatch.setattr(sensor, "EVENT_MODE", "transition")
+
+    async def scenario():
+        port = _free_port()
+        server = await start_rpc_server(port, leader_rpc.handlers)
+        followers = [LeaderClient(port), LeaderClient(port)]
+        hot = np.array([[30.0, 50.0, 1000.0, 100.0]])
+        enters = []
+        try:
+            for i in range(4):  # 두 follower가 번갈아 받은 같은 식물의 측정값
+                monkeypatch.setattr(leader_rpc, "_client", followers[i % 2])
+                result = (await sensor._judge_shared(np.array([7]), hot))[0]
+                enters.append(result["event_occurred"])
+        finally:
+            for client in followers:
+                client.close()
+            server.close()
+            await server.wait_closed()
+        return enters, result
+
+    enters, last = asyncio.run(scenario())
+    assert enters == [True, False, False, False]
+    assert last["plant_id"] == 7 and last["active"] == ["TEMP_HIGH"]
@@ -0,0 +1,79 @@
+# python_server/tests/test_sensor_spool.py
+# 스풀 재시작/복구 시나리오 (services/sensor_spool.py)
+
+import json
+import os
+
+import numpy as np
+
+from services.sensor_spool import SensorSpool
+
+
+def _readings(n: int, plant_id: int = 1):
+    plant_ids = np.full(n, plant_id, dtype=np.int32)
+    values = np.arange(n * 4, dtype=np.float32).reshape(n, 4)
+    return plant_ids, values
+
+
+def _open(path) -> SensorSpool:
+    return SensorSpool(str(path), segment_records=64, fsync_every=1)
+
+
+def test_replay_returns_unflushed_records(tmp_path):
+    spool = _open(tmp_path)
+    spool.replay()
+    spool.append(*_readings(5))
+    spool.commit({1: 3})
+    spool.close()
+
+    spool = _open(tmp_path)
+    plant_ids, values, _ = spool.replay()
+    assert plant_ids.tolist() == [1, 1]
+    assert values[:, 0].tolist() == [12.0, 16.0]
+    spool.close()
+
+
+def test_restarts_after_full_commit_keep_new_readings(tmp_path):
+    # 전부 전송 완료 -> 정상 재시작 2번 -> 새 값 기록 후 비정상 종료 -> 새 값은 복구돼야 함
+    spool = _open(tmp_path)
+    spool.replay()
+    spool.append(*_readings(10))
+    spool.commit({1: 10})
+    spool.close()
+
+    for _ in range(2):
+        spool = _open(tmp_path)
+        plant_ids, _, _ = spool.replay()
+        assert len(plant_ids) == 0
+        spool.close()
+
+    spool = _open(tmp_path)
+    spool.replay()
+    spool.append(*_readings(3))
+    spool.sync(force=True)
+    assert spool.last_seq[1] > 10
+    del spool  # close() 없이 종료 (crash)
+
+    spool = _open(tmp_path)
+    plant_ids, values, _ = spool.replay()
+    assert plant_ids.tolist() == [1, 1, 1]
+    assert values[:, 0].tolist() == [0.0, 4.0, 8.0]
+
+    # 다시 전송 완료하면 commit이 seq를 앞으로 옮기고 다음 재시작엔 남는 게 없음
+    spool.commit({1: spool.last_seq[1]})
+    spool.close()
+    with open(os.path.join(tmp_path, "index.json"), encoding="utf-8") as f:
+        assert json.load(f)["flushed"]["1"] == 13
+    spool = _open(tmp_path)
+    assert len(spool.replay()[0]) == 0
+    spool.close()
+
+
+def test_old_index_without_seq_starts_after_flushed(tmp_path):
+    with open(os.path.join(tmp_path, "index.json"), "w", encoding="utf-8") as f:
+        json.dump({"flushed": {"1": 42}}, f)
+    spool = _open(tmp_path)
+    spool.replay()
+    spool.append(*_readings(1))
+    assert spool.last_seq[1] == 43
+    spool.close()
@@ -0,0 +1,75 @@
+# python_server/tests/test_statistics_leader.py
+# 멀티 워커: follower가 받은 식물별 /statistics/stats 요청을 leader 캐시로 처리하는지 (routers/statistics.py)
+
+import asyncio
+import socket
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+
+from routers import statistics
+from services import leader_rpc
+from services.sensor_forwarder import LeaderClient, start_rpc_server
+from services.stats_cache import StatsCache
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# 캐시는 현재 시각 기준 최근 24시간만 유지하므로 테스트 데이터도 현재 시각 기준 (12시간 전부터)
+_BASE = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=12)
+
+
+def _hourly(start_hour: int, n: int) -> dict:
+    return {
+        "CREATED_AT": [(_BASE + timedelta(hours=h)).strftime("%Y-%m-%dT%H:00:00.000Z")
+                       for h in range(start_hour, start_hour + n)],
+        "TEMP_AVG": [20.0 + h for h in range(n)],
+        "HUM_AVG": [50.0] * n,
+        "LIGHT_AVG": [300.0] * n,
+    }
+
+
+def test_follower_stats_use_leader_cache(monkeypatch):
+    leader_cache = StatsCache()
+    calls = []
+    handlers = dict(leader_rpc.handlers)
+    handlers[b"S"] = lambda data: calls.append(data) or statistics._stats_on_leader(data)
+    app = FastAPI()
+    app.include_router(statistics.router, prefix="/statistics")
+
+    async def scenario():
+        port = _free_port()
+        server = await start_rpc_server(port, handlers)
+        monkeypatch.setattr(leader_rpc, "_client", LeaderClient(port))
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first = await client.post("/statistics/stats", json={
+                    "plant_id": 3, "hourly": _hourly(0, 3), "events": []})
+                second = await client.post("/statistics/stats", json={
+                    "plant_id": 3, "cursor": first.json()["cursor"], "hourly": _hourly(3, 2), "events": []})
+                stale = await client.post("/statistics/stats", json={
+                    "plant_id": 3, "cursor": first.json()["cursor"], "hourly": _hourly(5, 1), "events": []})
+                deleted = await client.delete("/statistics/stats/3")
+                full = await client.post("/statistics/stats", json={"hourly": _hourly(0, 2), "events": []})
+        finally:
+            leader_rpc.close()
+            server.close()
+            await server.wait_closed()
+        return first, second, stale, deleted, full
+
+    monkeypatch.setattr(statistics, "_stats_cache", leader_cache)
+    first, second, stale, deleted, full = asyncio.run(scenario())
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert len(second.json()["temp_data"]) == 5
+    assert stale.status_code == 409   # leader 캐시 cursor와 다름 -> 그대로 409 전달
+    assert deleted.json() == {"plant_id": 3, "deleted": True}
+    assert full.status_code == 200 and len(full.json()["temp_data"]) == 2
+    assert len(calls) == 4   # plant_id 없는 요청도 follower는 파싱 없이 leader에게 보냄
+    assert len(leader_cache) == 0
@@ -0,0 +1,85 @@
+# python_server/tests/test_thresholds.py
+# 임계치 테이블 파일 동기화 (services/thresholds.py) + PUT /sensor/thresholds 검증
+
+import os
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.thresholds import ThresholdTable
+
+
+def test_reload_if_changed_picks_up_other_worker_save(tmp_path):
+    path = str(tmp_path / "thresholds.json")
+    worker_a, worker_b = ThresholdTable(), ThresholdTable()
+    worker_a.load_file(path)
+    worker_b.load_file(path)
+
+    worker_a.update([{"plant_id": 1, "TEMP_MIN": 16, "TEMP_MAX": 20}])
+    worker_a.save_file(path)
+
+    assert worker_b.reload_if_changed(path)
+    assert worker_b.get(1)["TEMP_MIN"] == 16
+    assert not worker_b.reload_if_changed(path)
+    assert not worker_a.reload_if_changed(path)  # 자기가 쓴 파일은 다시 안 읽음
+
+
+def test_reload_replaces_stale_rows(tmp_path):
+    path = str(tmp_path / "thresholds.json")
+    worker_a, worker_b = ThresholdTable(), ThresholdTable()
+    worker_b.update([{"plant_id": 2, "HUM_MIN": 10}])
+
+    worker_a.update([{"plant_id": 1, "TEMP_MAX": 30}])
+    worker_a.save_file(path)
+
+    worker_b.reload_if_changed(path)
+    assert len(worker_b) == 1
+    np.testing.assert_array_equal(worker_b.lookup(np.array([2]))[0], worker_b.default)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from routers import sensor
+
+    monkeypatch.setattr(sensor, "THRESHOLDS_FILE", str(tmp_path / "thresholds.json"))
+    monkeypatch.setattr(sensor, "_thresholds", ThresholdTable())
+    app = FastAPI()
+    app.include_router(sensor.router, prefix="/sensor")
+    return TestClient(app)
+
+
+def test_put_thresholds_accepts_plant_dict_columns(client):
+    resp = client.put("/sensor/thresholds", json=[
+        {"PLANT_ID": 1, "TEMP_MIN": 16, "temp_max": 20},
+        {"plant_id": 2, "LUX_MIN": 800},
+    ])
+    assert resp.status_code == 200
+    assert resp.json()["plants"] == 2
+    row = client.get("/sensor/thresholds/1").json()
+    assert (row["TEMP_MIN"], row["TEMP_MAX"]) == (16, 20)
+
+
+@pytest.mark.parametrize("row", [
+    {"TEMP_MIN": 16},                      # plant_id 없음
+    {"plant_id": "abc", "TEMP_MIN": 16},
+    {"plant_id": 1, "TEMP_MIN": "warm"},
+])
+def test_put_thresholds_rejects_bad_rows(client, row):
+    resp = client.put("/sensor/thresholds", json=[row])
+    assert resp.status_code == 422
+    from routers import sensor
+    assert not os.path.exists(sensor.THRESHOLDS_FILE)
+
+
+def test_analyze_batch_judges_like_analyze(client, monkeypatch):
+    from routers import sensor
+    monkeypatch.setattr(sensor, "EVENT_MODE", "raw")
+    client.put("/sensor/thresholds", json=[{"plant_id": 1, "TEMP_MAX": 25}])
+    reading = {"plant_id": 1, "temp": 25.000001, "hum": 50, "light": 1000, "soil": 100}
+
+    single = client.post("/sensor/analyze", json=reading).json()
+    batch = client.post("/sensor/analyze_batch", json=[reading]).json()["results"][0]
+    assert single["events"] == batch["events"] == ["TEMP_HIGH"]
+    assert batch["sensor_value"] == 25.000001